@@ -1,5 +1,6 @@
 import streamlit as st
 from utils.analytics import add_analytics
+from machine_learning.utils.model_registry import warm_up_from_env
 import streamlit.components.v1 as components
 from bs4 import BeautifulSoup
 import shutil
@@ -17,6 +18,12 @@ st.set_page_config(
     initial_sidebar_state="auto"
 )
 
+# Préchargement des modèles en arrière-plan, une seule fois par processus
+@st.cache_resource(show_spinner=False)
+def start_model_warm_up():
+    return warm_up_from_env()
+
+start_model_warm_up()
 
 # Organisation des pages
 home = st.Page("pages/Home.py", title="Accueil", icon="🏠", default=True)
@@ -3,6 +3,7 @@ import mlflow
 import pandas as pd
 from typing import Optional, Tuple, Dict
 from sklearn.preprocessing import LabelEncoder
+from ..utils.model_registry import load_mlflow_dict, load_mlflow_model
 
 def prepare_service_data(data: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
     """
@@ -94,6 +95,9 @@ def load_service_classifier(run_id: str) -> Tuple[Optional[object], Optional[Dic
     """
     Charge un modèle de classification de service depuis MLflow
     
+    Le modèle et les encodeurs sont gardés en mémoire par le registre de
+    modèles du processus : seul le premier appel les désérialise.
+    
     Args:
         run_id: ID MLflow du run contenant le modèle
     
@@ -101,8 +105,8 @@ def load_service_classifier(run_id: str) -> Tuple[Optional[object], Optional[Dic
         Le modèle chargé et les encodeurs, ou None si le chargement échoue
     """
     try:
-        model = mlflow.pycaret.load_model(f"runs:/{run_id}/service_classifier")
-        encoders = mlflow.load_dict(f"runs:/{run_id}/label_encoders.json")
+        model = load_mlflow_model(run_id, "service_classifier")
+        encoders = load_mlflow_dict(run_id, "label_encoders.json")
         return model, encoders
     except Exception as e:
         print(f"Erreur lors du chargement du modèle: {str(e)}")
@@ -0,0 +1,230 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+from .confusion_metrics import ConfusionAccumulator
+from .regression_metrics import RegressionAccumulator
+from .metrics import evaluate_service_classification, evaluate_duration_prediction
+
+# Nombre de rééchantillonnages par défaut
+BOOTSTRAP_RESAMPLES = 1000
+
+# Nombre de rééchantillonnages par tâche (chaque tâche a sa propre graine)
+BOOTSTRAP_BLOCK_SIZE = 100
+
+# Taille maximale (lignes × rééchantillonnages) des matrices d'indices d'un bloc de régression
+BOOTSTRAP_MAX_CELLS = 4_000_000
+
+# Nombre de processus par défaut (-1 : un par cœur)
+BOOTSTRAP_WORKERS = int(os.environ.get("MEDICAL_DATA_BOOTSTRAP_WORKERS", "1"))
+
+# Données partagées par les tâches d'un processus (transmises une fois par l'initialiseur du pool)
+_shared: Dict = {}
+
+
+def _init_worker(shared: Dict):
+    global _shared
+    _shared = shared
+
+
+def _run_blocks(block: Callable, shared: Dict, n_resamples: int, block_size: int,
+                seed: Optional[int], n_jobs: int) -> Dict[str, np.ndarray]:
+    """
+    Exécute les blocs de rééchantillonnages, en série ou sur un pool de processus
+
+    Les graines des blocs dérivent toutes de seed (SeedSequence.spawn) et le
+    découpage ne dépend pas de n_jobs : le résultat est identique quel que
+    soit le nombre de processus.
+    """
+    sizes = [min(block_size, n_resamples - start) for start in range(0, n_resamples, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+    if n_jobs == 1 or len(sizes) == 1:
+        _init_worker(shared)
+        results = [block(seed_sequence, size) for seed_sequence, size in zip(seeds, sizes)]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(n_jobs, len(sizes)), initializer=_init_worker, initargs=(shared,)
+        ) as pool:
+            results = list(pool.map(block, seeds, sizes))
+    return {key: np.concatenate([result[key] for result in results]) for key in results[0]}
+
+
+def _confidence_intervals(point: Dict[str, float], replicates: Dict[str, np.ndarray],
+                          confidence: float) -> Dict[str, Dict[str, float]]:
+    """
+    Intervalles par percentiles des rééchantillonnages
+
+    Les rééchantillonnages où la métrique n'est pas définie (NaN : tranche
+    de durée vide...) sont ignorés. Une métrique infinie dans au moins un
+    rééchantillon (MAPE avec une durée réelle nulle, alors infinie aussi sur
+    l'échantillon complet) n'a pas d'intervalle : bornes et écart-type NaN,
+    plutôt qu'un intervalle calculé sur les seuls rééchantillons finis qui
+    ne contiendrait pas la valeur.
+    """
+    alpha = (1 - confidence) / 2
+    intervals = {}
+    for metric, value in point.items():
+        values = replicates[metric]
+        if np.isinf(values).any():
+            values = values[:0]
+        values = values[~np.isnan(values)]
+        if len(values):
+            lower, upper = np.percentile(values, [100 * alpha, 100 * (1 - alpha)])
+            std = values.std(ddof=1) if len(values) > 1 else 0.0
+        else:
+            lower = upper = std = np.nan
+        intervals[metric] = {'value': float(value), 'lower': float(lower), 'upper': float(upper), 'std': float(std)}
+    return intervals
+
+
+def _classification_block(seed_sequence: np.random.SeedSequence, size: int) -> Dict[str, np.ndarray]:
+    """
+    Métriques de classification de size rééchantillonnages
+
+    Les métriques ne dépendent que de la matrice de confusion : rééchantillonner
+    les lignes revient à tirer cette matrice selon une loi multinomiale de
+    probabilités les fréquences observées, sans matrice d'indices.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    n, probabilities, selected = _shared['n'], _shared['probabilities'], _shared['selected']
+    k = _shared['k']
+    matrices = rng.multinomial(n, probabilities, size=size).reshape(size, k, k).astype('float64')
+
+    true_pos = np.diagonal(matrices, axis1=1, axis2=2)
+    predicted = matrices.sum(axis=1)
+    actual = matrices.sum(axis=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted > 0, true_pos / predicted, 0.0)
+        recall = np.where(actual > 0, true_pos / actual, 0.0)
+        f1 = np.where(predicted + actual > 0, 2 * true_pos / (predicted + actual), 0.0)
+
+    # Moyennes macro sur les labels présents dans chaque rééchantillon (comme sklearn)
+    observed = (predicted + actual) > 0
+    n_observed = observed.sum(axis=1)
+    replicates = {
+        'accuracy': true_pos.sum(axis=1) / n,
+        'macro_precision': (precision * observed).sum(axis=1) / n_observed,
+        'macro_recall': (recall * observed).sum(axis=1) / n_observed,
+        'macro_f1': (f1 * observed).sum(axis=1) / n_observed
+    }
+    for label, position in selected:
+        for name, values in (('precision', precision), ('recall', recall), ('f1', f1)):
+            replicates[f'{label}_{name}'] = values[:, position] if position >= 0 else np.zeros(size)
+    return replicates
+
+
+def _duration_block(seed_sequence: np.random.SeedSequence, size: int) -> Dict[str, np.ndarray]:
+    """Métriques de régression de size rééchantillonnages (indices tirés en une matrice)"""
+    rng = np.random.default_rng(seed_sequence)
+    y_true, errors = _shared['y_true'], _shared['errors']
+    percentage_errors, segments = _shared['percentage_errors'], _shared['segments']
+    membership, ranges = _shared['membership'], _shared['ranges']
+    n = len(y_true)
+    indices = rng.integers(0, n, size=(size, n))
+
+    sample_true = y_true[indices]
+    sample_errors = errors[indices]
+    abs_errors = np.abs(sample_errors)
+    squared_errors = (sample_errors ** 2).sum(axis=1)
+    total_squares = ((sample_true - sample_true.mean(axis=1, keepdims=True)) ** 2).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(total_squares > 0, 1 - squared_errors / total_squares, (squared_errors == 0).astype('float64'))
+    replicates = {
+        'mae': abs_errors.mean(axis=1),
+        'rmse': np.sqrt(squared_errors / n),
+        'r2': r2 if n > 1 else np.full(size, np.nan),
+        'mape': percentage_errors[indices].mean(axis=1) * 100
+    }
+
+    # Erreurs par tranche de durée : un bincount sur (rééchantillon, segment)
+    n_segments = membership.shape[1]
+    cells = (segments[indices] + n_segments * np.arange(size)[:, None]).ravel()
+    counts = np.bincount(cells, minlength=size * n_segments).reshape(size, n_segments) @ membership.T
+    sums = np.bincount(cells, weights=abs_errors.ravel(), minlength=size * n_segments).reshape(size, n_segments) @ membership.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        range_mae = np.where(counts > 0, sums / counts, np.nan)
+    for column, (start, end) in enumerate(ranges):
+        replicates[f'mae_{start}_{end}_days'] = range_mae[:, column]
+    return replicates
+
+
+def bootstrap_service_classification(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    labels: List[str] = None,
+    n_resamples: int = BOOTSTRAP_RESAMPLES,
+    confidence: float = 0.95,
+    seed: Optional[int] = 0,
+    n_jobs: int = BOOTSTRAP_WORKERS
+) -> Dict[str, Dict[str, float]]:
+    """
+    Intervalles de confiance bootstrap des métriques de classification des services
+
+    Args:
+        y_true: Valeurs réelles
+        y_pred: Prédictions du modèle
+        labels: Liste des labels de services (métriques par service)
+        n_resamples: Nombre de rééchantillonnages
+        confidence: Niveau de confiance des intervalles
+        seed: Graine (mêmes intervalles pour une même graine, quel que soit n_jobs)
+        n_jobs: Nombre de processus (-1 : tous les cœurs)
+
+    Returns:
+        Pour chaque métrique de evaluate_service_classification : valeur,
+        bornes basse et haute de l'intervalle, écart-type bootstrap
+    """
+    point = evaluate_service_classification(y_true, y_pred, labels)
+    accumulator = ConfusionAccumulator().update(y_true, y_pred)
+    observed = sorted(accumulator.labels)
+    matrix = accumulator.matrix(observed)
+    shared = {
+        'n': accumulator.total,
+        'k': len(observed),
+        'probabilities': matrix.ravel() / accumulator.total,
+        'selected': [(label, observed.index(label) if label in observed else -1) for label in labels or []]
+    }
+    replicates = _run_blocks(_classification_block, shared, n_resamples, BOOTSTRAP_BLOCK_SIZE, seed, n_jobs)
+    return _confidence_intervals(point, replicates, confidence)
+
+
+def bootstrap_duration_prediction(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    n_resamples: int = BOOTSTRAP_RESAMPLES,
+    confidence: float = 0.95,
+    seed: Optional[int] = 0,
+    n_jobs: int = BOOTSTRAP_WORKERS
+) -> Dict[str, Dict[str, float]]:
+    """
+    Intervalles de confiance bootstrap des métriques de prédiction de durée
+
+    Args:
+        y_true: Durées réelles
+        y_pred: Durées prédites
+        n_resamples: Nombre de rééchantillonnages
+        confidence: Niveau de confiance des intervalles
+        seed: Graine (mêmes intervalles pour une même graine, quel que soit n_jobs)
+        n_jobs: Nombre de processus (-1 : tous les cœurs)
+
+    Returns:
+        Pour chaque métrique de evaluate_duration_prediction : valeur,
+        bornes basse et haute de l'intervalle, écart-type bootstrap
+    """
+    point = evaluate_duration_prediction(y_true, y_pred)
+    y_true = np.asarray(y_true, dtype='float64').ravel()
+    errors = y_true - np.asarray(y_pred, dtype='float64').ravel()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentage_errors = np.abs(errors / y_true)
+    accumulator = RegressionAccumulator()
+    shared = {
+        'y_true': y_true,
+        'errors': errors,
+        'percentage_errors': percentage_errors,
+        'segments': accumulator.segments(y_true),
+        'membership': accumulator.membership,
+        'ranges': accumulator.ranges
+    }
+    block_size = max(1, min(BOOTSTRAP_BLOCK_SIZE, BOOTSTRAP_MAX_CELLS // len(y_true)))
+    replicates = _run_blocks(_duration_block, shared, n_resamples, block_size, seed, n_jobs)
+    return _confidence_intervals(point, replicates, confidence)
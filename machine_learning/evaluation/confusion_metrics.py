@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+
+class ConfusionAccumulator:
+    """
+    Matrice de confusion cumulée lot par lot, dont dérivent toutes les métriques
+
+    Chaque lot est encodé une fois (pd.factorize) puis compté par un seul
+    np.bincount sur les codes (vrai × nb_labels + prédit) : aucune
+    revalidation des labels par métrique. Les accumulateurs de plusieurs
+    lots ou de plusieurs processus se combinent avec merge().
+    """
+
+    def __init__(self, labels: Optional[Iterable] = None):
+        self.labels: List = []
+        self._codes: Dict = {}
+        self._counts = np.zeros((0, 0), dtype=np.int64)
+        for label in labels or []:
+            self._code(label)
+
+    def _code(self, label) -> int:
+        """Code d'un label, ajouté (avec une ligne et une colonne) s'il est nouveau"""
+        if label not in self._codes:
+            self._codes[label] = len(self.labels)
+            self.labels.append(label)
+        return self._codes[label]
+
+    def _grow(self):
+        size = len(self.labels)
+        if self._counts.shape[0] < size:
+            counts = np.zeros((size, size), dtype=np.int64)
+            counts[:self._counts.shape[0], :self._counts.shape[1]] = self._counts
+            self._counts = counts
+
+    def update(self, y_true, y_pred) -> 'ConfusionAccumulator':
+        """Ajoute un lot de couples (valeur réelle, prédiction)"""
+        y_true, y_pred = np.asarray(y_true).ravel(), np.asarray(y_pred).ravel()
+        if len(y_true) != len(y_pred):
+            raise ValueError(f"y_true et y_pred de tailles différentes : {len(y_true)} et {len(y_pred)}")
+        batch_codes, batch_labels = pd.factorize(np.concatenate([y_true, y_pred]), use_na_sentinel=False)
+        mapping = np.array([self._code(label) for label in batch_labels], dtype=np.int64)
+        self._grow()
+        size = len(self.labels)
+        codes = mapping[batch_codes]
+        self._counts += np.bincount(
+            codes[:len(y_true)] * size + codes[len(y_true):], minlength=size * size
+        ).reshape(size, size)
+        return self
+
+    def merge(self, other: 'ConfusionAccumulator') -> 'ConfusionAccumulator':
+        """Ajoute les comptages d'un autre accumulateur (autre lot, autre processus)"""
+        mapping = np.array([self._code(label) for label in other.labels], dtype=np.int64)
+        self._grow()
+        self._counts[np.ix_(mapping, mapping)] += other._counts
+        return self
+
+    @property
+    def total(self) -> int:
+        return int(self._counts.sum())
+
+    def matrix(self, labels: Optional[List] = None) -> np.ndarray:
+        """
+        Matrice de confusion (lignes : valeurs réelles, colonnes : prédictions)
+
+        Par défaut dans l'ordre trié des labels, comme sklearn.metrics.confusion_matrix ;
+        un label absent des données donne une ligne et une colonne nulles.
+        """
+        labels = sorted(self.labels) if labels is None else list(labels)
+        positions = np.array([self._codes.get(label, -1) for label in labels], dtype=np.int64)
+        counts = np.pad(self._counts, ((0, 1), (0, 1)))
+        return counts[positions[:, None], positions[None, :]]
+
+    def per_class(self, labels: Optional[List] = None) -> pd.DataFrame:
+        """Précision, rappel, F1 et support de chaque label (0 si non défini)"""
+        labels = sorted(self.labels) if labels is None else list(labels)
+        matrix = self.matrix(labels)
+        true_pos = np.diag(matrix).astype('float64')
+        predicted = matrix.sum(axis=0)
+        actual = matrix.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precision = np.where(predicted > 0, true_pos / predicted, 0.0)
+            recall = np.where(actual > 0, true_pos / actual, 0.0)
+            f1 = np.where(predicted + actual > 0, 2 * true_pos / (predicted + actual), 0.0)
+        return pd.DataFrame(
+            {'precision': precision, 'recall': recall, 'f1': f1, 'support': actual},
+            index=pd.Index(labels, name='label')
+        )
+
+    def metrics(self, labels: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Métriques au format de evaluate_service_classification
+
+        Les moyennes macro portent sur tous les labels observés (réels ou
+        prédits), comme sklearn ; les métriques par service sont ajoutées
+        pour les labels fournis.
+        """
+        # Labels déclarés mais jamais rencontrés exclus des moyennes
+        matrix = self.matrix()
+        scores = self.per_class()[(matrix.sum(axis=0) + matrix.sum(axis=1)) > 0]
+        total = self.total
+        metrics = {
+            'accuracy': float(np.trace(self._counts) / total) if total else 0.0,
+            'macro_precision': float(scores['precision'].mean()) if len(scores) else 0.0,
+            'macro_recall': float(scores['recall'].mean()) if len(scores) else 0.0,
+            'macro_f1': float(scores['f1'].mean()) if len(scores) else 0.0
+        }
+        if labels:
+            for label, row in self.per_class(labels).iterrows():
+                metrics[f'{label}_precision'] = float(row['precision'])
+                metrics[f'{label}_recall'] = float(row['recall'])
+                metrics[f'{label}_f1'] = float(row['f1'])
+        return metrics
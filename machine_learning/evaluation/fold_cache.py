@@ -0,0 +1,97 @@
+import os
+import json
+import hashlib
+import functools
+import pandas as pd
+from typing import Any, Callable, Dict, Optional
+
+# Répertoire des résultats de folds déjà évalués : cache désactivé si la variable n'est pas définie
+FOLD_CACHE_DIR = os.environ.get("MEDICAL_DATA_FOLD_CACHE_DIR")
+
+
+def data_fingerprint(data: pd.DataFrame) -> str:
+    """Empreinte du contenu d'un DataFrame (valeurs, index et colonnes)"""
+    digest = hashlib.sha1()
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    digest.update(repr(list(data.columns)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def trainer_identity(model_trainer: Callable) -> str:
+    """
+    Nom stable d'une fonction d'entraînement (module.nom, arguments d'un partial)
+
+    repr() ne convient pas : il contient l'adresse mémoire de la fonction,
+    différente à chaque exécution.
+    """
+    if isinstance(model_trainer, functools.partial):
+        return (
+            f"{trainer_identity(model_trainer.func)}"
+            f"{model_trainer.args!r}{sorted(model_trainer.keywords.items())!r}"
+        )
+    module = getattr(model_trainer, '__module__', '')
+    name = getattr(model_trainer, '__qualname__', type(model_trainer).__qualname__)
+    return f"{module}.{name}"
+
+
+def has_stable_identity(model_trainer: Callable) -> bool:
+    """
+    Vrai si le nom de la fonction d'entraînement suffit à l'identifier
+
+    Une lambda, une fonction locale, une fermeture ou un objet appelable porte
+    le même nom quels que soient les paramètres qu'il capture
+    (make_trainer(params).<locals>.train) : son nom seul ne peut pas servir
+    de clé de cache.
+    """
+    if isinstance(model_trainer, functools.partial):
+        return has_stable_identity(model_trainer.func)
+    name = getattr(model_trainer, '__qualname__', None)
+    if name is None:
+        # Objet appelable : ses attributs ne font pas partie du nom
+        return False
+    return (
+        '<lambda>' not in name and
+        '<locals>' not in name and
+        not getattr(model_trainer, '__closure__', None)
+    )
+
+
+class FoldCache:
+    """
+    Métriques des folds de validation temporelle, une entrée JSON par fold
+
+    La clé réunit tout ce dont dépend le résultat d'un fold : empreinte des
+    données, définition du split, cible, fonction d'entraînement et sa
+    configuration. Une relance ne réévalue que les folds absents.
+    """
+
+    def __init__(self, cache_dir: str = FOLD_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def key(**parts: Any) -> str:
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"fold__{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, float]]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Entrée illisible (écriture interrompue...) : le fold sera réévalué
+            return None
+
+    def put(self, key: str, metrics: Dict[str, float]):
+        """Écriture atomique, pour qu'un arrêt en cours de validation ne laisse pas d'entrée partielle"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({k: float(v) for k, v in metrics.items()}, f)
+        os.replace(tmp_path, path)
@@ -1,11 +1,8 @@
 import numpy as np
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score,
-    mean_absolute_error, mean_squared_error, r2_score,
-    confusion_matrix
-)
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 import pandas as pd
+from .confusion_metrics import ConfusionAccumulator
+from .regression_metrics import RegressionAccumulator
 
 def evaluate_service_classification(
     y_true: np.ndarray,
@@ -23,34 +20,27 @@ def evaluate_service_classification(
     Returns:
         Dictionnaire contenant les différentes métriques
     """
-    metrics = {
-        'accuracy': accuracy_score(y_true, y_pred),
-        'macro_precision': precision_score(y_true, y_pred, average='macro'),
-        'macro_recall': recall_score(y_true, y_pred, average='macro'),
-        'macro_f1': f1_score(y_true, y_pred, average='macro')
-    }
+    # Une seule matrice de confusion, dont dérivent toutes les métriques
+    return ConfusionAccumulator().update(y_true, y_pred).metrics(labels)
+
+def evaluate_service_classification_batches(
+    batches: Iterable[Tuple[np.ndarray, np.ndarray]],
+    labels: List[str] = None
+) -> Dict[str, float]:
+    """
+    Évalue la classification des services lot par lot (mémoire bornée)
     
-    # Calculer les métriques par service si les labels sont fournis
-    if labels:
-        conf_matrix = confusion_matrix(y_true, y_pred)
-        per_class_metrics = {}
-        
-        for i, label in enumerate(labels):
-            true_pos = conf_matrix[i, i]
-            false_pos = conf_matrix[:, i].sum() - true_pos
-            false_neg = conf_matrix[i, :].sum() - true_pos
-            
-            precision = true_pos / (true_pos + false_pos) if (true_pos + false_pos) > 0 else 0
-            recall = true_pos / (true_pos + false_neg) if (true_pos + false_neg) > 0 else 0
-            f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
-            
-            per_class_metrics[f'{label}_precision'] = precision
-            per_class_metrics[f'{label}_recall'] = recall
-            per_class_metrics[f'{label}_f1'] = f1
+    Args:
+        batches: Couples (valeurs réelles, prédictions) de chaque lot
+        labels: Liste des labels de services
         
-        metrics.update(per_class_metrics)
-    
-    return metrics
+    Returns:
+        Mêmes métriques que evaluate_service_classification sur l'ensemble des lots
+    """
+    accumulator = ConfusionAccumulator()
+    for y_true, y_pred in batches:
+        accumulator.update(y_true, y_pred)
+    return accumulator.metrics(labels)
 
 def evaluate_duration_prediction(
     y_true: np.ndarray,
@@ -66,22 +56,25 @@ def evaluate_duration_prediction(
     Returns:
         Dictionnaire contenant les différentes métriques
     """
-    metrics = {
-        'mae': mean_absolute_error(y_true, y_pred),
-        'rmse': np.sqrt(mean_squared_error(y_true, y_pred)),
-        'r2': r2_score(y_true, y_pred),
-        'mape': np.mean(np.abs((y_true - y_pred) / y_true)) * 100
-    }
-    
-    # Calculer les erreurs par tranche de durée
-    duration_ranges = [(0, 3), (4, 7), (8, 14), (15, 30), (30, float('inf'))]
-    for start, end in duration_ranges:
-        mask = (y_true >= start) & (y_true <= end)
-        if mask.any():
-            range_mae = mean_absolute_error(y_true[mask], y_pred[mask])
-            metrics[f'mae_{start}_{end}_days'] = range_mae
+    # Sommes cumulées en un passage, tranches de durée comprises
+    return RegressionAccumulator().update(y_true, y_pred).metrics()
+
+def evaluate_duration_prediction_batches(
+    batches: Iterable[Tuple[np.ndarray, np.ndarray]]
+) -> Dict[str, float]:
+    """
+    Évalue la prédiction de durée lot par lot (mémoire bornée)
     
-    return metrics
+    Args:
+        batches: Couples (durées réelles, durées prédites) de chaque lot
+        
+    Returns:
+        Mêmes métriques que evaluate_duration_prediction sur l'ensemble des lots
+    """
+    accumulator = RegressionAccumulator()
+    for y_true, y_pred in batches:
+        accumulator.update(y_true, y_pred)
+    return accumulator.metrics()
 
 def evaluate_recommendations(
     recommendations: List[Dict],
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def recommendation_matrices(
+    recommendations: Sequence[List[Dict]],
+    top_n: int = 5
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Matrices (cas × top_n) des recommandations au format de HospitalRecommender.predict
+
+    Returns:
+        Identifiants des hôpitaux et services (None si moins de top_n
+        recommandations), scores de distance (NaN si absents)
+    """
+    n_cases = len(recommendations)
+    hospitals = np.full((n_cases, top_n), None, dtype=object)
+    services = np.full((n_cases, top_n), None, dtype=object)
+    distance_scores = np.full((n_cases, top_n), np.nan)
+    for case, case_recommendations in enumerate(recommendations):
+        for rank, rec in enumerate(case_recommendations[:top_n]):
+            hospitals[case, rank] = rec['hospital_name']
+            services[case, rank] = rec.get('service')
+            distance_scores[case, rank] = rec.get('distance_score', np.nan)
+    return hospitals, services, distance_scores
+
+
+def _pair_keys(case_ids: np.ndarray, item_codes: np.ndarray, n_items: int) -> np.ndarray:
+    """Clé entière unique d'un couple (cas, identifiant), identifiant manquant (-1) compris"""
+    return case_ids.astype(np.int64) * n_items + item_codes + 1
+
+
+def ranking_metrics(
+    recommended: np.ndarray,
+    appropriate: Sequence[Sequence],
+    relevance_scores: Optional[Sequence[Dict]] = None,
+    services: Optional[np.ndarray] = None,
+    distance_scores: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Métriques de classement de tous les cas de test à la fois
+
+    Les identifiants recommandés et ceux de la vérité terrain sont encodés
+    ensemble (pd.factorize) en clés (cas, hôpital) : les correspondances
+    sont trouvées par un seul np.isin, sans boucle par cas.
+
+    Args:
+        recommended: Identifiants recommandés (cas × K), None pour un rang vide
+        appropriate: Pour chaque cas, les hôpitaux appropriés
+        relevance_scores: Pour chaque cas, pertinence graduée {hôpital: score}
+            (NDCG gradué et pertinence moyenne) ; sinon pertinence binaire
+        services: Services recommandés (cas × K), pour la diversité
+        distance_scores: Scores de distance (cas × K)
+
+    Returns:
+        Un tableau par métrique (une valeur par cas) : precision_at_k,
+        recall_at_k, ndcg, mrr, et selon les entrées avg_relevance,
+        avg_distance_score et service_diversity (mêmes définitions que
+        evaluate_recommendations)
+    """
+    recommended = np.asarray(recommended, dtype=object)
+    n_cases, k = recommended.shape
+    if len(appropriate) != n_cases:
+        raise ValueError(f"{n_cases} cas recommandés pour {len(appropriate)} vérités terrain")
+
+    # Encodage commun des identifiants recommandés, appropriés et gradués
+    appropriate_cases = np.repeat(np.arange(n_cases), [len(items) for items in appropriate])
+    appropriate_items = list(chain.from_iterable(appropriate))
+    graded_cases = graded_items = graded_values = np.empty(0)
+    if relevance_scores is not None:
+        graded_cases = np.repeat(np.arange(n_cases), [len(scores) for scores in relevance_scores])
+        graded_items = list(chain.from_iterable(relevance_scores))
+        graded_values = np.fromiter(
+            chain.from_iterable(scores.values() for scores in relevance_scores), dtype='float64', count=len(graded_items)
+        )
+    codes, _ = pd.factorize(pd.Series(
+        list(recommended.ravel()) + appropriate_items + list(graded_items), dtype=object
+    ))
+    n_items = codes.max() + 2 if len(codes) else 1
+    recommended_codes = codes[:recommended.size].reshape(n_cases, k)
+    valid = recommended_codes >= 0
+    recommended_keys = _pair_keys(np.arange(n_cases)[:, None], recommended_codes, n_items)
+    appropriate_codes = codes[recommended.size:recommended.size + len(appropriate_items)]
+    appropriate_keys = np.unique(_pair_keys(
+        appropriate_cases[appropriate_codes >= 0], appropriate_codes[appropriate_codes >= 0], n_items
+    ))
+
+    hits = np.isin(recommended_keys, appropriate_keys) & valid
+    n_hits = hits.sum(axis=1)
+    n_valid = valid.sum(axis=1)
+    n_relevant = np.bincount(appropriate_keys // n_items, minlength=n_cases)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metrics = {
+            'precision_at_k': np.where(n_valid > 0, n_hits / n_valid, np.nan),
+            'recall_at_k': np.where(n_relevant > 0, n_hits / n_relevant, 0.0)
+        }
+
+    # Rang réciproque du premier hôpital approprié
+    first_hit = hits.argmax(axis=1)
+    metrics['mrr'] = np.where(hits.any(axis=1), 1 / (first_hit + 1), 0.0)
+
+    # NDCG : gains binaires, ou pertinences graduées si elles sont fournies
+    discounts = 1 / np.log2(np.arange(k) + 2)
+    if relevance_scores is not None:
+        graded_keys = _pair_keys(graded_cases, codes[recommended.size + len(appropriate_items):], n_items)
+        order = np.argsort(graded_keys, kind='stable')
+        graded_keys, graded_sorted = graded_keys[order], graded_values[order]
+        gains = np.zeros((n_cases, k))
+        if len(graded_keys) and n_cases:
+            position = np.minimum(np.searchsorted(graded_keys, recommended_keys), len(graded_keys) - 1)
+            found = valid & (graded_keys[position] == recommended_keys)
+            gains[found] = graded_sorted[position[found]]
+
+        # Gains idéaux : les K meilleures pertinences de chaque cas
+        ideal = np.zeros((n_cases, k))
+        ranking = np.lexsort((-graded_values, graded_cases))
+        ranked_cases = graded_cases[ranking]
+        ranks = np.arange(len(ranking)) - np.searchsorted(ranked_cases, ranked_cases)
+        keep = ranks < k
+        ideal[ranked_cases[keep], ranks[keep]] = graded_values[ranking][keep]
+        metrics['avg_relevance'] = np.where(n_valid > 0, gains.sum(axis=1) / np.maximum(n_valid, 1), np.nan)
+    else:
+        gains = hits.astype('float64')
+        ideal = (np.arange(k)[None, :] < n_relevant[:, None]).astype('float64')
+    ideal_dcg = ideal @ discounts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metrics['ndcg'] = np.where(ideal_dcg > 0, (gains @ discounts) / ideal_dcg, 0.0)
+
+    if distance_scores is not None:
+        distance_scores = np.asarray(distance_scores, dtype='float64')
+        known = valid & ~np.isnan(distance_scores)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics['avg_distance_score'] = np.where(
+                known.any(axis=1), np.where(known, distance_scores, 0.0).sum(axis=1) / known.sum(axis=1), np.nan
+            )
+
+    # Diversité : services distincts parmi les K rangs, rapportés à K ; un
+    # service manquant (None) compte comme une valeur, comme dans evaluate_recommendations
+    if services is not None:
+        service_codes, _ = pd.factorize(
+            pd.Series(np.asarray(services, dtype=object).ravel(), dtype=object), use_na_sentinel=False
+        )
+        sorted_codes = np.sort(np.where(valid, service_codes.reshape(n_cases, k), -1), axis=1)
+        distinct = (sorted_codes >= 0) & np.concatenate(
+            [np.ones((n_cases, 1), dtype=bool), sorted_codes[:, 1:] != sorted_codes[:, :-1]], axis=1
+        )
+        metrics['service_diversity'] = distinct.sum(axis=1) / k
+
+    return metrics
+
+
+def mean_ranking_metrics(metrics: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """Moyenne de chaque métrique sur les cas où elle est définie"""
+    return {name: float(np.nanmean(values)) if np.any(~np.isnan(values)) else np.nan for name, values in metrics.items()}
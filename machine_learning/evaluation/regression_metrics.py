@@ -0,0 +1,134 @@
+import numpy as np
+from typing import Dict, Sequence, Tuple
+
+# Tranches de durée (en jours, bornes incluses) de evaluate_duration_prediction
+DURATION_RANGES = [(0, 3), (4, 7), (8, 14), (15, 30), (30, float('inf'))]
+
+
+class RegressionAccumulator:
+    """
+    Métriques de régression cumulées lot par lot, en mémoire bornée
+
+    Seules des sommes sont gardées : erreurs absolues, carrées et relatives,
+    moyenne et somme des carrés des écarts des valeurs réelles (pour le R²,
+    combinées comme dans l'algorithme parallèle de Chan), et par tranche de
+    durée le nombre de lignes et la somme des erreurs absolues. Les tranches
+    (bornes incluses, éventuellement jointives ou disjointes) sont découpées
+    en segments élémentaires : chaque ligne est rangée par un np.digitize
+    sur les bornes, puis comptée par np.bincount. Deux accumulateurs (lots,
+    processus) se combinent avec merge().
+    """
+
+    def __init__(self, ranges: Sequence[Tuple[float, float]] = DURATION_RANGES):
+        self.ranges = list(ranges)
+        self.edges = np.unique([bound for bounds in self.ranges for bound in bounds if np.isfinite(bound)])
+
+        # Segments élémentaires : 2i+1 pour une valeur égale à edges[i],
+        # 2i pour une valeur strictement entre edges[i-1] et edges[i]
+        n_edges = len(self.edges)
+        representatives = np.empty(2 * n_edges + 1)
+        representatives[1::2] = self.edges
+        if n_edges:
+            representatives[0] = self.edges[0] - 1
+            representatives[-1] = self.edges[-1] + 1
+            representatives[2:-1:2] = (self.edges[:-1] + self.edges[1:]) / 2
+        else:
+            representatives[0] = 0
+        self.membership = np.array([
+            (representatives >= start) & (representatives <= end) for start, end in self.ranges
+        ], dtype='float64').reshape(len(self.ranges), len(representatives))
+
+        self.count = 0
+        self.sum_abs_error = 0.0
+        self.sum_squared_error = 0.0
+        self.sum_percentage_error = 0.0
+        self.mean_true = 0.0
+        self.m2_true = 0.0
+        self.segment_counts = np.zeros(len(representatives), dtype=np.int64)
+        self.segment_abs_error = np.zeros(len(representatives))
+
+    def segments(self, y_true: np.ndarray) -> np.ndarray:
+        """Segment élémentaire de chaque valeur"""
+        index = np.digitize(y_true, self.edges, right=True)
+        on_edge = np.zeros(len(y_true), dtype=bool)
+        inside = index < len(self.edges)
+        on_edge[inside] = self.edges[index[inside]] == y_true[inside]
+        return 2 * index + on_edge
+
+    def update(self, y_true, y_pred) -> 'RegressionAccumulator':
+        """Ajoute un lot de couples (valeur réelle, prédiction)"""
+        y_true = np.asarray(y_true, dtype='float64').ravel()
+        y_pred = np.asarray(y_pred, dtype='float64').ravel()
+        if len(y_true) != len(y_pred):
+            raise ValueError(f"y_true et y_pred de tailles différentes : {len(y_true)} et {len(y_pred)}")
+        if len(y_true) == 0:
+            return self
+
+        errors = y_true - y_pred
+        abs_errors = np.abs(errors)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percentage_errors = np.abs(errors / y_true)
+
+        mean_true = float(y_true.mean())
+        segments = self.segments(y_true)
+        return self._add(
+            len(y_true),
+            float(abs_errors.sum()),
+            float(np.dot(errors, errors)),
+            float(percentage_errors.sum()),
+            mean_true,
+            float(np.sum((y_true - mean_true) ** 2)),
+            np.bincount(segments, minlength=len(self.segment_counts)),
+            np.bincount(segments, weights=abs_errors, minlength=len(self.segment_counts))
+        )
+
+    def merge(self, other: 'RegressionAccumulator') -> 'RegressionAccumulator':
+        """Ajoute les sommes d'un autre accumulateur (mêmes tranches)"""
+        return self._add(
+            other.count, other.sum_abs_error, other.sum_squared_error, other.sum_percentage_error,
+            other.mean_true, other.m2_true, other.segment_counts, other.segment_abs_error
+        )
+
+    def _add(self, count, sum_abs_error, sum_squared_error, sum_percentage_error,
+             mean_true, m2_true, segment_counts, segment_abs_error) -> 'RegressionAccumulator':
+        if count == 0:
+            return self
+        total = self.count + count
+        delta = mean_true - self.mean_true
+        self.m2_true += m2_true + delta ** 2 * self.count * count / total
+        self.mean_true += delta * count / total
+        self.count = total
+        self.sum_abs_error += sum_abs_error
+        self.sum_squared_error += sum_squared_error
+        self.sum_percentage_error += sum_percentage_error
+        self.segment_counts = self.segment_counts + segment_counts
+        self.segment_abs_error = self.segment_abs_error + segment_abs_error
+        return self
+
+    def r2(self) -> float:
+        """R² (mêmes conventions que sklearn.metrics.r2_score pour une cible constante)"""
+        if self.count < 2:
+            return float('nan')
+        if self.m2_true == 0:
+            return 1.0 if self.sum_squared_error == 0 else 0.0
+        return 1 - self.sum_squared_error / self.m2_true
+
+    def metrics(self) -> Dict[str, float]:
+        """Métriques au format de evaluate_duration_prediction"""
+        if self.count == 0:
+            raise ValueError("Aucune prédiction à évaluer")
+        metrics = {
+            'mae': self.sum_abs_error / self.count,
+            'rmse': float(np.sqrt(self.sum_squared_error / self.count)),
+            'r2': self.r2(),
+            'mape': self.sum_percentage_error / self.count * 100
+        }
+
+        # Erreurs par tranche de durée (tranches non vides uniquement)
+        range_counts = self.membership @ self.segment_counts
+        range_abs_error = self.membership @ self.segment_abs_error
+        for (start, end), count, abs_error in zip(self.ranges, range_counts, range_abs_error):
+            if count > 0:
+                metrics[f'mae_{start}_{end}_days'] = float(abs_error / count)
+        return metrics
+
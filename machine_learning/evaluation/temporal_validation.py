@@ -1,12 +1,40 @@
+import os
+import logging
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Dict, Any
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import List, Tuple, Dict, Any, Callable, Iterator, Optional
 from sklearn.model_selection import TimeSeriesSplit
 from .metrics import (
     evaluate_service_classification,
-    evaluate_duration_prediction,
-    evaluate_recommendations
+    evaluate_duration_prediction
 )
+from .ranking_metrics import recommendation_matrices, ranking_metrics, mean_ranking_metrics
+from .fold_cache import FOLD_CACHE_DIR, FoldCache, data_fingerprint, has_stable_identity, trainer_identity
+
+# Nombre de folds entraînés en parallèle (-1 : un processus par cœur)
+VALIDATION_WORKERS = int(os.environ.get("MEDICAL_DATA_VALIDATION_WORKERS", "1"))
+
+
+def _evaluate_fold(
+    model_trainer: Callable,
+    train_data: pd.DataFrame,
+    test_data: pd.DataFrame,
+    target_col: str,
+    evaluate: Callable
+) -> Dict[str, float]:
+    """Entraîne et évalue le modèle d'un fold (exécuté dans un processus du pool)"""
+    # Entraîner le modèle
+    model, encoders = model_trainer(train_data)
+    
+    # Faire des prédictions
+    X_test = test_data.drop(columns=[target_col])
+    y_test = test_data[target_col]
+    y_pred = model.predict(X_test)
+    
+    # Évaluer
+    return evaluate(y_test, y_pred)
+
 
 class TemporalValidator:
     """
@@ -17,7 +45,9 @@ class TemporalValidator:
         self,
         n_splits: int = 3,
         test_size: int = 1,
-        gap: int = 0
+        gap: int = 0,
+        n_jobs: int = VALIDATION_WORKERS,
+        cache_dir: Optional[str] = FOLD_CACHE_DIR
     ):
         """
         Initialise le validateur temporel
@@ -26,16 +56,82 @@ class TemporalValidator:
             n_splits: Nombre de splits temporels
             test_size: Taille de l'ensemble de test en années
             gap: Écart entre train et test en années
+            n_jobs: Nombre de folds entraînés en parallèle (-1 : tous les cœurs)
+            cache_dir: Répertoire des métriques de folds déjà évalués (None, par
+                défaut sauf MEDICAL_DATA_FOLD_CACHE_DIR : pas de cache)
         """
         self.n_splits = n_splits
         self.test_size = test_size
         self.gap = gap
+        self.n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+        self.fold_cache = FoldCache(cache_dir) if cache_dir else None
         self.tscv = TimeSeriesSplit(
             n_splits=n_splits,
             test_size=test_size,
             gap=gap
         )
     
+    def split_indices(
+        self,
+        data: pd.DataFrame,
+        date_column: str = 'annee'
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Positions (iloc) des lignes de train et de test de chaque split
+        
+        Les splits portent sur les années distinctes et non sur les lignes :
+        une année n'est jamais coupée entre train et test, et test_size et
+        gap s'expriment en années. Seule la colonne des dates est encodée
+        (pd.factorize trié), les données ne sont ni triées ni copiées.
+        
+        Args:
+            data: DataFrame contenant les données
+            date_column: Nom de la colonne contenant les dates
+            
+        Returns:
+            Itérateur de tuples (positions de train, positions de test), un
+            split à la fois
+
+        Raises:
+            ValueError: Pas assez d'années distinctes pour les splits demandés
+                (vérifié dès l'appel, avant le premier split)
+        """
+        year_codes, years = pd.factorize(data[date_column], sort=True)
+        needed = self.n_splits * self.test_size + self.gap + 1
+        if len(years) < needed:
+            raise ValueError(
+                f"{len(years)} années distinctes dans '{date_column}' : au moins {needed} nécessaires "
+                f"pour {self.n_splits} splits de {self.test_size} année(s) de test avec un écart de "
+                f"{self.gap} année(s)"
+            )
+        return self._year_splits(year_codes, len(years))
+
+    def _year_splits(self, year_codes: np.ndarray, n_years: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        dated = year_codes >= 0
+        for train_years, test_years in self.tscv.split(np.arange(n_years)):
+            yield (
+                np.flatnonzero(dated & (year_codes <= train_years[-1])),
+                np.flatnonzero((year_codes >= test_years[0]) & (year_codes <= test_years[-1]))
+            )
+    
+    def iter_temporal_splits(
+        self,
+        data: pd.DataFrame,
+        date_column: str = 'annee'
+    ) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Splits temporels produits un par un (au plus un train et un test en mémoire)
+        
+        Args:
+            data: DataFrame contenant les données
+            date_column: Nom de la colonne contenant les dates
+            
+        Yields:
+            Tuples (train, test), lignes dans l'ordre de data
+        """
+        for train_idx, test_idx in self.split_indices(data, date_column):
+            yield data.iloc[train_idx], data.iloc[test_idx]
+    
     def prepare_temporal_splits(
         self,
         data: pd.DataFrame,
@@ -44,6 +140,9 @@ class TemporalValidator:
         """
         Prépare les splits temporels des données
         
+        Tous les splits sont matérialisés : préférer iter_temporal_splits
+        pour les grands volumes.
+        
         Args:
             data: DataFrame contenant les données
             date_column: Nom de la colonne contenant les dates
@@ -51,21 +150,14 @@ class TemporalValidator:
         Returns:
             Liste de tuples (train, test) pour chaque split
         """
-        splits = []
-        sorted_data = data.sort_values(date_column)
-        
-        for train_idx, test_idx in self.tscv.split(sorted_data):
-            train_data = sorted_data.iloc[train_idx]
-            test_data = sorted_data.iloc[test_idx]
-            splits.append((train_data, test_data))
-        
-        return splits
+        return list(self.iter_temporal_splits(data, date_column))
     
     def validate_service_classifier(
         self,
         model_trainer: callable,
         data: pd.DataFrame,
-        target_col: str = 'classification'
+        target_col: str = 'classification',
+        trainer_config: Optional[Dict[str, Any]] = None
     ) -> Dict[str, List[Dict[str, float]]]:
         """
         Valide le modèle de classification des services
@@ -74,39 +166,22 @@ class TemporalValidator:
             model_trainer: Fonction d'entraînement du modèle
             data: DataFrame contenant les données
             target_col: Nom de la colonne cible
+            trainer_config: Paramètres d'entraînement (hyperparamètres, version...)
+                inclus dans la clé du cache des folds
             
         Returns:
             Dictionnaire contenant les métriques pour chaque split
         """
-        splits = self.prepare_temporal_splits(data)
-        results = []
-        
-        for train_data, test_data in splits:
-            # Entraîner le modèle
-            model, encoders = model_trainer(train_data)
-            
-            # Faire des prédictions
-            X_test = test_data.drop(columns=[target_col])
-            y_test = test_data[target_col]
-            y_pred = model.predict(X_test)
-            
-            # Évaluer
-            metrics = evaluate_service_classification(y_test, y_pred)
-            results.append(metrics)
-        
-        return {
-            'split_metrics': results,
-            'avg_metrics': {
-                k: np.mean([r[k] for r in results])
-                for k in results[0].keys()
-            }
-        }
+        return self._validate_model(
+            model_trainer, data, target_col, evaluate_service_classification, trainer_config
+        )
     
     def validate_duration_predictor(
         self,
         model_trainer: callable,
         data: pd.DataFrame,
-        target_col: str = 'AVG_duree_hospi'
+        target_col: str = 'AVG_duree_hospi',
+        trainer_config: Optional[Dict[str, Any]] = None
     ) -> Dict[str, List[Dict[str, float]]]:
         """
         Valide le modèle de prédiction de durée
@@ -115,31 +190,93 @@ class TemporalValidator:
             model_trainer: Fonction d'entraînement du modèle
             data: DataFrame contenant les données
             target_col: Nom de la colonne cible
+            trainer_config: Paramètres d'entraînement (hyperparamètres, version...)
+                inclus dans la clé du cache des folds
             
         Returns:
             Dictionnaire contenant les métriques pour chaque split
         """
-        splits = self.prepare_temporal_splits(data)
-        results = []
+        return self._validate_model(
+            model_trainer, data, target_col, evaluate_duration_prediction, trainer_config
+        )
+    
+    def _validate_model(
+        self,
+        model_trainer: Callable,
+        data: pd.DataFrame,
+        target_col: str,
+        evaluate: Callable,
+        trainer_config: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, List[Dict[str, float]]]:
+        """
+        Entraîne et évalue un modèle par split, en parallèle et avec cache
         
-        for train_data, test_data in splits:
-            # Entraîner le modèle
-            model, encoders = model_trainer(train_data)
-            
-            # Faire des prédictions
-            X_test = test_data.drop(columns=[target_col])
-            y_test = test_data[target_col]
-            y_pred = model.predict(X_test)
-            
-            # Évaluer
-            metrics = evaluate_duration_prediction(y_test, y_pred)
-            results.append(metrics)
+        Les folds déjà évalués pour les mêmes données, le même split et le
+        même entraînement sont relus sur disque ; les autres sont répartis
+        sur n_jobs processus (model_trainer doit alors être une fonction de
+        module, sérialisable par pickle). Chaque fold terminé est mis en
+        cache aussitôt : une validation interrompue reprend où elle s'est
+        arrêtée.
+        """
+        results: List[Optional[Dict[str, float]]] = [None] * self.n_splits
+        
+        keys = [None] * self.n_splits
+        fold_cache = self.fold_cache
+        if fold_cache is not None and trainer_config is None and not has_stable_identity(model_trainer):
+            logging.warning(
+                f"Folds non mis en cache : {trainer_identity(model_trainer)} ne suffit pas à identifier "
+                "l'entraînement (lambda, fonction locale ou fermeture), préciser trainer_config"
+            )
+            fold_cache = None
+        if fold_cache is not None:
+            fingerprint = data_fingerprint(data)
+            for fold in range(self.n_splits):
+                keys[fold] = fold_cache.key(
+                    data=fingerprint,
+                    split=('annee', self.n_splits, self.test_size, self.gap, fold),
+                    target=target_col,
+                    metrics=evaluate.__name__,
+                    trainer=trainer_identity(model_trainer),
+                    config=trainer_config
+                )
+                results[fold] = fold_cache.get(keys[fold])
+        
+        def store(fold: int, metrics: Dict[str, float]):
+            results[fold] = metrics
+            if fold_cache is not None:
+                fold_cache.put(keys[fold], metrics)
+        
+        # Seuls les folds à évaluer sont matérialisés, au moment de leur entraînement
+        pending = [fold for fold, metrics in enumerate(results) if metrics is None]
+        splits = (
+            (fold, data.iloc[train_idx], data.iloc[test_idx])
+            for fold, (train_idx, test_idx) in enumerate(self.split_indices(data))
+            if results[fold] is None
+        )
+        if self.n_jobs == 1 or len(pending) <= 1:
+            for fold, train_data, test_data in splits:
+                store(fold, _evaluate_fold(model_trainer, train_data, test_data, target_col, evaluate))
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.n_jobs, len(pending))) as pool:
+                running = {}
+                for fold, train_data, test_data in splits:
+                    # Au plus n_jobs folds soumis à la fois
+                    if len(running) >= self.n_jobs:
+                        done, _ = wait(running, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            store(running.pop(future), future.result())
+                    future = pool.submit(_evaluate_fold, model_trainer, train_data, test_data, target_col, evaluate)
+                    running[future] = fold
+                for future in as_completed(running):
+                    store(running[future], future.result())
         
+        # Moyenne de chaque métrique sur les splits où elle existe (tranches de durée vides...)
+        metric_names = list(dict.fromkeys(k for r in results for k in r))
         return {
             'split_metrics': results,
             'avg_metrics': {
-                k: np.mean([r[k] for r in results])
-                for k in results[0].keys()
+                k: np.mean([r[k] for r in results if k in r])
+                for k in metric_names
             }
         }
     
@@ -147,47 +284,57 @@ class TemporalValidator:
         self,
         recommender: Any,
         data: pd.DataFrame,
-        test_cases: List[Dict]
+        test_cases: List[Dict],
+        top_n: int = 5
     ) -> Dict[str, List[Dict[str, float]]]:
         """
         Valide le système de recommandation
         
+        Tous les cas de test d'un split sont recommandés ensemble (predict_batch
+        si le recommandeur le propose) puis évalués d'un bloc par les métriques
+        de classement de ranking_metrics.py.
+        
         Args:
             recommender: Instance du système de recommandation
             data: DataFrame contenant les données des hôpitaux
             test_cases: Liste de cas de test avec vérité terrain
+            top_n: Nombre de recommandations évaluées par cas
             
         Returns:
             Dictionnaire contenant les métriques pour chaque cas de test
         """
-        splits = self.prepare_temporal_splits(data)
-        results = []
+        patients = pd.DataFrame([test_case['patient_data'] for test_case in test_cases])
+        appropriate = [test_case['ground_truth']['appropriate_hospitals'] for test_case in test_cases]
+        relevance_scores = None
+        if all('relevance_scores' in test_case['ground_truth'] for test_case in test_cases):
+            relevance_scores = [test_case['ground_truth']['relevance_scores'] for test_case in test_cases]
         
-        for train_data, _ in splits:
+        results = []
+        case_metrics = []
+        for train_idx, _ in self.split_indices(data):
             # Mettre à jour les données d'hôpitaux
-            recommender.load_hospital_data(train_data)
+            recommender.load_hospital_data(data.iloc[train_idx])
             
-            # Tester chaque cas
-            split_results = []
-            for test_case in test_cases:
-                recommendations = recommender.predict(test_case['patient_data'])
-                metrics = evaluate_recommendations(
-                    recommendations,
-                    test_case['ground_truth']
-                )
-                split_results.append(metrics)
+            # Recommander pour tous les cas
+            if hasattr(recommender, 'predict_batch'):
+                recommendations = recommender.predict_batch(patients, top_n=top_n)
+            else:
+                recommendations = [recommender.predict(test_case['patient_data']) for test_case in test_cases]
             
-            results.append(split_results)
+            # Évaluer tous les cas à la fois
+            hospitals, services, distance_scores = recommendation_matrices(recommendations, top_n)
+            metrics = ranking_metrics(hospitals, appropriate, relevance_scores, services, distance_scores)
+            case_metrics.append(metrics)
+            results.append([
+                {name: float(values[case]) for name, values in metrics.items()}
+                for case in range(len(test_cases))
+            ])
         
         # Calculer les moyennes
-        avg_metrics = {}
-        for metric in results[0][0].keys():
-            values = [
-                result[metric]
-                for split in results
-                for result in split
-            ]
-            avg_metrics[metric] = np.mean(values)
+        avg_metrics = mean_ranking_metrics({
+            name: np.concatenate([metrics[name] for metrics in case_metrics])
+            for name in case_metrics[0]
+        })
         
         return {
             'split_metrics': results,
@@ -0,0 +1,70 @@
+import unittest
+import warnings
+import numpy as np
+from ..bootstrap import bootstrap_duration_prediction, bootstrap_service_classification
+
+SERVICES = ['M', 'C', 'SSR', 'O']
+
+
+class TestBootstrap(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Prédictions aléatoires de services et de durées"""
+        rng = np.random.default_rng(3)
+        n = 500
+        cls.services_true = np.array(SERVICES)[rng.integers(0, len(SERVICES), n)]
+        cls.services_pred = np.where(rng.random(n) < 0.7, cls.services_true, 'M')
+        cls.duration_true = np.round(rng.gamma(2.0, 6.0, n), 1) + 1
+        cls.duration_pred = cls.duration_true + rng.normal(0, 2, n)
+
+    def assertIntervalsEqual(self, expected, actual):
+        self.assertEqual(set(expected), set(actual))
+        for metric, interval in expected.items():
+            np.testing.assert_array_equal(
+                [interval[key] for key in ('value', 'lower', 'upper', 'std')],
+                [actual[metric][key] for key in ('value', 'lower', 'upper', 'std')],
+                err_msg=metric
+            )
+
+    def assertContainsPoint(self, intervals):
+        for metric, interval in intervals.items():
+            if np.isfinite(interval['lower']):
+                self.assertLessEqual(interval['lower'], interval['value'] + 1e-12, msg=metric)
+                self.assertGreaterEqual(interval['upper'], interval['value'] - 1e-12, msg=metric)
+                self.assertGreaterEqual(interval['std'], 0.0, msg=metric)
+
+    def test_classification_independent_of_n_jobs(self):
+        """Même graine : mêmes intervalles en série et sur deux processus"""
+        kwargs = dict(labels=SERVICES + ['PSY'], n_resamples=300, seed=1)
+        sequential = bootstrap_service_classification(self.services_true, self.services_pred, n_jobs=1, **kwargs)
+        parallel = bootstrap_service_classification(self.services_true, self.services_pred, n_jobs=2, **kwargs)
+        self.assertIntervalsEqual(sequential, parallel)
+        self.assertContainsPoint(sequential)
+
+    def test_duration_independent_of_n_jobs(self):
+        """Même graine : mêmes intervalles en série et sur deux processus"""
+        sequential = bootstrap_duration_prediction(self.duration_true, self.duration_pred, n_resamples=300, seed=1, n_jobs=1)
+        parallel = bootstrap_duration_prediction(self.duration_true, self.duration_pred, n_resamples=300, seed=1, n_jobs=2)
+        self.assertIntervalsEqual(sequential, parallel)
+        self.assertContainsPoint(sequential)
+
+    def test_seed_changes_intervals(self):
+        """Graines différentes : rééchantillonnages différents"""
+        first = bootstrap_duration_prediction(self.duration_true, self.duration_pred, n_resamples=200, seed=1)
+        second = bootstrap_duration_prediction(self.duration_true, self.duration_pred, n_resamples=200, seed=2)
+        self.assertNotEqual(first['mae']['lower'], second['mae']['lower'])
+
+    def test_zero_duration(self):
+        """Durée réelle nulle : MAPE infinie sans intervalle, sans avertissement"""
+        duration_true = self.duration_true.copy()
+        duration_true[:3] = 0
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            intervals = bootstrap_duration_prediction(duration_true, self.duration_pred, n_resamples=200, seed=0)
+        self.assertTrue(np.isinf(intervals['mape']['value']))
+        for key in ('lower', 'upper', 'std'):
+            self.assertTrue(np.isnan(intervals['mape'][key]), msg=key)
+        self.assertContainsPoint({metric: interval for metric, interval in intervals.items() if metric != 'mape'})
+
+if __name__ == '__main__':
+    unittest.main()
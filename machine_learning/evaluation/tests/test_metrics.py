@@ -0,0 +1,168 @@
+import unittest
+import numpy as np
+from sklearn.metrics import (
+    accuracy_score, confusion_matrix, f1_score, mean_absolute_error, mean_squared_error,
+    precision_recall_fscore_support, precision_score, r2_score, recall_score
+)
+from ..confusion_metrics import ConfusionAccumulator
+from ..regression_metrics import DURATION_RANGES, RegressionAccumulator
+from ..metrics import evaluate_service_classification, evaluate_service_classification_batches
+
+SERVICES = ['M', 'C', 'SSR', 'O', 'PSY', 'ESND']
+
+
+def sklearn_classification(y_true, y_pred, labels):
+    """Métriques de référence calculées par sklearn"""
+    metrics = {
+        'accuracy': accuracy_score(y_true, y_pred),
+        'macro_precision': precision_score(y_true, y_pred, average='macro', zero_division=0),
+        'macro_recall': recall_score(y_true, y_pred, average='macro', zero_division=0),
+        'macro_f1': f1_score(y_true, y_pred, average='macro', zero_division=0)
+    }
+    precision, recall, f1, _ = precision_recall_fscore_support(y_true, y_pred, labels=labels, zero_division=0)
+    for i, label in enumerate(labels):
+        metrics[f'{label}_precision'] = precision[i]
+        metrics[f'{label}_recall'] = recall[i]
+        metrics[f'{label}_f1'] = f1[i]
+    return metrics
+
+
+class TestConfusionAccumulator(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Prédictions aléatoires, correctes dans 60 % des cas"""
+        rng = np.random.default_rng(42)
+        n = 5000
+        cls.y_true = np.array(SERVICES)[rng.integers(0, len(SERVICES), n)]
+        cls.y_pred = np.where(rng.random(n) < 0.6, cls.y_true, np.array(SERVICES)[rng.integers(0, 5, n)])
+
+    def assertMetricsEqual(self, expected, actual):
+        self.assertEqual(set(expected), set(actual))
+        for metric, value in expected.items():
+            self.assertAlmostEqual(value, actual[metric], msg=metric)
+
+    def test_matches_sklearn(self):
+        """Une seule mise à jour : mêmes métriques que sklearn"""
+        metrics = evaluate_service_classification(self.y_true, self.y_pred, SERVICES)
+        self.assertMetricsEqual(sklearn_classification(self.y_true, self.y_pred, SERVICES), metrics)
+
+    def test_confusion_matrix(self):
+        """Même matrice que sklearn.metrics.confusion_matrix (labels triés)"""
+        accumulator = ConfusionAccumulator().update(self.y_true, self.y_pred)
+        np.testing.assert_array_equal(accumulator.matrix(), confusion_matrix(self.y_true, self.y_pred))
+
+    def test_batches_with_missing_labels(self):
+        """Lots où certains labels sont absents : mêmes métriques que sur l'ensemble"""
+        # Premier lot sans ESND ni PSY, ni en valeur réelle ni en prédiction
+        first = ~np.isin(self.y_true, ['ESND', 'PSY']) & ~np.isin(self.y_pred, ['ESND', 'PSY'])
+        batches = [
+            (self.y_true[first], self.y_pred[first]),
+            (self.y_true[~first][:1000], self.y_pred[~first][:1000]),
+            (self.y_true[~first][1000:], self.y_pred[~first][1000:])
+        ]
+        metrics = evaluate_service_classification_batches(batches, SERVICES)
+        self.assertMetricsEqual(sklearn_classification(self.y_true, self.y_pred, SERVICES), metrics)
+
+    def test_merge(self):
+        """Accumulateurs de deux processus combinés, ordres de labels différents"""
+        half = len(self.y_true) // 2
+        left = ConfusionAccumulator(labels=['ESND', 'X']).update(self.y_true[:half], self.y_pred[:half])
+        right = ConfusionAccumulator().update(self.y_true[half:], self.y_pred[half:])
+        metrics = left.merge(right).metrics(SERVICES)
+        # Le label déclaré X, jamais rencontré, n'entre pas dans les moyennes
+        self.assertMetricsEqual(sklearn_classification(self.y_true, self.y_pred, SERVICES), metrics)
+
+    def test_label_absent_from_data(self):
+        """Un service demandé mais absent des données a des métriques nulles"""
+        metrics = evaluate_service_classification(['M', 'C'], ['M', 'M'], ['M', 'C', 'SSR'])
+        self.assertEqual(metrics['SSR_precision'], 0.0)
+        self.assertEqual(metrics['SSR_f1'], 0.0)
+        self.assertAlmostEqual(metrics['macro_f1'], f1_score(['M', 'C'], ['M', 'M'], average='macro', zero_division=0))
+
+
+def reference_regression(y_true, y_pred, ranges=DURATION_RANGES):
+    """Métriques de référence : sklearn, et un masque par tranche de durée"""
+    y_true = np.asarray(y_true, dtype='float64')
+    y_pred = np.asarray(y_pred, dtype='float64')
+    metrics = {
+        'mae': mean_absolute_error(y_true, y_pred),
+        'rmse': np.sqrt(mean_squared_error(y_true, y_pred)),
+        'r2': r2_score(y_true, y_pred),
+        'mape': np.mean(np.abs((y_true - y_pred) / y_true)) * 100
+    }
+    for start, end in ranges:
+        mask = (y_true >= start) & (y_true <= end)
+        if mask.any():
+            metrics[f'mae_{start}_{end}_days'] = mean_absolute_error(y_true[mask], y_pred[mask])
+    return metrics
+
+
+class TestRegressionAccumulator(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Durées aléatoires, dont des valeurs exactement sur les bornes des tranches"""
+        rng = np.random.default_rng(7)
+        n = 3000
+        cls.y_true = np.round(rng.gamma(2.0, 6.0, n) + 0.5, 1)
+        cls.y_true[:300] = rng.choice([3, 3.5, 4, 7, 14, 15, 30, 0.5], 300)
+        cls.y_pred = cls.y_true + rng.normal(0, 2, n)
+
+    def assertMetricsEqual(self, expected, actual):
+        self.assertEqual(set(expected), set(actual))
+        for metric, value in expected.items():
+            self.assertAlmostEqual(value, actual[metric], places=8, msg=metric)
+
+    def test_matches_sklearn(self):
+        """Une seule mise à jour : mêmes métriques que sklearn et les masques par tranche"""
+        metrics = RegressionAccumulator().update(self.y_true, self.y_pred).metrics()
+        self.assertMetricsEqual(reference_regression(self.y_true, self.y_pred), metrics)
+
+    def test_merge(self):
+        """R² combiné (Chan) : lots de tailles et de moyennes très différentes"""
+        order = np.argsort(self.y_true)
+        y_true, y_pred = self.y_true[order], self.y_pred[order]
+        accumulators = [
+            RegressionAccumulator().update(y_true[start:end], y_pred[start:end])
+            for start, end in ((0, 1), (1, 100), (100, 2900), (2900, 3000))
+        ]
+        merged = RegressionAccumulator()
+        for accumulator in accumulators:
+            merged.merge(accumulator)
+        self.assertMetricsEqual(reference_regression(y_true, y_pred), merged.metrics())
+
+    def test_edge_values(self):
+        """Une valeur sur une borne compte dans toutes les tranches qui l'incluent"""
+        y_true = np.array([3, 3.5, 4, 30, 30, 31])
+        y_pred = np.array([2, 3.0, 6, 25, 33, 31])
+        metrics = RegressionAccumulator().update(y_true, y_pred).metrics()
+        self.assertAlmostEqual(metrics['mae_0_3_days'], 1.0)
+        self.assertAlmostEqual(metrics['mae_4_7_days'], 2.0)
+        self.assertAlmostEqual(metrics['mae_15_30_days'], 4.0)
+        self.assertAlmostEqual(metrics['mae_30_inf_days'], 8 / 3)
+        # 3.5 est entre deux tranches jointives : dans aucune
+        self.assertMetricsEqual(reference_regression(y_true, y_pred), metrics)
+
+    def test_overlapping_ranges(self):
+        """Tranches personnalisées chevauchantes ou disjointes"""
+        ranges = [(0, 10), (5, 15), (20, 25), (12, float('inf'))]
+        metrics = RegressionAccumulator(ranges).update(self.y_true, self.y_pred).metrics()
+        self.assertMetricsEqual(reference_regression(self.y_true, self.y_pred, ranges), metrics)
+
+    def test_constant_target(self):
+        """Cible constante : R² de 1 si les prédictions sont exactes, 0 sinon (comme sklearn)"""
+        y_true = np.full(10, 5.0)
+        exact = RegressionAccumulator().update(y_true[:4], y_true[:4]).merge(
+            RegressionAccumulator().update(y_true[4:], y_true[4:])
+        )
+        self.assertEqual(exact.r2(), r2_score(y_true, y_true))
+        wrong = RegressionAccumulator().update(y_true, y_true + 1)
+        self.assertEqual(wrong.r2(), r2_score(y_true, y_true + 1))
+
+    def test_single_value(self):
+        """R² non défini pour une seule valeur, erreur sans aucune valeur"""
+        self.assertTrue(np.isnan(RegressionAccumulator().update([4.0], [5.0]).r2()))
+        with self.assertRaises(ValueError):
+            RegressionAccumulator().metrics()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import numpy as np
+from ..ranking_metrics import mean_ranking_metrics, ranking_metrics, recommendation_matrices
+from ..metrics import evaluate_recommendations
+
+HOSPITALS = [f'H{i}' for i in range(30)]
+SERVICES = ['M', 'C', 'SSR', 'O', None]
+TOP_N = 5
+
+
+def dcg(gains):
+    return sum(gain / np.log2(rank + 2) for rank, gain in enumerate(gains))
+
+
+def reference_metrics(recommendations, ground_truth, top_n=TOP_N):
+    """Métriques d'un cas, calculées rang par rang"""
+    top = [rec['hospital_name'] for rec in recommendations[:top_n]]
+    appropriate = set(ground_truth['appropriate_hospitals'])
+    relevance = ground_truth['relevance_scores']
+    hits = [hospital in appropriate for hospital in top]
+    ideal_binary = dcg([1] * min(top_n, len(appropriate)))
+    ideal_graded = dcg(sorted(relevance.values(), reverse=True)[:top_n])
+    return {
+        'precision_at_k': sum(hits) / len(top) if top else np.nan,
+        'recall_at_k': sum(hits) / len(appropriate) if appropriate else 0.0,
+        'mrr': next((1 / (rank + 1) for rank, hit in enumerate(hits) if hit), 0.0),
+        'ndcg_binary': dcg(hits) / ideal_binary if ideal_binary > 0 else 0.0,
+        'ndcg': dcg([relevance.get(hospital, 0) for hospital in top]) / ideal_graded if ideal_graded > 0 else 0.0
+    }
+
+
+class TestRankingMetrics(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Cas aléatoires : listes courtes ou vides, doublons dans la vérité terrain"""
+        rng = np.random.default_rng(11)
+        cls.recommendations, cls.ground_truth = [], []
+        for case in range(500):
+            n_recommendations = 0 if case % 25 == 0 else int(rng.integers(1, 8))
+            cls.recommendations.append([
+                {
+                    'hospital_name': hospital,
+                    'service': SERVICES[rng.integers(0, len(SERVICES))],
+                    'distance_score': float(rng.random())
+                }
+                for hospital in rng.choice(HOSPITALS, n_recommendations, replace=False)
+            ])
+            appropriate = list(rng.choice(HOSPITALS, rng.integers(0, 8)))
+            cls.ground_truth.append({
+                'appropriate_hospitals': appropriate + appropriate[:2],
+                'relevance_scores': {
+                    hospital: float(rng.integers(0, 4))
+                    for hospital in rng.choice(HOSPITALS, rng.integers(0, 10), replace=False)
+                }
+            })
+        hospitals, services, distance_scores = recommendation_matrices(cls.recommendations, TOP_N)
+        appropriate = [truth['appropriate_hospitals'] for truth in cls.ground_truth]
+        cls.graded = ranking_metrics(
+            hospitals, appropriate, [truth['relevance_scores'] for truth in cls.ground_truth],
+            services, distance_scores
+        )
+        cls.binary = ranking_metrics(hospitals, appropriate)
+
+    def test_matches_reference(self):
+        """Précision, rappel, MRR et NDCG binaire et gradué de chaque cas"""
+        for case, (recommendations, truth) in enumerate(zip(self.recommendations, self.ground_truth)):
+            expected = reference_metrics(recommendations, truth)
+            np.testing.assert_allclose(expected['precision_at_k'], self.graded['precision_at_k'][case])
+            np.testing.assert_allclose(expected['recall_at_k'], self.graded['recall_at_k'][case])
+            np.testing.assert_allclose(expected['mrr'], self.graded['mrr'][case])
+            np.testing.assert_allclose(expected['ndcg'], self.graded['ndcg'][case])
+            np.testing.assert_allclose(expected['ndcg_binary'], self.binary['ndcg'][case])
+
+    def test_matches_evaluate_recommendations(self):
+        """Mêmes valeurs que evaluate_recommendations sur les cas non vides, services manquants compris"""
+        for case, (recommendations, truth) in enumerate(zip(self.recommendations, self.ground_truth)):
+            if not recommendations:
+                continue
+            for metric, value in evaluate_recommendations(recommendations, truth, TOP_N).items():
+                self.assertAlmostEqual(value, self.graded[metric][case], msg=f"{metric} (cas {case})")
+
+    def test_empty_recommendations(self):
+        """Cas sans recommandation : précision non définie, ignorée dans les moyennes"""
+        empty = [case for case, recommendations in enumerate(self.recommendations) if not recommendations]
+        self.assertTrue(np.isnan(self.graded['precision_at_k'][empty]).all())
+        self.assertTrue((self.graded['service_diversity'][empty] == 0).all())
+        means = mean_ranking_metrics(self.graded)
+        self.assertAlmostEqual(means['precision_at_k'], np.nanmean(self.graded['precision_at_k']))
+
+    def test_duplicate_ground_truth(self):
+        """Un hôpital approprié répété compte une seule fois dans le rappel"""
+        recommended = np.array([['H1', 'H2', None]], dtype=object)
+        metrics = ranking_metrics(recommended, [['H1', 'H1', 'H3']])
+        self.assertAlmostEqual(metrics['recall_at_k'][0], 0.5)
+        self.assertAlmostEqual(metrics['precision_at_k'][0], 0.5)
+        self.assertAlmostEqual(metrics['mrr'][0], 1.0)
+
+    def test_no_cases(self):
+        """Aucun cas : tableaux vides"""
+        metrics = ranking_metrics(np.empty((0, TOP_N), dtype=object), [])
+        self.assertTrue(all(len(values) == 0 for values in metrics.values()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from ..temporal_validation import TemporalValidator
+from ..fold_cache import FOLD_CACHE_DIR
+
+
+def train_linear(train_data):
+    """Entraînement de module : identifié par son nom dans le cache des folds"""
+    model = LinearRegression().fit(train_data[['annee', 'x']], train_data['AVG_duree_hospi'])
+    return model, {}
+
+
+def make_trainer(offset):
+    """Fermeture : même nom quel que soit offset"""
+    def train(train_data):
+        model = LinearRegression().fit(train_data[['annee', 'x']], train_data['AVG_duree_hospi'] + offset)
+        return model, {}
+    return train
+
+
+class TestFoldCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Données synthétiques sur 8 années"""
+        rng = np.random.default_rng(0)
+        n = 400
+        cls.data = pd.DataFrame({
+            'annee': rng.integers(2015, 2023, n),
+            'x': rng.normal(size=n)
+        })
+        cls.data['AVG_duree_hospi'] = 5 + 2 * cls.data['x'] + rng.normal(size=n)
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_cache_disabled_by_default(self):
+        """Sans répertoire de cache ni MEDICAL_DATA_FOLD_CACHE_DIR, rien n'est écrit"""
+        if FOLD_CACHE_DIR is not None:
+            self.skipTest("MEDICAL_DATA_FOLD_CACHE_DIR est défini")
+        self.assertIsNone(TemporalValidator(n_splits=3).fold_cache)
+
+    def test_cached_folds_reused(self):
+        """Une relance relit les folds en cache"""
+        validator = TemporalValidator(n_splits=3, cache_dir=self.cache_dir)
+        first = validator.validate_duration_predictor(train_linear, self.data, target_col='AVG_duree_hospi')
+        second = validator.validate_duration_predictor(train_linear, self.data, target_col='AVG_duree_hospi')
+        for expected, cached in zip(first['split_metrics'], second['split_metrics']):
+            for metric, value in expected.items():
+                self.assertAlmostEqual(value, cached[metric])
+
+    def test_closures_not_shared(self):
+        """Deux fermetures de même nom ne partagent pas leurs résultats"""
+        validator = TemporalValidator(n_splits=3, cache_dir=self.cache_dir)
+        with self.assertLogs(level='WARNING'):
+            first = validator.validate_duration_predictor(make_trainer(0), self.data)
+        with self.assertLogs(level='WARNING'):
+            second = validator.validate_duration_predictor(make_trainer(100), self.data)
+        self.assertNotAlmostEqual(first['avg_metrics']['mae'], second['avg_metrics']['mae'])
+
+    def test_closures_cached_with_config(self):
+        """Une fermeture est mise en cache quand trainer_config la distingue"""
+        validator = TemporalValidator(n_splits=3, cache_dir=self.cache_dir)
+        first = validator.validate_duration_predictor(make_trainer(0), self.data, trainer_config={'offset': 0})
+        second = validator.validate_duration_predictor(make_trainer(100), self.data, trainer_config={'offset': 100})
+        self.assertNotAlmostEqual(first['avg_metrics']['mae'], second['avg_metrics']['mae'])
+
+    def test_parallel_matches_sequential(self):
+        """Même résultat en série et sur un pool de processus"""
+        sequential = TemporalValidator(n_splits=3, n_jobs=1).validate_duration_predictor(train_linear, self.data)
+        parallel = TemporalValidator(n_splits=3, n_jobs=2).validate_duration_predictor(train_linear, self.data)
+        for metric, value in sequential['avg_metrics'].items():
+            self.assertAlmostEqual(value, parallel['avg_metrics'][metric])
+
+class TestSplitIndices(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Années non triées et en nombres de lignes inégaux"""
+        rng = np.random.default_rng(1)
+        cls.data = pd.DataFrame({'annee': rng.choice([2018, 2015, 2021, 2016, 2019, 2017, 2020], 300)})
+
+    def test_years_not_split(self):
+        """Aucune année à la fois en train et en test, train avant test, écart respecté"""
+        validator = TemporalValidator(n_splits=2, test_size=2, gap=1)
+        splits = list(validator.split_indices(self.data))
+        self.assertEqual(len(splits), 2)
+        for train_idx, test_idx in splits:
+            train_years = set(self.data['annee'].iloc[train_idx])
+            test_years = set(self.data['annee'].iloc[test_idx])
+            self.assertFalse(train_years & test_years)
+            self.assertEqual(len(test_years), 2)
+            self.assertEqual(min(test_years) - max(train_years), 2)
+            # Toutes les lignes des années retenues
+            self.assertEqual(len(test_idx), self.data['annee'].isin(test_years).sum())
+
+    def test_too_few_years(self):
+        """Trop peu d'années distinctes : erreur explicite dès l'appel"""
+        validator = TemporalValidator(n_splits=3, test_size=2, gap=1)
+        with self.assertRaisesRegex(ValueError, "7 années distinctes dans 'annee' : au moins 8 nécessaires"):
+            validator.split_indices(self.data)
+        # Exactement le minimum : le premier train ne compte qu'une année
+        first_train, _ = next(TemporalValidator(n_splits=6, test_size=1).split_indices(self.data))
+        self.assertEqual(set(self.data['annee'].iloc[first_train]), {2015})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import glob
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Sequence
+from .hospitalisation_predictor import HospitalisationPredictor
+
+# Années prédites pour chaque couple (région, pathologie)
+FORECAST_YEARS = (2023, 2024, 2025, 2026)
+
+# Répertoire des grilles de prédictions (surchargeable pour les tests ou l'App Service)
+FORECAST_CACHE_DIR = os.environ.get("MEDICAL_DATA_FORECAST_DIR", os.path.join(".cache", "forecasts"))
+
+GRID_INDEX = ['nom_region', 'nom_pathologie', 'annee']
+
+
+def forecast_inputs(regions: Sequence[str], pathologies: Sequence[str],
+                    years: Sequence[int] = FORECAST_YEARS) -> pd.DataFrame:
+    """Produit cartésien régions × pathologies × années, dans l'ordre de GRID_INDEX"""
+    regions, pathologies, years = sorted(regions), sorted(pathologies), list(years)
+    n_regions, n_pathologies, n_years = len(regions), len(pathologies), len(years)
+    return pd.DataFrame({
+        'annee': np.tile(years, n_regions * n_pathologies),
+        'nom_pathologie': pd.Categorical(
+            np.tile(np.repeat(pathologies, n_years), n_regions), categories=pathologies
+        ),
+        'nom_region': pd.Categorical(
+            np.repeat(regions, n_pathologies * n_years), categories=regions
+        ),
+    })
+
+
+def grid_path(key: str) -> str:
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(FORECAST_CACHE_DIR, f"forecast_grid__{digest}.parquet")
+
+
+def load_forecast_grid(
+    predictor: HospitalisationPredictor,
+    regions: Sequence[str],
+    pathologies: Sequence[str],
+    years: Sequence[int] = FORECAST_YEARS,
+    data_version: str = ''
+) -> pd.DataFrame:
+    """
+    Prédictions de toutes les régions × pathologies × années
+
+    La grille est calculée en un seul appel à predict_many puis écrite en
+    Parquet, sous un nom dérivé des versions des données et du modèle et
+    du périmètre : elle n'est recalculée que si l'un d'eux change.
+
+    Args:
+        predictor: Modèle de prédiction chargé
+        regions: Régions de la grille
+        pathologies: Pathologies de la grille
+        years: Années prédites
+        data_version: Version des données d'entraînement/affichage (snapshot)
+
+    Returns:
+        DataFrame indexé et trié par (nom_region, nom_pathologie, annee),
+        colonne prediction_label
+    """
+    key = repr((data_version, predictor.version, sorted(regions), sorted(pathologies), list(years)))
+    path = grid_path(key)
+    if os.path.exists(path):
+        grid = pd.read_parquet(path)
+    else:
+        grid = predictor.predict_many(forecast_inputs(regions, pathologies, years))[GRID_INDEX + ['prediction_label']]
+        _write_grid(grid, path)
+    return grid.set_index(GRID_INDEX).sort_index()
+
+
+def _write_grid(grid: pd.DataFrame, path: str):
+    """Écriture atomique de la grille, suppression des grilles précédentes"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    grid.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    for old_path in glob.glob(os.path.join(os.path.dirname(path), "forecast_grid__*.parquet")):
+        if old_path != path:
+            os.remove(old_path)
@@ -0,0 +1,59 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Optional
+from ..utils.model_registry import get_model_registry
+
+# Modèle de prédiction du nombre d'hospitalisations (pipeline PyCaret sauvegardé par save_model)
+MODEL_NAME = 'best_model'
+
+# Variables d'entrée du pipeline ('annee' est ignorée par le modèle mais attendue en entrée)
+FEATURES = ['annee', 'nom_pathologie', 'nom_region']
+
+
+def model_version(model_name: str = MODEL_NAME) -> Optional[str]:
+    """Version du modèle sauvegardé (date de modification du fichier, en ms), None s'il est absent"""
+    path = f"{model_name}.pkl"
+    if not os.path.exists(path):
+        return None
+    return str(int(os.path.getmtime(path) * 1000))
+
+
+class HospitalisationPredictor:
+    """
+    Prédiction du nombre d'hospitalisations par (année, pathologie, région)
+
+    Le pipeline sauvegardé contient déjà tout le prétraitement appris à
+    l'entraînement (normalisation, transformation, encodage) : il est
+    restauré tel quel, sans setup() PyCaret, puis appliqué directement aux
+    lignes à prédire.
+    """
+
+    def __init__(self, pipeline, version: Optional[str] = None):
+        self.pipeline = pipeline
+        self.version = version
+
+    @classmethod
+    def load(cls, model_name: str = MODEL_NAME) -> 'HospitalisationPredictor':
+        """Pipeline désérialisé une seule fois par processus et par version du fichier"""
+        version = model_version(model_name)
+
+        def load():
+            from pycaret.regression import load_model
+            return load_model(model_name, verbose=False)
+
+        pipeline = get_model_registry().get(('local', model_name, version), load)
+        return cls(pipeline, version)
+
+    def predict_many(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Prédit toutes les lignes en un seul appel au pipeline
+
+        Args:
+            data: Lignes à prédire, avec les colonnes FEATURES
+
+        Returns:
+            Copie de data avec la colonne prediction_label (comme predict_model)
+        """
+        predictions = self.pipeline.predict(data[FEATURES])
+        return data.assign(prediction_label=np.round(np.asarray(predictions, dtype='float64'), 4))
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Tuple
+from .territory_distances import TerritoryDistances
+
+# Score partiel des services compatibles avec le service prédit
+SERVICE_COMPATIBILITY = {
+    'M': {'C': 0.5, 'SSR': 0.3},
+    'C': {'M': 0.5, 'SSR': 0.3},
+    'SSR': {'M': 0.3, 'C': 0.3},
+    'O': {'M': 0.4},
+    'PSY': {'M': 0.2},
+    'ESND': {'SSR': 0.4, 'M': 0.3}
+}
+
+
+class HospitalIndex:
+    """
+    Caractéristiques des hôpitaux précalculées au chargement de la table
+
+    Tout ce qui ne dépend pas du patient est calculé une fois : libellés,
+    positions des territoires dans la matrice des distances et scores de
+    capacité ; la compatibilité de chaque service prédit avec les services
+    des hôpitaux est calculée à sa première demande. Les hôpitaux sont aussi
+    regroupés par service, avec pour chaque service prédit la partition
+    entre hôpitaux compatibles (candidats) et autres.
+    """
+
+    def __init__(self, data: pd.DataFrame, distances: TerritoryDistances):
+        self.size = len(data)
+        self.names = self._column(data, 'nom_region', '').to_numpy(dtype=object)
+        self.services = self._column(data, 'classification', '').to_numpy(dtype=object)
+
+        # Territoires résolus une fois chacun (-1 si inconnu)
+        codes, locations = pd.factorize(self._column(data, 'nom_region', '').astype(str), use_na_sentinel=False)
+        self.positions = distances.positions([f"{location}, France" for location in locations])[codes]
+
+        # Score de capacité (0-1, plus de capacité = meilleur score) : 1 - taux
+        # d'occupation, occupation de 1 pour un hôpital sans lit déclaré ; score
+        # nul si l'occupation est inconnue (np.fmax, comme max(0, nan))
+        lit_hospi = self._column(data, 'lit_hospi_complete', 0).to_numpy(dtype='float64')
+        hospi_total = self._column(data, 'hospi_total_24h', 0).to_numpy(dtype='float64')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.occupation = np.where(lit_hospi > 0, hospi_total / lit_hospi, 1.0)
+        self.capacity_scores = np.fmax(0, 1 - self.occupation)
+
+        # Hôpitaux par service, et compatibilité des services prédits connus
+        self.service_codes, self.service_labels = pd.factorize(self.services)
+        self.by_service: Dict = {
+            label: np.flatnonzero(self.service_codes == code)
+            for code, label in enumerate(self.service_labels)
+        }
+        self._rows: Dict = {}
+        self._partitions: Dict = {}
+
+    @staticmethod
+    def _column(data: pd.DataFrame, name: str, default) -> pd.Series:
+        """Colonne de la table des hôpitaux, ou valeur par défaut si elle est absente"""
+        if name in data.columns:
+            return data[name]
+        return pd.Series(default, index=data.index)
+
+    def _compatibility_row(self, service) -> np.ndarray:
+        """
+        Compatibilité du service prédit avec chaque service d'hôpital (1 si identique)
+
+        Un dernier élément nul sert aux hôpitaux sans service (code -1 de pd.factorize).
+        """
+        if service not in self._rows:
+            compatibility = {**SERVICE_COMPATIBILITY.get(service, {}), service: 1.0}
+            self._rows[service] = np.array(
+                [compatibility.get(label, 0.0) for label in self.service_labels] + [0.0], dtype='float64'
+            )
+        return self._rows[service]
+
+    def service_scores(self, service) -> np.ndarray:
+        """Score de correspondance de service de chaque hôpital (1 si identique, partiel si compatible)"""
+        return self._compatibility_row(service)[self.service_codes]
+
+    def partition(self, service) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Hôpitaux candidats pour un service prédit, et borne des autres
+
+        Returns:
+            candidats (indices croissants), autres (indices croissants), puis
+            territoires des autres et meilleur score de capacité des autres par
+            territoire : de quoi majorer le score de tout hôpital non candidat
+        """
+        if service not in self._partitions:
+            compatible = self._compatibility_row(service)[:-1] > 0
+            candidates = np.sort(np.concatenate(
+                [self.by_service[label] for label, keep in zip(self.service_labels, compatible) if keep]
+                or [np.empty(0, dtype=np.int64)]
+            ))
+            others = np.setdiff1d(np.arange(self.size), candidates)
+            territories, inverse = np.unique(self.positions[others], return_inverse=True)
+            # np.fmax : un score de capacité non défini ne doit pas rendre la borne NaN
+            best_capacity = np.zeros(len(territories))
+            np.fmax.at(best_capacity, inverse, self.capacity_scores[others])
+            self._partitions[service] = (candidates, others, territories, best_capacity)
+        return self._partitions[service]
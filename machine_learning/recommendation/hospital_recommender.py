@@ -1,10 +1,13 @@
-import mlflow
 from mlflow.tracking import MlflowClient
 import pandas as pd
 import numpy as np
 from typing import Dict, List
-from geopy.distance import geodesic
-from geopy.geocoders import Nominatim
+from .territory_distances import get_territory_distances
+from .hospital_index import HospitalIndex
+from ..utils.model_registry import load_mlflow_model
+
+# Nombre de patients scorés ensemble par predict_batch (matrices patients × hôpitaux)
+BATCH_CHUNK_SIZE = 1024
 
 class HospitalRecommender:
     """
@@ -17,31 +20,30 @@ class HospitalRecommender:
         self.duration_predictor = None
         self.mlflow_client = MlflowClient()
         self.hospital_data = None
-        self.geolocator = Nominatim(user_agent="hospital_recommender")
+        self.hospital_index = None
+        self.distances = get_territory_distances()
         
     def load_models(self, service_run_id: str, duration_run_id: str):
         """
-        Charge les modèles entraînés depuis MLflow
+        Charge les modèles entraînés depuis MLflow (désérialisés une seule
+        fois par processus, voir utils/model_registry.py)
         
         Args:
             service_run_id: ID MLflow du modèle de classification de service
             duration_run_id: ID MLflow du modèle de prédiction de durée
         """
-        self.service_classifier = mlflow.pycaret.load_model(
-            f"runs:/{service_run_id}/service_classifier"
-        )
-        self.duration_predictor = mlflow.pycaret.load_model(
-            f"runs:/{duration_run_id}/duration_predictor"
-        )
+        self.service_classifier = load_mlflow_model(service_run_id, "service_classifier")
+        self.duration_predictor = load_mlflow_model(duration_run_id, "duration_predictor")
     
     def load_hospital_data(self, data: pd.DataFrame):
         """
-        Charge les données des hôpitaux
+        Charge les données des hôpitaux et précalcule leurs caractéristiques
         
         Args:
             data: DataFrame contenant les informations des hôpitaux
         """
         self.hospital_data = data
+        self.hospital_index = HospitalIndex(data, self.distances)
     
     def predict(self, patient_data: Dict) -> List[Dict]:
         """
@@ -76,60 +78,99 @@ class HospitalRecommender:
         
         return recommendations
     
-    def _calculate_distance_score(self, hospital_location: str, patient_location: str) -> float:
-        """
-        Calcule un score basé sur la distance entre l'hôpital et le patient
+    def predict_batch(
+        self,
+        patients: pd.DataFrame,
+        top_n: int = 5,
+        chunk_size: int = BATCH_CHUNK_SIZE
+    ) -> List[List[Dict]]:
         """
-        try:
-            patient_loc = self.geolocator.geocode(patient_location)
-            hospital_loc = self.geolocator.geocode(hospital_location)
+        Génère les recommandations d'un ensemble de patients
+        
+        Les deux modèles sont appliqués une seule fois à toute la table, puis
+        les patients sont scorés contre tous les hôpitaux par blocs de
+        chunk_size lignes (matrices patients × hôpitaux de taille bornée).
+        
+        Args:
+            patients: Une ligne par patient, mêmes colonnes que predict
+            top_n: Nombre de recommandations par patient
+            chunk_size: Nombre de patients par bloc
             
-            if patient_loc and hospital_loc:
-                distance = geodesic(
-                    (patient_loc.latitude, patient_loc.longitude),
-                    (hospital_loc.latitude, hospital_loc.longitude)
-                ).kilometers
-                
-                # Convertir la distance en score (0-1, plus proche = meilleur score)
-                return 1 / (1 + distance/100)
-        except:
-            return 0
-        return 0
-    
-    def _calculate_capacity_score(self, hospital_data: pd.Series, estimated_duration: float) -> float:
-        """
-        Calcule un score basé sur la capacité d'accueil de l'hôpital
+        Returns:
+            Liste des recommandations de chaque patient (même format que predict),
+            dans l'ordre des lignes de patients
         """
-        # Utiliser le nombre de lits disponibles et le taux d'occupation
-        lit_hospi = hospital_data.get('lit_hospi_complete', 0)
-        occupation = hospital_data.get('hospi_total_24h', 0) / lit_hospi if lit_hospi > 0 else 1
+        if self.hospital_data is None:
+            raise ValueError("Les données des hôpitaux n'ont pas été chargées")
+        if len(patients) == 0:
+            return []
         
-        # Score basé sur la capacité (0-1, plus de capacité = meilleur score)
-        capacity_score = 1 - occupation
+        # 1. et 2. Service et durée prédits pour tous les patients en un appel
+        services = np.asarray(self.service_classifier.predict(patients))
+        durations = np.asarray(self.duration_predictor.predict(patients))
         
-        return max(0, capacity_score)
+        # Scores par service prédit distinct, positions des territoires des patients
+        index = self.hospital_index
+        service_codes, unique_services = pd.factorize(services)
+        service_table = np.vstack([index.service_scores(service) for service in unique_services])
+        regions = patients['region'] if 'region' in patients.columns else pd.Series('', index=patients.index)
+        patient_positions = self.distances.positions([f"{region}, France" for region in regions.astype(str)])
+        
+        # 3. Scores patients × hôpitaux, bloc par bloc
+        recommendations = []
+        for start in range(0, len(patients), chunk_size):
+            stop = min(start + chunk_size, len(patients))
+            service_scores = service_table[service_codes[start:stop]]
+            distance_scores = self._distance_matrix(patient_positions[start:stop], index.positions)
+            scores = (
+                0.4 * service_scores +
+                0.3 * distance_scores +
+                0.3 * index.capacity_scores
+            )
+            for row in range(stop - start):
+                top = self._top_hospitals(scores[row], top_n)
+                recommendations.append(self._recommendations(
+                    top,
+                    top,
+                    scores[row],
+                    service_scores[row],
+                    distance_scores[row],
+                    index.capacity_scores,
+                    durations[start + row]
+                ))
+        return recommendations
     
-    def _calculate_service_score(self, hospital_data: pd.Series, service: str) -> float:
+    def _distance_matrix(self, patient_positions: np.ndarray, hospital_positions: np.ndarray) -> np.ndarray:
         """
-        Calcule un score basé sur la correspondance du service
+        Scores de distance patients × hôpitaux
+        
+        La distance entre centroïdes des territoires est lue dans la matrice
+        précalculée, sans géocodage ni appel réseau, puis convertie en score
+        (0-1, plus proche = meilleur score). Un territoire inconnu donne un
+        score nul.
+        """
+        known = (patient_positions >= 0)[:, None] & (hospital_positions >= 0)[None, :]
+        distances = self.distances.matrix[patient_positions[:, None], hospital_positions[None, :]]
+        return np.where(known, 1 / (1 + distances / 100), 0.0)
+    
+    def _score_hospitals(self, rows: np.ndarray, service: str, patient_position: int):
         """
-        hospital_service = hospital_data.get('classification', '')
+        Scores composite, de service, de distance et de capacité des hôpitaux rows
         
-        # Score parfait si le service correspond exactement
-        if hospital_service == service:
-            return 1.0
-            
-        # Score partiel pour les services compatibles
-        service_compatibility = {
-            'M': {'C': 0.5, 'SSR': 0.3},
-            'C': {'M': 0.5, 'SSR': 0.3},
-            'SSR': {'M': 0.3, 'C': 0.3},
-            'O': {'M': 0.4},
-            'PSY': {'M': 0.2},
-            'ESND': {'SSR': 0.4, 'M': 0.3}
-        }
-        
-        return service_compatibility.get(service, {}).get(hospital_service, 0.0)
+        Les règles de service et de capacité sont celles de HospitalIndex.
+        """
+        index = self.hospital_index
+        service_scores = index.service_scores(service)[rows]
+        distance_scores = self._distance_matrix(np.array([patient_position]), index.positions[rows])[0]
+        capacity_scores = index.capacity_scores[rows]
+        
+        # Calculer le score composite (avec pondération)
+        scores = (
+            0.4 * service_scores +
+            0.3 * distance_scores +
+            0.3 * capacity_scores
+        )
+        return scores, service_scores, distance_scores, capacity_scores
     
     def _get_hospital_recommendations(
         self,
@@ -141,6 +182,10 @@ class HospitalRecommender:
         """
         Calcule les scores et retourne les meilleurs hôpitaux
         
+        Seuls les hôpitaux des services compatibles sont scorés d'abord ; les
+        autres ne le sont que si leur meilleur score possible (distance et
+        capacité, sans score de service) pourrait les faire entrer dans le top.
+        
         Args:
             service: Service médical prédit
             estimated_duration: Durée estimée du séjour
@@ -150,36 +195,66 @@ class HospitalRecommender:
         Returns:
             Liste des meilleurs hôpitaux avec leurs scores
         """
-        recommendations = []
+        patient = self.distances.resolve(f"{patient_data.get('region', '')}, France")
+        patient_position = patient if patient is not None else -1
+        candidates, others, territories, best_capacity = self.hospital_index.partition(service)
         
-        for _, hospital in self.hospital_data.iterrows():
-            # Calculer les différents scores
-            distance_score = self._calculate_distance_score(
-                f"{hospital['nom_region']}, France",
-                f"{patient_data.get('region', '')}, France"
+        rows = candidates
+        scored = self._score_hospitals(rows, service, patient_position)
+        top = self._top_hospitals(scored[0], top_n)
+        if len(others) and top_n > 0:
+            # Majorant du score des hôpitaux non candidats, par territoire
+            bound = np.max(
+                0.3 * self._distance_matrix(np.array([patient_position]), territories)[0] +
+                0.3 * best_capacity
             )
-            
-            capacity_score = self._calculate_capacity_score(hospital, estimated_duration)
-            service_score = self._calculate_service_score(hospital, service)
-            
-            # Calculer le score composite (avec pondération)
-            composite_score = (
-                0.4 * service_score +
-                0.3 * distance_score +
-                0.3 * capacity_score
-            )
-            
-            if composite_score > 0:  # Ne garder que les hôpitaux pertinents
-                recommendations.append({
-                    'hospital_name': hospital.get('nom_region', ''),
-                    'service': hospital.get('classification', ''),
-                    'score': composite_score,
-                    'distance_score': distance_score,
-                    'capacity_score': capacity_score,
-                    'service_score': service_score,
-                    'estimated_duration': estimated_duration
-                })
-        
-        # Trier par score et prendre les top_n
-        recommendations.sort(key=lambda x: x['score'], reverse=True)
-        return recommendations[:top_n]
+            # Comparaison inversée : une borne non définie (NaN) force le balayage complet
+            if len(top) < top_n or not scored[0][top[-1]] > bound:
+                rows = np.arange(self.hospital_index.size)
+                scored = self._score_hospitals(rows, service, patient_position)
+                top = self._top_hospitals(scored[0], top_n)
+        
+        return self._recommendations(rows[top], top, *scored, estimated_duration)
+    
+    def _top_hospitals(self, scores: np.ndarray, top_n: int) -> np.ndarray:
+        """Indices des top_n hôpitaux de score positif, par score décroissant"""
+        # Ne garder que les hôpitaux pertinents
+        relevant = np.flatnonzero(scores > 0)
+        if len(relevant) > top_n > 0:
+            # Présélection des top_n par argpartition, ex æquo du seuil inclus
+            kth = np.argpartition(-scores[relevant], top_n - 1)[top_n - 1]
+            relevant = relevant[scores[relevant] >= scores[relevant[kth]]]
+        
+        # Tri par score décroissant, ordre de la table en cas d'égalité
+        return relevant[np.lexsort((relevant, -scores[relevant]))][:max(top_n, 0)]
+    
+    def _recommendations(
+        self,
+        hospitals: np.ndarray,
+        positions: np.ndarray,
+        scores: np.ndarray,
+        service_scores: np.ndarray,
+        distance_scores: np.ndarray,
+        capacity_scores: np.ndarray,
+        estimated_duration: float
+    ) -> List[Dict]:
+        """
+        Recommandations au format de predict
+        
+        Args:
+            hospitals: Indices des hôpitaux retenus dans la table
+            positions: Indices correspondants dans les tableaux de scores
+        """
+        index = self.hospital_index
+        return [
+            {
+                'hospital_name': index.names[hospital],
+                'service': index.services[hospital],
+                'score': float(scores[i]),
+                'distance_score': float(distance_scores[i]),
+                'capacity_score': float(capacity_scores[i]),
+                'service_score': float(service_scores[i]),
+                'estimated_duration': estimated_duration
+            }
+            for hospital, i in zip(hospitals, positions)
+        ]
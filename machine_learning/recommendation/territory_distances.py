@@ -0,0 +1,101 @@
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+# Table des centroïdes générée par utils/geometry_assets.py à partir des contours de data/
+CENTROIDS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'territory_centroids.csv'
+)
+
+# Rayon terrestre moyen (km)
+EARTH_RADIUS_KM = 6371.0088
+
+# Code de département en tête de libellé ("01 - Ain", "2A", "971 Guadeloupe"...)
+_DEPARTMENT_CODE = re.compile(r'^\s*(2[AB]|\d{2,3})\b', re.IGNORECASE)
+
+
+def normalize_location(location: str) -> str:
+    """Libellé sans accents, casse, tirets ni suffixe ", France" (clé de recherche)"""
+    text = unicodedata.normalize('NFKD', str(location)).encode('ascii', 'ignore').decode()
+    text = re.sub(r',\s*france\s*$', '', text.strip(), flags=re.IGNORECASE)
+    return re.sub(r"[\s\-']+", ' ', text).strip().lower()
+
+
+def haversine_matrix(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Distances orthodromiques (km) entre tous les couples de points"""
+    lat = np.radians(latitudes)[:, None]
+    lon = np.radians(longitudes)[:, None]
+    h = (np.sin((lat - lat.T) / 2) ** 2
+         + np.cos(lat) * np.cos(lat.T) * np.sin((lon - lon.T) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+
+class TerritoryDistances:
+    """
+    Distances entre départements et régions, sans géocodage
+
+    Les territoires sont repérés par leur centroïde (table précalculée) et
+    toutes les distances sont calculées une fois dans une matrice dense :
+    une distance est ensuite une simple lecture de tableau.
+    """
+
+    def __init__(self, centroids: pd.DataFrame):
+        self.centroids = centroids.reset_index(drop=True)
+        self.matrix = haversine_matrix(
+            self.centroids['latitude'].to_numpy(dtype='float64'),
+            self.centroids['longitude'].to_numpy(dtype='float64')
+        )
+
+        # Départements : par code ; tous les territoires : par nom normalisé
+        departements = self.centroids['niveau'] == "Départements"
+        self._codes: Dict[str, int] = {
+            code.upper(): i for i, code in self.centroids.loc[departements, 'code'].items()
+        }
+        self._names: Dict[str, int] = {}
+        for i, nom in self.centroids['nom'].items():
+            self._names.setdefault(normalize_location(nom), i)
+        self._resolved: Dict[str, Optional[int]] = {}
+
+    def resolve(self, location: str) -> Optional[int]:
+        """
+        Position d'un territoire dans la matrice, ou None s'il est inconnu
+
+        Accepte un code de département ("75", "2A", "01 - Ain"), un nom de
+        département ou de région, avec ou sans accents et suffixe ", France".
+        """
+        if location in self._resolved:
+            return self._resolved[location]
+        position = None
+        match = _DEPARTMENT_CODE.match(str(location))
+        if match:
+            position = self._codes.get(match.group(1).upper().zfill(2))
+        if position is None:
+            name = normalize_location(location)
+            position = self._names.get(re.sub(r'^(2[ab]|\d{2,3})\s*', '', name), self._names.get(name))
+        self._resolved[location] = position
+        return position
+
+    def positions(self, locations: Sequence[str]) -> np.ndarray:
+        """Positions de plusieurs territoires (-1 pour un territoire inconnu)"""
+        return np.array([
+            position if position is not None else -1
+            for position in map(self.resolve, locations)
+        ], dtype=np.int64)
+
+    def distance_km(self, origin: str, destination: str) -> Optional[float]:
+        """Distance entre les centroïdes de deux territoires, None si l'un est inconnu"""
+        i, j = self.resolve(origin), self.resolve(destination)
+        if i is None or j is None:
+            return None
+        return float(self.matrix[i, j])
+
+
+@lru_cache(maxsize=1)
+def get_territory_distances(path: str = CENTROIDS_PATH) -> TerritoryDistances:
+    """Matrice des distances partagée par tout le processus"""
+    centroids = pd.read_csv(path, dtype={'code': str})
+    return TerritoryDistances(centroids)
@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+import pandas as pd
+from ..hospital_recommender import HospitalRecommender
+from ..territory_distances import get_territory_distances
+
+SERVICES = ['M', 'C', 'SSR', 'O', 'PSY', 'ESND', 'X']
+
+
+class TestCandidatePruning(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.recommender = HospitalRecommender()
+        cls.territories = list(get_territory_distances().centroids['nom'][:20])
+
+    def random_hospitals(self, rng, n=150, null_share=0.1):
+        """Table d'hôpitaux aléatoire, avec des capacités non renseignées"""
+        data = pd.DataFrame({
+            'nom_region': rng.choice(self.territories + ['Inconnu'], n),
+            'classification': rng.choice(SERVICES, n),
+            'lit_hospi_complete': rng.integers(0, 50, n).astype('float64'),
+            'hospi_total_24h': rng.integers(0, 60, n).astype('float64')
+        })
+        data.loc[rng.random(n) < null_share, 'hospi_total_24h'] = np.nan
+        data.loc[rng.random(n) < null_share / 2, 'lit_hospi_complete'] = np.nan
+        return data
+
+    def exhaustive(self, service, region, top_n):
+        """Top des hôpitaux en scorant toute la table"""
+        distances = self.recommender.distances
+        patient = distances.resolve(f"{region}, France")
+        rows = np.arange(self.recommender.hospital_index.size)
+        scores = self.recommender._score_hospitals(rows, service, patient if patient is not None else -1)[0]
+        top = self.recommender._top_hospitals(scores, top_n)
+        return [(self.recommender.hospital_index.names[i], scores[i]) for i in top]
+
+    def assertSameTop(self, service, region, top_n):
+        expected = self.exhaustive(service, region, top_n)
+        recommendations = self.recommender._get_hospital_recommendations(service, 3.0, {'region': region}, top_n)
+        self.assertEqual([name for name, _ in expected], [rec['hospital_name'] for rec in recommendations])
+        np.testing.assert_allclose([score for _, score in expected], [rec['score'] for rec in recommendations])
+
+    def test_pruned_matches_exhaustive(self):
+        """Candidats d'abord puis borne des autres : même top qu'en scorant tout"""
+        for table in range(50):
+            rng = np.random.default_rng(table)
+            self.recommender.load_hospital_data(self.random_hospitals(rng))
+            for service in ('M', 'PSY', 'O', 'Z'):
+                for top_n in (1, 5, 20):
+                    with self.subTest(table=table, service=service, top_n=top_n):
+                        self.assertSameTop(service, rng.choice(self.territories + ['Inconnu']), top_n)
+
+    def test_null_capacity_columns(self):
+        """Colonnes de capacité entièrement vides : score de capacité nul, aucun NaN"""
+        rng = np.random.default_rng(0)
+        data = self.random_hospitals(rng)
+        data['hospi_total_24h'] = np.nan
+        self.recommender.load_hospital_data(data)
+        self.assertFalse(np.isnan(self.recommender.hospital_index.capacity_scores).any())
+        for service in ('M', 'ESND'):
+            self.assertSameTop(service, self.territories[0], 5)
+
+if __name__ == '__main__':
+    unittest.main()
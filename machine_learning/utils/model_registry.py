@@ -0,0 +1,159 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Nombre maximal de modèles désérialisés gardés en mémoire
+MODEL_CACHE_SIZE = int(os.environ.get("MEDICAL_DATA_MODEL_CACHE_SIZE", "8"))
+
+# Modèles à précharger au démarrage de l'application : "run_id/artifact_path" séparés par des virgules
+WARM_MODELS = os.environ.get("MEDICAL_DATA_WARM_MODELS", "")
+
+
+class ModelRegistry:
+    """
+    Cache LRU des modèles désérialisés, partagé par tout le processus.
+
+    Les modèles sont indexés par (run_id, artifact_path). Un modèle en cours
+    de chargement n'est désérialisé qu'une fois : les autres demandeurs (par
+    exemple une prédiction arrivant pendant le préchargement) attendent le
+    même chargement au lieu de le refaire.
+    """
+
+    def __init__(self, max_models: int):
+        self.max_models = max_models
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._loading: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, load: Callable[[], object]) -> object:
+        """Modèle en cache, ou chargé par load() puis mis en cache"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Chargé entre-temps par un autre thread
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key]
+                self.misses += 1
+            try:
+                model = load()
+            except BaseException:
+                with self._lock:
+                    self._loading.pop(key, None)
+                raise
+            # Mis en cache avant de libérer le verrou de chargement : un
+            # demandeur arrivant entre-temps trouve l'entrée, pas un nouveau verrou
+            self.put(key, model)
+            with self._lock:
+                self._loading.pop(key, None)
+            return model
+
+    def put(self, key: Hashable, model: object):
+        with self._lock:
+            self._entries[key] = model
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_models:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'modeles': len(self._entries),
+                'max_modeles': self.max_models,
+                'succes': self.hits,
+                'echecs': self.misses,
+                'evictions': self.evictions,
+                'taux_succes_percent': 100 * self.hits / requests if requests else 0.0
+            }
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Registre unique pour le processus"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(MODEL_CACHE_SIZE)
+        return _registry
+
+
+def load_mlflow_model(run_id: str, artifact_path: str) -> object:
+    """Pipeline PyCaret d'un run MLflow, désérialisé une seule fois par processus"""
+    def load():
+        import mlflow.pycaret
+        return mlflow.pycaret.load_model(f"runs:/{run_id}/{artifact_path}")
+    return get_model_registry().get((run_id, artifact_path), load)
+
+
+def load_mlflow_dict(run_id: str, artifact_file: str) -> Dict:
+    """Artefact JSON d'un run MLflow (encodeurs...), téléchargé une seule fois par processus"""
+    def load():
+        import mlflow
+        return mlflow.load_dict(f"runs:/{run_id}/{artifact_file}")
+    return get_model_registry().get((run_id, artifact_file), load)
+
+
+def parse_model_keys(spec: str) -> List[Tuple[str, str]]:
+    """Clés (run_id, artifact_path) d'une liste "run_id/artifact_path,..." """
+    keys = []
+    for item in spec.split(','):
+        item = item.strip()
+        if '/' in item:
+            run_id, artifact_path = item.split('/', 1)
+            keys.append((run_id, artifact_path))
+    return keys
+
+
+def warm_up(keys: Iterable[Tuple[str, str]], background: bool = True) -> Optional[threading.Thread]:
+    """
+    Précharge des modèles dans le registre
+
+    Args:
+        keys: Couples (run_id, artifact_path) à charger
+        background: Charger dans un thread démon (le démarrage n'attend pas)
+
+    Returns:
+        Le thread de préchargement, ou None en mode synchrone
+    """
+    keys = list(keys)
+
+    def run():
+        for run_id, artifact_path in keys:
+            try:
+                load_mlflow_model(run_id, artifact_path)
+            except Exception as e:
+                logging.warning(f"Préchargement du modèle {run_id}/{artifact_path} impossible : {e}")
+
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, name="model-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def warm_up_from_env() -> Optional[threading.Thread]:
+    """Préchargement des modèles listés dans MEDICAL_DATA_WARM_MODELS, s'il y en a"""
+    keys = parse_model_keys(WARM_MODELS)
+    return warm_up(keys) if keys else None
@@ -3,7 +3,12 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from google.cloud import bigquery
+from utils.data_store import get_view
+from utils.animation_frames import interpolate_frames, scatter3d_animation_json
+from utils.figure_cache import cached_figure
+from utils.view_specs import (
+    VUE_GLOBALE_NBR_HOSPI, VUE_GLOBALE_DUREE_HOSPI, VUE_GLOBALE_TRANCHE_AGE_HOSPI, VUE_GLOBALE_CAPACITE
+)
 from streamlit_extras.metric_cards import style_metric_cards 
 import time
 import folium
@@ -63,55 +68,15 @@ ACCENT_COLOR = '#3D7317'  # Vert foncé pour les accents
 @st.cache_resource
 def fetch_data():
     try:
-        # Chargement des secrets
-        gcp_service_account = st.secrets["gcp_service_account"]
-        client = bigquery.Client.from_service_account_info(gcp_service_account)
-        
-        # Chargement du dataset principal qui contient toutes les données
-        df_complet = client.query('''
-            SELECT * FROM `projet-jbn-data-le-wagon.dbt_medical_analysis_join_total_morbidite.class_join_total_morbidite_sexe_population`
-        ''').to_dataframe()
-        
-        # Convertir les colonnes year en datetime
-        df_complet['year'] = pd.to_datetime(df_complet['year'])
-        
-        # Créer des vues spécifiques pour maintenir la compatibilité avec le code existant
-        df_nbr_hospi = df_complet[[
-            'niveau', 'year', 'region', 'nom_region', 'pathologie', 'nom_pathologie', 'sexe',
-            'nbr_hospi', 'evolution_nbr_hospi', 'evolution_percent_nbr_hospi','hospi_prog_24h','hospi_autres_24h','hospi_total_24h',
-            'hospi_1J','hospi_2J','hospi_3J','hospi_4J','hospi_5J','hospi_6J','hospi_7J','hospi_8J','hospi_9J','hospi_10J_19J','hospi_20J_29J',
-            'hospi_30J','hospi_total_jj','total_hospi','evolution_hospi_total_24h','evolution_percent_hospi_total_24h','evolution_hospi_total_jj',
-            'evolution_percent_hospi_total_jj','evolution_total_hospi','evolution_percent_total_hospi','evolution_hospi_total_24h', 'evolution_hospi_total_jj',
-            'indice_comparatif_tt_age_percent',
-            'tranche_age_0_1', 'tranche_age_1_4', 'tranche_age_5_14',
-            'tranche_age_15_24', 'tranche_age_25_34', 'tranche_age_35_44',
-            'tranche_age_45_54', 'tranche_age_55_64', 'tranche_age_65_74',
-            'tranche_age_75_84', 'tranche_age_85_et_plus','classification',
-        ]].copy()
+        # Vues projetées à la source (colonnes utiles uniquement), partagées entre sessions ;
+        # la vue nombre d'hospitalisations sert aussi de dataset principal (colonne year déjà en datetime)
+        df_nbr_hospi = get_view(VUE_GLOBALE_NBR_HOSPI)
+        df_duree_hospi = get_view(VUE_GLOBALE_DUREE_HOSPI)
+        df_tranche_age_hospi = get_view(VUE_GLOBALE_TRANCHE_AGE_HOSPI)
+        df_complet = df_nbr_hospi
 
-        df_duree_hospi = df_complet[[
-            'niveau','year', 'region', 'nom_region', 'pathologie', 'nom_pathologie', 'sexe',
-            'AVG_duree_hospi', 'evolution_AVG_duree_hospi', 'evolution_percent_AVG_duree_hospi',
-            'evolution_hospi_total_jj','classification',
-        ]].copy()
-
-        df_tranche_age_hospi = df_complet[[
-            'niveau','year', 'region', 'nom_region', 'pathologie', 'nom_pathologie',
-            'tranche_age_0_1', 'tranche_age_1_4', 'tranche_age_5_14',
-            'tranche_age_15_24', 'tranche_age_25_34', 'tranche_age_35_44',
-            'tranche_age_45_54', 'tranche_age_55_64', 'tranche_age_65_74',
-            'tranche_age_75_84', 'tranche_age_85_et_plus',
-            'tx_brut_tt_age_pour_mille', 'tx_standard_tt_age_pour_mille',
-            'indice_comparatif_tt_age_percent','classification'
-        ]].copy()
-        
         # Charger uniquement les données de capacité
-        df_capacite_hospi = client.query('''
-            SELECT * FROM `projet-jbn-data-le-wagon.dbt_medical_analysis_join_total_morbidite_capacite.class_join_total_morbidite_capacite`
-        ''').to_dataframe()
-        
-        # Convertir la colonne year en datetime pour df_capacite_hospi
-        df_capacite_hospi['year'] = pd.to_datetime(df_capacite_hospi['year'])
+        df_capacite_hospi = get_view(VUE_GLOBALE_CAPACITE)
         
         return df_nbr_hospi, df_duree_hospi, df_tranche_age_hospi, df_capacite_hospi, df_complet
         
@@ -132,12 +97,75 @@ def calculate_main_metrics(df_nbr_hospi, df_capacite_hospi, selected_sex='Ensemb
 
     # Calcul des lits disponibles par année
     df_capacite_filtered = df_capacite_hospi[df_capacite_hospi['niveau'] == 'Départements']
-    lits_disponibles = df_capacite_filtered.groupby('year')['lit_hospi_complete'].sum().reset_index()
+    lits_disponibles = df_capacite_filtered.groupby('year', observed=True)['lit_hospi_complete'].sum().reset_index()
     for year in range(2018, 2023):
         metrics[f"lits_{year}"] = lits_disponibles[lits_disponibles['year'].dt.year == year]['lit_hospi_complete'].sum()
     
     return metrics
 
+# Graphique 3D animé des pathologies (toutes années, tous territoires)
+def build_pathologies_3d_json(top_pathologies):
+    df_nbr_hospi, df_duree_hospi, df_tranche_age_hospi, _, _ = fetch_data()
+
+    # Fusion des données avec les trois métriques
+    combined_data_3d = pd.merge(
+        df_nbr_hospi.groupby(['nom_pathologie', 'year'], observed=True)['nbr_hospi'].sum().reset_index(),
+        df_duree_hospi.groupby(['nom_pathologie', 'year'], observed=True)['AVG_duree_hospi'].mean().reset_index(),
+        on=['nom_pathologie', 'year']
+    )
+    combined_data_3d = pd.merge(
+        combined_data_3d,
+        df_tranche_age_hospi.groupby(['nom_pathologie', 'year'], observed=True)['indice_comparatif_tt_age_percent'].mean().reset_index(),
+        on=['nom_pathologie', 'year']
+    )
+
+    # Filtrer pour garder seulement les pathologies les plus fréquentes
+    combined_data_3d = combined_data_3d[combined_data_3d['nom_pathologie'].isin(top_pathologies)]
+    combined_data_3d = combined_data_3d.assign(annee=combined_data_3d['year'].dt.year)
+
+    return scatter3d_animation_json(
+        interpolate_frames(combined_data_3d, 'annee'),
+        'Viridis',
+        title=dict(
+            text='Évolution des pathologies selon trois dimensions clés',
+            y=0.95,
+            x=0.4,
+            xanchor='right',
+            yanchor='top'
+        ),
+        scene=dict(
+            xaxis_title='Nombre d\'hospitalisations',
+            yaxis_title='Durée moyenne de séjour (jours)',
+            zaxis_title='Indice comparatif (%)',
+            camera=dict(
+                up=dict(x=0, y=0, z=1),
+                center=dict(x=0, y=0, z=0),
+                eye=dict(x=1.5, y=1.5, z=1.5)
+            )
+        ),
+        showlegend=True,
+        legend=dict(
+            yanchor="top",
+            y=0.99,
+            xanchor="right",
+            x=0.99
+        ),
+        width=800,
+        height=600,
+        template='plotly_white',
+        annotations=[
+            dict(
+                text="<b>Légende</b> : <br>La taille des points représente le nombre d'hospitalisations<br>La couleur indique la durée moyenne de séjour",
+                showarrow=False,
+                xref="paper", yref="paper",
+                x=0.8, y=1.1,
+                align="left",
+                xanchor="left"
+            )
+        ],
+        margin=dict(t=100, b=50, l=50, r=50)  # Augmenter la marge du haut pour plus d'espace
+    )
+
 # Interface de chargement
 def load_with_progress():
     # Centrer le GIF avec du CSS personnalisé
@@ -358,10 +386,10 @@ if df_nbr_hospi is not None:
         # Affichage des lits disponibles
 
         # Graph 1 Préparation des données
-        hospi_by_year = df_nbr_hospi_filtered.groupby('year')['nbr_hospi'].sum().reset_index()
-        duree_by_year = df_duree_hospi_filtered.groupby('year')['AVG_duree_hospi'].mean().reset_index()
+        hospi_by_year = df_nbr_hospi_filtered.groupby('year', observed=True)['nbr_hospi'].sum().reset_index()
+        duree_by_year = df_duree_hospi_filtered.groupby('year', observed=True)['AVG_duree_hospi'].mean().reset_index()
 
-        capacite_by_year = df_capacite_hospi_filtered.groupby('year')[['lit_hospi_complete','place_hospi_partielle','passage_urgence']].sum().reset_index()
+        capacite_by_year = df_capacite_hospi_filtered.groupby('year', observed=True)[['lit_hospi_complete','place_hospi_partielle','passage_urgence']].sum().reset_index()
         capacite_by_year['capacite_totale'] = capacite_by_year['lit_hospi_complete'] + capacite_by_year['place_hospi_partielle']
 
         # Création du graphique pour les barres
@@ -515,7 +543,7 @@ if df_nbr_hospi is not None:
             territory_col = 'nom_region'
             territory_label = "région" if niveau_administratif == "Régions" else "département"
             
-            hospi_by_territory = df_nbr_hospi_filtered.groupby(territory_col)['nbr_hospi'].sum().reset_index()
+            hospi_by_territory = df_nbr_hospi_filtered.groupby(territory_col, observed=True)['nbr_hospi'].sum().reset_index()
             hospi_by_territory = hospi_by_territory.sort_values(by='nbr_hospi', ascending=True)
             
             fig = px.bar(hospi_by_territory, x='nbr_hospi', y=territory_col,
@@ -538,7 +566,7 @@ if df_nbr_hospi is not None:
         
         with col2:
             # Regrouper les données par territoire et calculer les proportions
-            rapport_by_territory = df_nbr_hospi_filtered.groupby(territory_col)[['hospi_total_24h', 'hospi_total_jj', 'total_hospi']].sum().reset_index()
+            rapport_by_territory = df_nbr_hospi_filtered.groupby(territory_col, observed=True)[['hospi_total_24h', 'hospi_total_jj', 'total_hospi']].sum().reset_index()
             rapport_by_territory['percent_hospi_total_24h'] = 100 * rapport_by_territory['hospi_total_24h'] / rapport_by_territory['total_hospi']
             rapport_by_territory['percent_hospi_total_jj'] = 100 * rapport_by_territory['hospi_total_jj'] / rapport_by_territory['total_hospi']
             rapport_by_territory = rapport_by_territory.sort_values(by='total_hospi', ascending=True)
@@ -643,11 +671,11 @@ if df_nbr_hospi is not None:
         n_pathologies = st.slider("Nombre de pathologies à afficher", 5, 159, 20)
         
         # Top pathologies par nombre d'hospitalisations
-        hospi_by_pathology = df_nbr_hospi_filtered.groupby('nom_pathologie')['nbr_hospi'].sum().reset_index()
+        hospi_by_pathology = df_nbr_hospi_filtered.groupby('nom_pathologie', observed=True)['nbr_hospi'].sum().reset_index()
         hospi_by_pathology = hospi_by_pathology.sort_values(by='nbr_hospi', ascending=False).head(n_pathologies)
         
         # Ajout des données de durée moyenne
-        duree_data = df_duree_hospi_filtered.groupby('nom_pathologie')['AVG_duree_hospi'].mean().reset_index()
+        duree_data = df_duree_hospi_filtered.groupby('nom_pathologie', observed=True)['AVG_duree_hospi'].mean().reset_index()
         hospi_by_pathology = pd.merge(hospi_by_pathology, duree_data, on='nom_pathologie', how='left')
 
         # Création d'une figure avec deux axes Y
@@ -712,13 +740,13 @@ if df_nbr_hospi is not None:
         # Graphique combiné (scatter plot)
         # Fusion des données d'hospitalisation et de durée par année
         combined_data = pd.merge(
-            df_nbr_hospi.groupby(['nom_pathologie', 'year'])['nbr_hospi'].sum().reset_index(),
-            df_duree_hospi.groupby(['nom_pathologie', 'year'])['AVG_duree_hospi'].mean().reset_index(),
+            df_nbr_hospi.groupby(['nom_pathologie', 'year'], observed=True)['nbr_hospi'].sum().reset_index(),
+            df_duree_hospi.groupby(['nom_pathologie', 'year'], observed=True)['AVG_duree_hospi'].mean().reset_index(),
             on=['nom_pathologie', 'year']
         )
         
         # Filtrer pour garder seulement les n_pathologies plus fréquentes par année
-        top_pathologies = df_nbr_hospi_filtered.groupby('nom_pathologie')['nbr_hospi'].sum().nlargest(n_pathologies).index
+        top_pathologies = df_nbr_hospi_filtered.groupby('nom_pathologie', observed=True)['nbr_hospi'].sum().nlargest(n_pathologies).index
         combined_data = combined_data[combined_data['nom_pathologie'].isin(top_pathologies)]
 
         # Normalisation des valeurs pour la taille des points
@@ -781,224 +809,12 @@ if df_nbr_hospi is not None:
         with col_help:
             st.metric(label="help", value="", help="Ce graphique animé montre l'évolution de la relation entre le nombre d'hospitalisations et la durée moyenne de séjour pour chaque pathologie au fil des années. La taille des bulles représente le nombre d'hospitalisations.")
 
-        # Graphique 3D
-        # Fusion des données avec les trois métriques
-        combined_data_3d = pd.merge(
-            df_nbr_hospi.groupby(['nom_pathologie', 'year'])['nbr_hospi'].sum().reset_index(),
-            df_duree_hospi.groupby(['nom_pathologie', 'year'])['AVG_duree_hospi'].mean().reset_index(),
-            on=['nom_pathologie', 'year']
-        )
-        combined_data_3d = pd.merge(
-            combined_data_3d,
-            df_tranche_age_hospi.groupby(['nom_pathologie', 'year'])['indice_comparatif_tt_age_percent'].mean().reset_index(),
-            on=['nom_pathologie', 'year']
-        )
-
-        # Filtrer pour garder seulement les n_pathologies plus fréquentes
-        top_pathologies = df_nbr_hospi_filtered.groupby('nom_pathologie')['nbr_hospi'].sum().nlargest(n_pathologies).index
-        combined_data_3d = combined_data_3d[combined_data_3d['nom_pathologie'].isin(top_pathologies)]
-
-        # Création du graphique 3D avec animation
-        fig = go.Figure()
-
-        # Créer les frames pour l'animation avec interpolation
-        frames = []
-        years = sorted(combined_data_3d['year'].dt.year.unique())
-        
-        for i in range(len(years)):
-            current_year = years[i]
-            current_data = combined_data_3d[combined_data_3d['year'].dt.year == current_year].copy()
-            
-            # Nettoyer les valeurs NA
-            current_data = current_data.dropna(subset=['nbr_hospi', 'AVG_duree_hospi', 'indice_comparatif_tt_age_percent'])
-            
-            # Ajouter la frame pour l'année actuelle
-            frame = go.Frame(
-                data=[go.Scatter3d(
-                    x=current_data['nbr_hospi'].tolist(),
-                    y=current_data['AVG_duree_hospi'].tolist(),
-                    z=current_data['indice_comparatif_tt_age_percent'].tolist(),
-                    mode='markers+text',
-                    text=current_data['nom_pathologie'].tolist(),
-                    textposition='top center',
-                    marker=dict(
-                        size=[x/current_data['nbr_hospi'].max()*30 for x in current_data['nbr_hospi']],
-                        color=current_data['AVG_duree_hospi'].tolist(),
-                        colorscale='Viridis',
-                        opacity=0.8,
-                        colorbar=dict(title="Durée moyenne de séjour (jours)")
-                    ),
-                    hovertemplate="<b>%{text}</b><br>" +
-                                 f"Année: {current_year}<br>" +
-                                 "Hospitalisations: %{x:,.0f}<br>" +
-                                 "Durée moyenne: %{y:.1f} jours<br>" +
-                                 "Indice comparatif: %{z:.1f}%<br>" +
-                                 "<extra></extra>"
-                )],
-                name=str(current_year)
-            )
-            frames.append(frame)
-            
-            # Créer des frames intermédiaires si ce n'est pas la dernière année
-            if i < len(years) - 1:
-                next_year = years[i + 1]
-                next_data = combined_data_3d[combined_data_3d['year'].dt.year == next_year].copy()
-                next_data = next_data.dropna(subset=['nbr_hospi', 'AVG_duree_hospi', 'indice_comparatif_tt_age_percent'])
-                
-                # S'assurer que les données sont alignées
-                common_pathologies = sorted(list(set(current_data['nom_pathologie']) & set(next_data['nom_pathologie'])))
-                current_data = current_data[current_data['nom_pathologie'].isin(common_pathologies)].sort_values('nom_pathologie')
-                next_data = next_data[next_data['nom_pathologie'].isin(common_pathologies)].sort_values('nom_pathologie')
-                
-                # Créer 5 frames intermédiaires entre chaque année
-                for step in range(1, 6):
-                    # Interpolation linéaire entre les années
-                    alpha = step / 6.0
-                    
-                    # Calculer les valeurs interpolées
-                    nbr_hospi = (current_data['nbr_hospi'].values * (1-alpha) + next_data['nbr_hospi'].values * alpha).tolist()
-                    avg_duree = (current_data['AVG_duree_hospi'].values * (1-alpha) + next_data['AVG_duree_hospi'].values * alpha).tolist()
-                    indice = (current_data['indice_comparatif_tt_age_percent'].values * (1-alpha) + next_data['indice_comparatif_tt_age_percent'].values * alpha).tolist()
-                    
-                    # Calculer la taille des points
-                    max_hospi = max(nbr_hospi) if nbr_hospi else 1  # Éviter la division par zéro
-                    point_sizes = [x/max_hospi*30 for x in nbr_hospi]
-                    
-                    frame = go.Frame(
-                        data=[go.Scatter3d(
-                            x=nbr_hospi,
-                            y=avg_duree,
-                            z=indice,
-                            mode='markers+text',
-                            text=current_data['nom_pathologie'].tolist(),
-                            textposition='top center',
-                            marker=dict(
-                                size=point_sizes,
-                                color=avg_duree,
-                                colorscale='Viridis',
-                                opacity=0.8,
-                                colorbar=dict(title="Durée moyenne de séjour (jours)")
-                            ),
-                            hovertemplate="<b>%{text}</b><br>" +
-                                         f"Transition {current_year}-{next_year}<br>" +
-                                         "Hospitalisations: %{x:,.0f}<br>" +
-                                         "Durée moyenne: %{y:.1f} jours<br>" +
-                                         "Indice comparatif: %{z:.1f}%<br>" +
-                                         "<extra></extra>"
-                        )],
-                        name=f"{current_year}_{step}"
-                    )
-                    frames.append(frame)
-            
-            # Ajouter la première année comme trace initiale
-            if current_year == years[0]:
-                fig.add_trace(frame.data[0])
-
-        fig.frames = frames
-
-        # Mise à jour des steps pour inclure uniquement les années principales
-        steps = []
-        for year in years:
-            step = dict(
-                method="animate",
-                args=[[str(year)], {
-                    "frame": {"duration": 300, "redraw": True},
-                    "mode": "immediate",
-                    "transition": {"duration": 300}
-                }],
-                label=str(year)
-            )
-            steps.append(step)
-
-        sliders = [dict(
-            active=0,
-            currentvalue={"prefix": "Année: "},
-            pad={"t": 50},
-            steps=steps
-        )]
-        
-        # Mise en page du graphique 3D
-        fig.update_layout(
-            title=dict(
-                text='Évolution des pathologies selon trois dimensions clés',
-                y=0.95,
-                x=0.4,
-                xanchor='right',
-                yanchor='top'
-            ),
-            scene=dict(
-                xaxis_title='Nombre d\'hospitalisations',
-                yaxis_title='Durée moyenne de séjour (jours)',
-                zaxis_title='Indice comparatif (%)',
-                camera=dict(
-                    up=dict(x=0, y=0, z=1),
-                    center=dict(x=0, y=0, z=0),
-                    eye=dict(x=1.5, y=1.5, z=1.5)
-                )
-            ),
-            showlegend=True,
-            legend=dict(
-                yanchor="top",
-                y=0.99,
-                xanchor="right",
-                x=0.99
-            ),
-            width=800,
-            height=600,
-            template='plotly_white',
-            sliders=sliders,
-            annotations=[
-                dict(
-                    text="<b>Légende</b> : <br>La taille des points représente le nombre d'hospitalisations<br>La couleur indique la durée moyenne de séjour",
-                    showarrow=False,
-                    xref="paper", yref="paper",
-                    x=0.8, y=1.1,
-                    align="left",
-                    xanchor="left"
-                )
-            ],
-            margin=dict(t=100, b=50, l=50, r=50)  # Augmenter la marge du haut pour plus d'espace
-        )
-
-        # Ajout de configuration pour une animation plus fluide
-        fig.update_traces(
-            hoverinfo="none",  # Désactiver temporairement le hover pendant l'animation
-            customdata=combined_data_3d[['nom_pathologie', 'nbr_hospi', 'AVG_duree_hospi', 'indice_comparatif_tt_age_percent']].values,
-        )
-        
-        # Ajout des boutons de contrôle pour l'animation
-        fig.update_layout(
-            updatemenus=[{
-                "buttons": [
-                    {
-                        "args": [None, {
-                            "frame": {"duration": 300, "redraw": True},
-                            "fromcurrent": True,
-                            "transition": {"duration": 300},
-                            "mode": "immediate"
-                        }],
-                        "label": "Lecture",
-                        "method": "animate"
-                    },
-                    {
-                        "args": [[None], {
-                            "frame": {"duration": 0, "redraw": True},
-                            "mode": "immediate",
-                            "transition": {"duration": 0}
-                        }],
-                        "label": "Pause",
-                        "method": "animate"
-                    }
-                ],
-                "direction": "left",
-                "pad": {"r": 10, "t": 87},
-                "showactive": False,
-                "type": "buttons",
-                "x": 0.0,
-                "xanchor": "right",
-                "y": 0,
-                "yanchor": "top"
-            }]
+        # Graphique 3D (figure sérialisée mise en cache par sélection de pathologies)
+        top_pathologies = df_nbr_hospi_filtered.groupby('nom_pathologie', observed=True)['nbr_hospi'].sum().nlargest(n_pathologies).index
+        fig = cached_figure(
+            'vue_globale', 'pathologies_3d', tuple(top_pathologies),
+            [VUE_GLOBALE_NBR_HOSPI, VUE_GLOBALE_DUREE_HOSPI, VUE_GLOBALE_TRANCHE_AGE_HOSPI],
+            lambda: build_pathologies_3d_json(tuple(top_pathologies))
         )
 
         # Affichage du graphique
@@ -1020,15 +836,15 @@ if df_nbr_hospi is not None:
             next_year = years[i+1]
             
             # Données pour l'année courante et suivante
-            current_data = df_filtered[df_filtered['annee'] == current_year].groupby('nom_pathologie')['nbr_hospi'].sum()
-            next_data = df_filtered[df_filtered['annee'] == next_year].groupby('nom_pathologie')['nbr_hospi'].sum()
+            current_data = df_filtered[df_filtered['annee'] == current_year].groupby('nom_pathologie', observed=True)['nbr_hospi'].sum()
+            next_data = df_filtered[df_filtered['annee'] == next_year].groupby('nom_pathologie', observed=True)['nbr_hospi'].sum()
             
             # Calculer l'évolution en pourcentage
             evolution = ((next_data - current_data) / current_data * 100).fillna(0)
             evolutions_by_year[f'{current_year}-{next_year}'] = evolution
             
         # Créer le DataFrame de base avec le nombre total d'hospitalisations
-        df_summary = df_filtered.groupby('nom_pathologie')['nbr_hospi'].sum().reset_index()
+        df_summary = df_filtered.groupby('nom_pathologie', observed=True)['nbr_hospi'].sum().reset_index()
         
         # Ajouter les évolutions année par année
         for period, evolution in evolutions_by_year.items():
@@ -1039,8 +855,8 @@ if df_nbr_hospi is not None:
             )
         
         # Calculer l'évolution globale (2018-2022)
-        hospi_2018 = df_filtered[df_filtered['annee'] == min(years)].groupby('nom_pathologie')['nbr_hospi'].sum()
-        hospi_2022 = df_filtered[df_filtered['annee'] == max(years)].groupby('nom_pathologie')['nbr_hospi'].sum()
+        hospi_2018 = df_filtered[df_filtered['annee'] == min(years)].groupby('nom_pathologie', observed=True)['nbr_hospi'].sum()
+        hospi_2022 = df_filtered[df_filtered['annee'] == max(years)].groupby('nom_pathologie', observed=True)['nbr_hospi'].sum()
         evolution_globale = ((hospi_2022 - hospi_2018) / hospi_2018 * 100).fillna(0)
         
         # Ajouter l'évolution globale au DataFrame
@@ -1171,7 +987,7 @@ if df_nbr_hospi is not None:
             st.subheader(" Évolution des taux")
             
             # Calcul de l'évolution des taux standardisés
-            evolution_taux = df_tranche_age_hospi_filtered.groupby('year').agg({
+            evolution_taux = df_tranche_age_hospi_filtered.groupby('year', observed=True).agg({
                 'tx_standard_tt_age_pour_mille': 'mean',
                 'tx_brut_tt_age_pour_mille': 'mean'
             }).reset_index()
@@ -1277,7 +1093,6 @@ if df_nbr_hospi is not None:
         hospi_columns = ['year', 'region', 'nom_region', 'pathologie', 'nom_pathologie', 'nbr_hospi']
         df_hospi = df_nbr_hospi[hospi_columns].copy()
         df_hospi['year'] = pd.to_datetime(df_hospi['year']).dt.date
-        df_hospi['nbr_hospi'] = df_hospi['nbr_hospi'].astype('float32')
         return df_hospi
 
     @st.cache_data
@@ -1285,7 +1100,6 @@ if df_nbr_hospi is not None:
         duree_columns = ['year', 'region', 'nom_region', 'pathologie', 'nom_pathologie', 'sexe', 'AVG_duree_hospi']
         df_duree = df_duree_hospi[duree_columns].copy()
         df_duree['year'] = pd.to_datetime(df_duree['year']).dt.date
-        df_duree['AVG_duree_hospi'] = df_duree['AVG_duree_hospi'].astype('float32')
         return df_duree
 
     @st.cache_data
@@ -1294,8 +1108,6 @@ if df_nbr_hospi is not None:
                       'tx_brut_tt_age_pour_mille', 'tx_standard_tt_age_pour_mille']
         df_age = df_tranche_age_hospi[age_columns].copy()
         df_age['year'] = pd.to_datetime(df_age['year']).dt.date
-        df_age['tx_brut_tt_age_pour_mille'] = df_age['tx_brut_tt_age_pour_mille'].astype('float32')
-        df_age['tx_standard_tt_age_pour_mille'] = df_age['tx_standard_tt_age_pour_mille'].astype('float32')
         return df_age
         
     # Création d'un nouvel onglet pour l'analyse par service médical
@@ -1342,7 +1154,7 @@ if df_nbr_hospi is not None:
 
         age_columns = [col for col in df_service.columns if col.startswith('tranche_age_')]
         
-        df_age_service = df_service_filtered.groupby('classification')[age_columns].mean().reset_index()
+        df_age_service = df_service_filtered.groupby('classification', observed=True)[age_columns].mean().reset_index()
         df_age_service_melted = pd.melt(
             df_age_service,
             id_vars=['classification'],
@@ -1372,7 +1184,7 @@ if df_nbr_hospi is not None:
 
         # Création du dataframe pour les tranches d'âge regroupées
         age_groups = ['Enfants (0-14)', 'Jeunes (15-24)', 'Adultes (25-44)', 'Seniors (45-64)', 'Personnes âgées (65+)']
-        df_age_grouped = df_service_filtered.groupby('classification').agg({
+        df_age_grouped = df_service_filtered.groupby('classification', observed=True).agg({
             'age_enfants': 'mean',
             'age_jeunes': 'mean',
             'age_adultes': 'mean',
@@ -1383,7 +1195,7 @@ if df_nbr_hospi is not None:
         
         # Pie chart interactif
         fig_pie = px.pie(
-            df_service_filtered.groupby('classification')['nbr_hospi'].sum().reset_index(),
+            df_service_filtered.groupby('classification', observed=True)['nbr_hospi'].sum().reset_index(),
             values='nbr_hospi',
             names='classification',
             title=f'Répartition des hospitalisations par service médical ({selected_year})',
@@ -1399,7 +1211,7 @@ if df_nbr_hospi is not None:
             st.metric(label="help", value="", help=f"Ce graphique circulaire montre la répartition des hospitalisations entre les différents services médicaux pour l'année {selected_year}.")
 
         # Évolution temporelle par service
-        df_evolution = df_service.groupby(['annee', 'classification'])['nbr_hospi'].sum().reset_index()
+        df_evolution = df_service.groupby(['annee', 'classification'], observed=True)['nbr_hospi'].sum().reset_index()
         
         fig_evolution = px.line(
             df_evolution,
@@ -1,10 +1,12 @@
 import streamlit as st
 import folium
 from streamlit_folium import st_folium
-import json
 import pandas as pd
 import plotly.express as px
-from google.cloud import bigquery
+from utils.data_store import get_view
+from utils.view_specs import CARTE
+from utils.choropleth import MAP_ZOOM, build_map_payload, get_geo_index, territory_statistics
+from utils.spatial_index import get_territory_index
 import numpy as np
 import webbrowser
 from urllib.parse import urlencode
@@ -58,61 +60,35 @@ st.markdown("""
 st.markdown("<h1 class='main-title' style='margin-top: -70px; margin-bottom: -8000px;'>🌍 Carte de France des hospitalisations</h1>", unsafe_allow_html=True)
 
 # Fonction de chargement des données
-@st.cache_resource
 def load_data():
     try:
-        # Chargement des secrets
-        gcp_service_account = st.secrets["gcp_service_account"]
-        client = bigquery.Client.from_service_account_info(gcp_service_account)
-        
-        # Chargement des données
-        query = """
-            SELECT *
-            FROM `projet-jbn-data-le-wagon.dbt_medical_analysis_join_total_morbidite.class_join_total_morbidite_sexe_population`
-        """
-        df = client.query(query).to_dataframe()
-        return df
+        # Colonnes utiles à la carte uniquement, chargées une seule fois par processus
+        return get_view(CARTE)
     except Exception as e:
         st.error(f"Erreur lors du chargement des données : {str(e)}")
         return None
 
-# Préparation des données pour la carte
-@st.cache_data
-def prepare_map_data(df_filtered, selected_service, niveau_administratif):
+# Préparation des données pour la carte (une agrégation par combinaison de filtres, partagée entre sessions)
+@st.cache_data(show_spinner=False)
+def prepare_map_data(niveau_administratif, sexe, annee, selected_area, selected_service, selected_pathology):
+    df_filtered = get_view(
+        CARTE,
+        niveau=niveau_administratif,
+        annee=annee if annee != "Toutes les années" else None,
+        sexe=sexe if sexe != "Ensemble" else None
+    )
+    if selected_area not in ("Toutes les régions", "Tous les départements"):
+        df_filtered = df_filtered[df_filtered['nom_region'] == selected_area]
 
     # Filtrer par service si nécessaire
     if selected_service != 'Tous':
         df_filtered = df_filtered[df_filtered['classification'] == selected_service]
-    
-    # Filtrer par niveau administratif
-    df_filtered = df_filtered[df_filtered['niveau'] == niveau_administratif]
-    
-    # Sélectionner la colonne appropriée selon le niveau administratif
-    territory_col = 'region' if niveau_administratif == "Départements" else 'nom_region'
-    
-    # Correction du nom de l'Île-de-France
-    if niveau_administratif == "Régions":
-        df_filtered[territory_col] = df_filtered[territory_col].replace("Ile de France", "Île-de-France")
-    
-    # Agrégation des données par territoire
-    hospi_by_territory = df_filtered.groupby(territory_col)['nbr_hospi'].sum().reset_index()
-    
-    # Formater les codes de département pour correspondre au GeoJSON
-    if niveau_administratif == "Départements":
-        hospi_by_territory[territory_col] = hospi_by_territory[territory_col].astype(str).str.extract('(\d+)')[0].str.zfill(2)
-    
-    # Création du dictionnaire pour la carte
-    map_data = dict(zip(hospi_by_territory[territory_col], hospi_by_territory['nbr_hospi']))
-    
-    return map_data, df_filtered
 
-def get_style_function(x):
-    return {
-        'fillColor': '#ffffff',
-        'color': '#000000',
-        'fillOpacity': 0.1,
-        'weight': 0.1
-    }
+    if selected_pathology != "Toutes les pathologies":
+        df_filtered = df_filtered[df_filtered['nom_pathologie'] == selected_pathology]
+
+    # Hospitalisations, durée moyenne, taux standardisé et top pathologies par territoire
+    return territory_statistics(df_filtered, niveau_administratif)
 
 def get_highlight_function(x):
     return {
@@ -122,112 +98,68 @@ def get_highlight_function(x):
         'weight': 0.1
     }
 
-def generate_map(map_data, geojson_data, niveau_administratif, df_filtered, sexe, annee, service):
+def generate_map(map_payload, stats, topojson=None):
     # Créer la carte de base
-    m = folium.Map(location=[46.603354, 1.888334], zoom_start=6)
+    m = folium.Map(location=[46.603354, 1.888334], zoom_start=MAP_ZOOM)
 
-    # Convertir les données en DataFrame pour Folium
-    df_map = pd.DataFrame(list(map_data.items()), columns=['territoire', 'nbr_hospi'])
-    
-    # Pré-calcul des statistiques par territoire
-    territory_col = 'region' if niveau_administratif == "Départements" else 'nom_region'
-    
-    # Créer une colonne de code formaté pour le filtrage
-    if niveau_administratif == "Départements":
-        df_filtered['code_territoire'] = df_filtered[territory_col].astype(str).str.extract('(\d+)')[0].str.zfill(2)
-    else:
-        df_filtered['code_territoire'] = df_filtered[territory_col]
-    
-    # Pré-calcul des durées moyennes (utilisant les données déjà filtrées)
-    durees_moy = df_filtered.groupby('code_territoire')['AVG_duree_hospi'].mean()
-    
-    # Pré-calcul du taux standardisé moyen
-    taux_std_moy = df_filtered.groupby('code_territoire')['tx_standard_tt_age_pour_mille'].mean()
-    
-    # Pré-calcul des top pathologies (utilisant les données déjà filtrées)
-    top_patho_dict = {}
-    for code, group in df_filtered.groupby('code_territoire'):
-        top_patho = group.groupby('nom_pathologie')['nbr_hospi'].sum().nlargest(2)
-        top_patho_text = "\n".join([f" {nom}: {val:,.0f} hospitalisations /" for nom, val in top_patho.items()])
-        top_patho_dict[code] = top_patho_text
-    
-    # Ajouter la couche choropleth
+    # Une seule couche : couleurs, survol et infobulles portés par les mêmes contours
     choropleth = folium.Choropleth(
-        geo_data=geojson_data,
+        geo_data=map_payload,
+        topojson=topojson,
         name='choropleth',
-        data=df_map,
-        columns=['territoire', 'nbr_hospi'],
-        key_on='feature.properties.nom' if niveau_administratif == "Régions" else 'feature.properties.code',
+        data=stats['nbr_hospi'],
+        key_on='feature.properties.territoire',
         fill_color='YlOrBr',
         fill_opacity=0.8,
         line_opacity=0.2,
         legend_name="Nombre d'hospitalisations",
         bins=14,
-        nan_fill_color="white"
+        nan_fill_color="white",
+        highlight=True
     ).add_to(m)
-    
-    # Ajouter les tooltips
-    for feature in choropleth.geojson.data['features']:
-        if niveau_administratif == "Régions":
-            code = feature['properties']['nom']
-        else:
-            code = feature['properties']['code']
-        nom = feature['properties']['nom']
-        
-        # Récupérer les statistiques pré-calculées
-        nbr_hospi = map_data.get(code, 0)
-        duree_moy = durees_moy.get(code, 0)
-        taux_std = taux_std_moy.get(code, 0)
-        top_patho_text = top_patho_dict.get(code, "Aucune donnée")
-        
-        # Créer un tooltip enrichi avec les informations de filtrage
-        tooltip_html = f"""
-        <div style='font-family: Arial; font-size: 12px;'>
-            <b>{nom} {annee}</b><br>
-            <b>Hospitalisations:</b> {nbr_hospi:,.0f}<br>
-            <b>Durée moyenne de séjour:</b> {duree_moy:.1f} jours<br>
-            <b>Taux standardisé moyen:</b> {taux_std:.2f} pour mille habitants<br>
-            <b>Pathologies les plus fréquentes:</b><br>
-            {top_patho_text}
-        </div>
-        """
-        
-        # Créer un tooltip avec le HTML formaté
-        tooltip = folium.Tooltip(tooltip_html)
-        
-        folium.GeoJson(
-            feature,
-            tooltip=tooltip,
-            style_function=get_style_function,
-            highlight_function=get_highlight_function
-        ).add_to(m)
-    
+    # Surbrillance au survol disponible uniquement pour une couche GeoJSON
+    if isinstance(choropleth.geojson, folium.GeoJson):
+        choropleth.geojson.highlight_function = get_highlight_function
+
+    # Infobulles pré-rendues dans les propriétés des territoires
+    folium.GeoJsonTooltip(fields=['tooltip'], labels=False).add_to(choropleth.geojson)
+
     return m
 
-def show_map(df_filtered, niveau_administratif, selected_service, sexe, annee):
+def show_map(niveau_administratif, sexe, annee, selected_area, selected_service, selected_pathology):
     st.markdown("""
         <div class="insight-card">
         <center><p>Explorez la carte interactive pour visualiser les données hospitalières par région.
         Naviguez à travers les différents niveaux administratifs pour une analyse détaillée.</p>
         </center></div>
     """, unsafe_allow_html=True)
-    
-    # Charger les GeoJSON appropriés selon le niveau administratif
-    if niveau_administratif == "Régions":
-        with open('data/regions-version-simplifiee.geojson', 'r', encoding='utf-8') as f:
-            geojson_data = json.load(f)
 
-    else:  # Département
-        with open('data/departements-version-simplifiee.geojson', 'r', encoding='utf-8') as f:
-            geojson_data = json.load(f)
-    
     # Préparer les données pour la carte
-    map_data, filtered_df = prepare_map_data(df_filtered, selected_service, niveau_administratif)
-    
+    stats = prepare_map_data(niveau_administratif, sexe, annee, selected_area, selected_service, selected_pathology)
+
+    # Contours simplifiés pour le zoom de la carte, lus une seule fois par processus
+    map_payload = build_map_payload(stats, niveau_administratif, annee, MAP_ZOOM)
+
     # Générer la carte
-    m = generate_map(map_data, geojson_data, niveau_administratif, filtered_df, sexe, annee, selected_service)
-    
-    return m
+    return generate_map(map_payload, stats, get_geo_index(niveau_administratif, MAP_ZOOM).topojson)
+
+def show_clicked_territory(clicked, niveau_administratif, stats):
+    # Territoire cliqué retrouvé par sa géométrie, avec ses voisins
+    if not clicked:
+        return
+    index = get_territory_index(niveau_administratif)
+    territoire = index.locate(clicked['lat'], clicked['lng'])
+    if territoire is None:
+        return
+
+    noms = {key: feature['properties']['nom'] for key, feature in get_geo_index(niveau_administratif).features.items()}
+    territoires = [territoire] + sorted(index.neighbours(territoire))
+    details = stats.reindex(territoires)[['nbr_hospi', 'duree_moy', 'taux_std']]
+    details.index = [noms.get(key, key) for key in territoires]
+    details.columns = ["Hospitalisations", "Durée moyenne (jours)", "Taux standardisé (‰)"]
+
+    st.markdown(f"**{noms.get(territoire, territoire)} et territoires voisins**")
+    st.dataframe(details.style.format("{:,.1f}", na_rep="-"), use_container_width=True)
 
 # Chargement des données
 df = load_data()
@@ -266,17 +198,13 @@ if df is not None:
         years.insert(0, "Toutes les années")
         selected_year = st.selectbox("Année", years)
     
-    # Filtrer les données par année et sexe
-    if selected_year != "Toutes les années":
-        df_filtered = df[df['annee'] == selected_year]
-    else:
-        df_filtered = df.copy()
-    
-    if sexe != "Ensemble":
-        df_filtered = df_filtered[df_filtered['sexe'] == sexe]
-
-    # Filtrer d'abord par niveau administratif
-    df_filtered = df_filtered[df_filtered['niveau'] == niveau_administratif]
+    # Vue filtrée par niveau administratif, année et sexe, sans recopier la table partagée
+    df_filtered = get_view(
+        CARTE,
+        niveau=niveau_administratif,
+        annee=selected_year if selected_year != "Toutes les années" else None,
+        sexe=sexe if sexe != "Ensemble" else None
+    )
     with col4:
     # Ajout du sélecteur de région/département
         if niveau_administratif == "Régions":
@@ -407,12 +335,12 @@ if df is not None:
 
     with tab1:
         # Générer et afficher la carte
-        m = show_map(df_filtered, niveau_administratif, selected_service, sexe, selected_year)
+        m = show_map(niveau_administratif, sexe, selected_year, selected_area, selected_service, selected_pathology)
         
         # Afficher la carte
         col_chart, col_help = st.columns([1, 0.01])
         with col_chart:
-            st_folium(m, width=1200, height=800)
+            map_state = st_folium(m, width=1200, height=800, returned_objects=["last_clicked"])
         with col_help:
             st.metric(
                 label="help",
@@ -423,6 +351,7 @@ if df is not None:
                 - Zoomez avec la molette de la souris
                 - Cliquez et faites glisser pour vous déplacer
                 - Survolez une région pour voir les détails
+                - Cliquez sur un territoire pour le comparer à ses voisins
                 
                 📊 Informations affichées :
                 - Nombre total d'hospitalisations
@@ -433,5 +362,12 @@ if df is not None:
                 🎨 Les couleurs plus foncées indiquent un nombre plus élevé d'hospitalisations."""
             )
 
+        # Détail du territoire cliqué (statistiques déjà en cache pour ces filtres)
+        show_clicked_territory(
+            (map_state or {}).get('last_clicked'),
+            niveau_administratif,
+            prepare_map_data(niveau_administratif, sexe, selected_year, selected_area, selected_service, selected_pathology)
+        )
+
     st.markdown("---")
     st.markdown("Développé avec 💫 | Le Wagon - Promotion 2024")
\ No newline at end of file
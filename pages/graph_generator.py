@@ -1,30 +1,16 @@
 import streamlit as st
 import pandas as pd
-from google.cloud import bigquery
+from utils.data_store import get_view
+from utils.view_specs import GRAPH_HOSPI
 from pygwalker.api.streamlit import StreamlitRenderer
 
 # Fonction de chargement des données
 @st.cache_resource
 def load_data():
     try:
-        gcp_service_account = st.secrets["gcp_service_account"]
-        client = bigquery.Client.from_service_account_info(gcp_service_account)
-        
-        query = '''
-            SELECT *
-            FROM `projet-jbn-data-le-wagon.dbt_medical_analysis_join_total_morbidite.class_join_total_morbidite_sexe_population`
-            WHERE sexe = 'Ensemble' AND niveau = 'Départements' AND annee = 2022
-        '''
-        df = client.query(query).to_dataframe()
-        
-        # Conversion des types de données pour optimisation
-        date_columns = ['year']
-        numeric_columns = [col for col in df.columns if any(x in col.lower() for x in ['hospi'])]
-        
-        for col in date_columns:
-            df[col] = pd.to_datetime(df[col]).dt.date
-        for col in numeric_columns:
-            df[col] = df[col].astype('float32')
+        # Copie de la vue partagée (types déjà compactés) : la date est convertie ci-dessous
+        df = get_view(GRAPH_HOSPI).copy()
+        df['year'] = df['year'].dt.date
             
         return df
     except Exception as e:
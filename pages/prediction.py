@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from pycaret.regression import *
-from google.cloud import bigquery
-import os
 import plotly.express as px
+from utils.data_store import data_version, get_view
+from utils.view_specs import PREDICTION
+from machine_learning.hospitalisation_prediction.hospitalisation_predictor import HospitalisationPredictor
+from machine_learning.hospitalisation_prediction.forecast_grid import FORECAST_YEARS, load_forecast_grid
 
 # Configuration de la page
 
@@ -14,75 +15,49 @@ st.title(" Prédiction des hospitalisations")
 # Sidebar pour les filtres
 st.sidebar.header("Paramètres de prédiction")
 
-# Connexion à BigQuery
+# Chargement des données (niveau régional, tous sexes), partagées avec les autres pages
+def load_data():
+    return get_view(PREDICTION)
+
+# Historique indexé par (région, pathologie)
 @st.cache_resource
-def init_bigquery():
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "C:/Users/antob/Documents/Arctusol/projet_wagon/projet_data_JBN/projet-jbn-data-le-wagon-533639ce801d.json"
-    return bigquery.Client()
+def load_history(version):
+    return load_data().set_index(['nom_region', 'nom_pathologie']).sort_index()
 
-# Chargement des données
-@st.cache_data
-def load_data():
-    client = init_bigquery()
-    query = """
-    SELECT * FROM projet-jbn-data-le-wagon.dbt_medical_analysis_join_total_morbidite.class_join_total_morbidite_sexe_population
-    """
-    return client.query(query).to_dataframe()
+# Chargement du modèle (pipeline sauvegardé, sans réinitialiser d'expérience PyCaret)
+@st.cache_resource
+def load_predictor():
+    return HospitalisationPredictor.load()
 
-# Chargement du modèle
+# Prédictions de toutes les régions × pathologies × années, recalculées
+# (en un seul appel au modèle) quand les données ou le modèle changent
 @st.cache_resource
-def load_saved_model():
-    # Préparation des données d'entraînement (2018-2019)
-    train_data = df[(df['niveau'] == 'Régions') & 
-                    (df['sexe'] == 'Ensemble') & 
-                    (df['annee'].isin([2018, 2019]))]
-    
-    # Sélection des variables pertinentes
-    features = ['annee', 'nom_pathologie', 'nom_region']
-    train_data = train_data[features + ['nbr_hospi']]
-    
-    # Initialisation de l'environnement PyCaret
-    reg = setup(
-        data=train_data,
-        target='nbr_hospi',
-        session_id=123,
-        normalize=True,
-        transformation=True,
-        ignore_features=['annee'],
-        fold=5,
-        verbose=False
-    )
-    
-    # Chargement du modèle sauvegardé
-    return load_model('best_model')
+def load_grid(version, regions, pathologies):
+    return load_forecast_grid(load_predictor(), regions, pathologies, FORECAST_YEARS, data_version=version)
 
 try:
     # Chargement des données
     df = load_data()
+    version = data_version(PREDICTION)
     
     # Filtres pour les prédictions
-    regions = sorted(df[df['niveau'] == 'Régions']['nom_region'].unique())
+    regions = tuple(sorted(df['nom_region'].unique()))
     selected_region = st.sidebar.selectbox('Sélectionnez une région', regions)
     
-    pathologies = sorted(df['nom_pathologie'].unique())
+    pathologies = tuple(sorted(df['nom_pathologie'].unique()))
     selected_pathology = st.sidebar.selectbox('Sélectionnez une pathologie', pathologies)
     
-    selected_year = st.sidebar.slider('Année de prédiction', 2023, 2026, 2023)
-
-    # Création des données pour toutes les prédictions futures
-    future_years = list(range(2023, selected_year + 1))
-    input_data = pd.DataFrame([{
-        'annee': year,
-        'nom_pathologie': selected_pathology,
-        'nom_region': selected_region
-    } for year in future_years])
+    selected_year = st.sidebar.slider('Année de prédiction', FORECAST_YEARS[0], FORECAST_YEARS[-1], FORECAST_YEARS[0])
 
     # Bouton pour lancer la prédiction
     if st.sidebar.button('Faire une prédiction'):
-        # Chargement du modèle et prédiction
+        # Chargement du modèle et de la grille de prédictions
         with st.spinner('Chargement du modèle et calcul des prédictions...'):
-            model = load_saved_model()
-            all_predictions = predict_model(model, data=input_data)
+            grid = load_grid(version, regions, pathologies)
+        
+        # Prédictions de toutes les années futures jusqu'à l'année choisie
+        all_predictions = grid.loc[(selected_region, selected_pathology)].reset_index()
+        all_predictions = all_predictions[all_predictions['annee'] <= selected_year]
         
         # Affichage des résultats
         col1, col2 = st.columns(2)
@@ -91,7 +66,7 @@ try:
             st.subheader("Résultats de la prédiction")
             st.metric(
                 label="Nombre d'hospitalisations prévu",
-                value=f"{int(all_predictions[all_predictions['annee'] == selected_year]['prediction_label'].iloc[0]):,}"
+                value=f"{int(all_predictions['prediction_label'].iloc[-1]):,}"
             )
             
         with col2:
@@ -102,12 +77,7 @@ try:
 
         # Affichage des données historiques
         st.subheader("Historique des hospitalisations")
-        historical_data = df[
-            (df['nom_region'] == selected_region) & 
-            (df['nom_pathologie'] == selected_pathology) &
-            (df['niveau'] == 'Régions') &
-            (df['sexe'] == 'Ensemble')
-        ]
+        historical_data = load_history(version).loc[(selected_region, selected_pathology)].sort_values('annee')
         
         # Création du graphique avec les données historiques
         fig = px.line(historical_data, x='annee', y='nbr_hospi', 
@@ -149,6 +119,26 @@ try:
         
         st.plotly_chart(fig, use_container_width=True)
 
+        # Comparaison des régions pour la pathologie et l'année choisies (même grille)
+        st.subheader("Comparaison des régions")
+        comparison = (
+            grid.xs((selected_pathology, selected_year), level=['nom_pathologie', 'annee'])
+            .reset_index()
+            .sort_values('prediction_label', ascending=False)
+        )
+        fig_regions = px.bar(
+            comparison, x='nom_region', y='prediction_label',
+            title=f"Hospitalisations prévues en {selected_year} - {selected_pathology}",
+            color=comparison['nom_region'] == selected_region,
+            color_discrete_map={True: 'red', False: 'lightgray'}
+        )
+        fig_regions.update_layout(
+            xaxis_title="Région",
+            yaxis_title="Nombre d'hospitalisations prévu",
+            showlegend=False
+        )
+        st.plotly_chart(fig_regions, use_container_width=True)
+
 except Exception as e:
     st.error(f"Une erreur s'est produite : {str(e)}")
 
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from typing import Sequence
+from utils.view_specs import AGE_COLUMNS
+
+
+def _age_label(column: str) -> str:
+    age_group = column.replace('tranche_age_', '').replace('_', '-')
+    if age_group == '85-et-plus':
+        return "85 ans et plus"
+    return f"{age_group} ans"
+
+
+# Libellés d'affichage des tranches d'âge, dans l'ordre des âges
+AGE_BAND_LABELS = {col: _age_label(col) for col in AGE_COLUMNS}
+
+
+def melt_age_bands(df: pd.DataFrame, by: Sequence[str], total_column: str = 'nbr_hospi',
+                   value_name: str = 'hospitalisations') -> pd.DataFrame:
+    """
+    Répartit un effectif par tranche d'âge et passe la table au format long
+
+    Les colonnes tranche_age_* sont des pourcentages de `total_column` :
+    les effectifs par tranche sont obtenus par un seul produit matriciel
+    diffusé (lignes × tranches), sommés par groupe `by`, puis aplatis.
+
+    Args:
+        df: Table contenant `by`, `total_column` et les colonnes AGE_COLUMNS
+        by: Colonnes de regroupement (ex. ['annee', 'nom_pathologie'])
+        total_column: Effectif total de chaque ligne
+        value_name: Nom de la colonne des effectifs par tranche
+
+    Returns:
+        DataFrame (by..., tranche_age, value_name), une ligne par groupe et par
+        tranche, tranches dans l'ordre des âges
+    """
+    by = list(by)
+    totals = df[total_column].to_numpy(dtype='float64', na_value=np.nan)
+    shares = df[AGE_COLUMNS].to_numpy(dtype='float64', na_value=np.nan)
+    counts = pd.DataFrame(totals[:, None] * shares / 100, columns=AGE_COLUMNS, index=df.index)
+    for col in by:
+        counts[col] = df[col]
+
+    # Somme par groupe (valeurs manquantes ignorées), puis aplatissement groupe × tranche
+    grouped = counts.groupby(by, observed=True, sort=True)[AGE_COLUMNS].sum()
+    n_groups, n_bands = grouped.shape
+    keys = grouped.index.to_frame(index=False)
+
+    long = keys.loc[np.repeat(np.arange(n_groups), n_bands)].reset_index(drop=True)
+    long['tranche_age'] = pd.Categorical.from_codes(
+        np.tile(np.arange(n_bands), n_groups),
+        categories=list(AGE_BAND_LABELS.values()),
+        ordered=True
+    )
+    long[value_name] = grouped.to_numpy().ravel()
+    return long
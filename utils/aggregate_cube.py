@@ -0,0 +1,143 @@
+import functools
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Dict, Optional, Sequence, Tuple, Union
+from utils.data_store import get_store
+from utils.view_specs import ViewSpec
+
+# Axes du cube (seuls ceux présents dans la vue sont retenus)
+DIMENSIONS = ['classification', 'niveau', 'sexe', 'annee', 'nom_region', 'nom_pathologie']
+
+# Mesures moyennées : conservées sous forme (somme, effectif) pour rester agrégeables
+MEAN_MEASURES = ['AVG_duree_hospi', 'indice_comparatif_tt_age_percent', 'taux_occupation', 'taux_equipement']
+
+# Pondération des moyennes pondérées (durées moyennes rapportées aux séjours)
+WEIGHT_MEASURE = 'nbr_hospi'
+
+
+def _is_additive(column: str) -> bool:
+    return column == 'nbr_hospi' or column.startswith(('hospi_', 'tranche_age_', 'lit_', 'place_', 'sejour_', 'journee_', 'passage_'))
+
+
+class AggregateCube:
+    """
+    Cube d'agrégats précalculé au grain (classification, niveau, sexe, annee, nom_region, nom_pathologie).
+
+    Les mesures additives sont stockées en sommes, les moyennes en couples
+    (somme, effectif) et en somme pondérée par WEIGHT_MEASURE : toute agrégation
+    des pages (par pathologie, par année, par département...) se ramène à une
+    sélection de cellules suivie d'un np.bincount sur les codes des axes.
+    """
+
+    def __init__(self, df: pd.DataFrame, dimensions: Sequence[str] = DIMENSIONS):
+        self.dimensions = [dim for dim in dimensions if dim in df.columns]
+        numeric = [col for col in df.columns if col not in self.dimensions and pd.api.types.is_numeric_dtype(df[col])]
+        self.sum_measures = [col for col in numeric if _is_additive(col)]
+        self.mean_measures = [col for col in numeric if col in MEAN_MEASURES]
+
+        # Colonnes intermédiaires : sommes, effectifs non nuls et sommes pondérées
+        parts = {col: df[col].astype('float64') for col in self.sum_measures}
+        weight = df[WEIGHT_MEASURE].astype('float64') if WEIGHT_MEASURE in df.columns else None
+        for col in self.mean_measures:
+            values = df[col].astype('float64')
+            parts[f'{col}__sum'] = values
+            parts[f'{col}__count'] = values.notna().astype('float64')
+            if weight is not None:
+                parts[f'{col}__wsum'] = values * weight
+                parts[f'{col}__weight'] = weight.where(values.notna())
+        base = pd.DataFrame(parts, index=df.index)
+        for dim in self.dimensions:
+            base[dim] = df[dim]
+
+        cells = base.groupby(self.dimensions, observed=True, dropna=False, sort=True).sum(min_count=1).reset_index()
+
+        # Axes encodés en entiers pour des sélections et regroupements vectorisés (-1 = valeur manquante)
+        self._labels: Dict[str, pd.Index] = {}
+        self._codes: Dict[str, np.ndarray] = {}
+        for dim in self.dimensions:
+            codes, labels = pd.factorize(np.asarray(cells[dim]), sort=True)
+            self._codes[dim] = codes
+            self._labels[dim] = pd.Index(labels)
+        self._values = {
+            col: cells[col].fillna(0).to_numpy()
+            for col in cells.columns if col not in self.dimensions
+        }
+        self.n_cells = len(cells)
+        self._cached_aggregate = functools.lru_cache(maxsize=512)(self._aggregate)
+
+    def _mask(self, filters: Dict) -> np.ndarray:
+        mask = np.ones(self.n_cells, dtype=bool)
+        for dim, value in filters.items():
+            if value is None:
+                continue
+            if dim not in self._codes:
+                raise ValueError(f"Axe inconnu du cube : {dim}")
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            wanted = self._labels[dim].get_indexer(values)
+            mask &= np.isin(self._codes[dim], wanted[wanted >= 0])
+        return mask
+
+    def aggregate(self, by: Union[str, Sequence[str]], measures: Optional[Sequence[str]] = None,
+                  weighted: bool = False, **filters) -> pd.DataFrame:
+        """
+        Agrège le cube selon les axes demandés, après sélection des cellules
+
+        Args:
+            by: Axe ou liste d'axes de regroupement
+            measures: Mesures à retourner (toutes par défaut)
+            weighted: Moyennes pondérées par WEIGHT_MEASURE au lieu de moyennes simples
+            **filters: Valeur ou liste de valeurs par axe (None = pas de filtre)
+
+        Returns:
+            DataFrame avec une ligne par combinaison observée des axes `by`
+            (valeurs manquantes exclues, comme un groupby)
+        """
+        by = (by,) if isinstance(by, str) else tuple(by)
+        measures = tuple(measures) if measures is not None else None
+        filters = tuple(sorted(
+            (dim, tuple(value) if isinstance(value, (list, tuple, set)) else value)
+            for dim, value in filters.items()
+        ))
+        # Copie du résultat mis en cache : les pages ajoutent des colonnes calculées
+        return self._cached_aggregate(by, measures, weighted, filters).copy()
+
+    def _aggregate(self, by: Tuple[str, ...], measures: Optional[Tuple[str, ...]],
+                   weighted: bool, filters: Tuple) -> pd.DataFrame:
+        measures = list(measures) if measures is not None else self.sum_measures + self.mean_measures
+        unknown = [col for col in measures if col not in self.sum_measures and col not in self.mean_measures]
+        if unknown:
+            raise ValueError(f"Mesures absentes du cube : {unknown}")
+
+        mask = self._mask(dict(filters))
+        for dim in by:
+            mask &= self._codes[dim] >= 0
+
+        if by:
+            sizes = [len(self._labels[dim]) for dim in by]
+            flat = np.ravel_multi_index([self._codes[dim][mask] for dim in by], sizes)
+            groups, inverse = np.unique(flat, return_inverse=True)
+            positions = np.unravel_index(groups, sizes)
+            result = pd.DataFrame({dim: self._labels[dim].take(pos) for dim, pos in zip(by, positions)})
+        else:
+            inverse = np.zeros(int(mask.sum()), dtype=np.int64)
+            result = pd.DataFrame(index=[0])
+        n_groups = len(result)
+
+        def total(column: str) -> np.ndarray:
+            return np.bincount(inverse, weights=self._values[column][mask], minlength=n_groups)
+
+        for col in measures:
+            if col in self.sum_measures:
+                result[col] = total(col)
+            else:
+                numerator, denominator = (f'{col}__wsum', f'{col}__weight') if weighted else (f'{col}__sum', f'{col}__count')
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    result[col] = total(numerator) / total(denominator)
+        return result
+
+
+@st.cache_resource(show_spinner=False)
+def get_cube(spec: ViewSpec) -> AggregateCube:
+    """Cube construit une fois par vue partagée (donc une fois par snapshot chargé)"""
+    return AggregateCube(get_store(spec).df)
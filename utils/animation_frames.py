@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+import plotly.colors
+import plotly.graph_objects as go
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+from utils.figure_json import figure_to_json
+
+# Axes x, y, z des nuages 3D animés (la couleur reprend l'axe y)
+FRAME_COLUMNS = ('nbr_hospi', 'AVG_duree_hospi', 'indice_comparatif_tt_age_percent')
+
+# Nombre de frames intermédiaires entre deux années
+INTERPOLATION_STEPS = 5
+
+# Taille maximale des points (le plus grand effectif de chaque frame)
+MAX_POINT_SIZE = 30
+
+
+@dataclass
+class FrameTensor:
+    """
+    Positions de toutes les frames d'une animation, années et transitions confondues.
+
+    values a la forme (frames, libellés, axes) ; mask indique les points
+    affichés dans chaque frame (valeurs présentes, et présentes les deux années
+    pour une transition).
+    """
+
+    names: List[str]
+    captions: List[str]
+    years: List
+    labels: np.ndarray
+    values: np.ndarray
+    mask: np.ndarray
+    sizes: np.ndarray
+
+
+def interpolate_frames(df: pd.DataFrame, time_column: str, label_column: str = 'nom_pathologie',
+                       value_columns: Sequence[str] = FRAME_COLUMNS,
+                       steps: int = INTERPOLATION_STEPS) -> FrameTensor:
+    """
+    Calcule en une passe NumPy les positions des années et des transitions interpolées
+
+    Args:
+        df: Une ligne par (libellé, année) avec les colonnes value_columns
+        time_column: Colonne des années
+        label_column: Colonne des libellés des points
+        value_columns: Colonnes x, y, z
+        steps: Nombre de frames intermédiaires entre deux années
+
+    Returns:
+        FrameTensor ordonné année, transitions, année suivante...
+    """
+    value_columns = list(value_columns)
+    time_codes, years = pd.factorize(np.asarray(df[time_column]), sort=True)
+    label_codes, labels = pd.factorize(np.asarray(df[label_column]), sort=True)
+    if len(years) == 0 or len(labels) == 0:
+        # Aucune donnée pour ces filtres : animation sans frame
+        return FrameTensor(
+            [], [], [], np.asarray(labels, dtype=object),
+            np.empty((0, len(labels), len(value_columns))),
+            np.empty((0, len(labels)), dtype=bool),
+            np.empty((0, len(labels)))
+        )
+
+    # Cube (années, libellés, axes), NaN pour les combinaisons absentes
+    keyframes = np.full((len(years), len(labels), len(value_columns)), np.nan)
+    keyframes[time_codes, label_codes] = df[value_columns].to_numpy(dtype='float64', na_value=np.nan)
+    present = ~np.isnan(keyframes).any(axis=-1)
+
+    # Transitions (années - 1, étapes, libellés, axes) par diffusion des coefficients
+    alpha = (np.arange(1, steps + 1) / (steps + 1))[None, :, None, None]
+    transitions = keyframes[:-1, None] * (1 - alpha) + keyframes[1:, None] * alpha
+    transition_mask = np.broadcast_to((present[:-1] & present[1:])[:, None], transitions.shape[:3])
+
+    # Entrelacement : année i, puis ses `steps` transitions vers l'année i + 1
+    n_frames = len(years) + max(len(years) - 1, 0) * steps
+    values = np.empty((n_frames, len(labels), len(value_columns)))
+    mask = np.empty((n_frames, len(labels)), dtype=bool)
+    key_positions = np.arange(len(years)) * (steps + 1)
+    transition_positions = (key_positions[:-1, None] + np.arange(1, steps + 1)).ravel()
+    values[key_positions], mask[key_positions] = keyframes, present
+    values[transition_positions] = transitions.reshape(-1, len(labels), len(value_columns))
+    mask[transition_positions] = transition_mask.reshape(-1, len(labels))
+
+    # Taille des points relative au plus grand effectif affiché dans la frame
+    x = np.where(mask, values[..., 0], np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        frame_max = np.nanmax(np.where(mask.any(axis=1, keepdims=True), x, 1.0), axis=1, keepdims=True)
+        sizes = x / frame_max * MAX_POINT_SIZE
+
+    names, captions = [], []
+    for i, year in enumerate(years):
+        names.append(str(year))
+        captions.append(f"Année: {year}")
+        if i < len(years) - 1:
+            names.extend(f"{year}_{step}" for step in range(1, steps + 1))
+            captions.extend([f"Transition {year}-{years[i + 1]}"] * steps)
+
+    return FrameTensor(names, captions, list(years), labels, values, mask, sizes)
+
+
+def _scatter3d_trace(tensor: FrameTensor, frame: int, colorscale) -> Dict:
+    """Trace Scatter3d d'une frame, écrite directement sous forme validée"""
+    visible = tensor.mask[frame]
+    points = tensor.values[frame, visible]
+    return {
+        'type': 'scatter3d',
+        'x': points[:, 0],
+        'y': points[:, 1],
+        'z': points[:, 2],
+        'mode': 'markers+text',
+        'text': tensor.labels[visible].tolist(),
+        'textposition': 'top center',
+        'marker': {
+            'size': tensor.sizes[frame, visible],
+            'color': points[:, 1],
+            'colorscale': colorscale,
+            'opacity': 0.8,
+            'colorbar': {'title': {'text': "Durée moyenne de séjour (jours)"}}
+        },
+        'hovertemplate': "<b>%{text}</b><br>" +
+                         f"{tensor.captions[frame]}<br>" +
+                         "Hospitalisations: %{x:,.0f}<br>" +
+                         "Durée moyenne: %{y:.1f} jours<br>" +
+                         "Indice comparatif: %{z:.1f}%<br>" +
+                         "<extra></extra>"
+    }
+
+
+def scatter3d_animation_json(tensor: FrameTensor, colorscale: str, **layout) -> str:
+    """
+    Figure 3D animée (années et transitions) sérialisée en JSON
+
+    Seule la mise en page passe par la validation Plotly ; les traces des
+    frames sont écrites directement à partir du tenseur.
+
+    Args:
+        tensor: Frames calculées par interpolate_frames
+        colorscale: Nom de l'échelle de couleurs Plotly
+        **layout: Propriétés de mise en page (titre, scène, dimensions...)
+    """
+    scale = [list(stop) for stop in plotly.colors.get_colorscale(colorscale)]
+    traces = [_scatter3d_trace(tensor, frame, scale) for frame in range(len(tensor.names))]
+
+    # Curseur limité aux années principales
+    steps = [
+        dict(
+            method="animate",
+            args=[[str(year)], {
+                "frame": {"duration": 300, "redraw": True},
+                "mode": "immediate",
+                "transition": {"duration": 300}
+            }],
+            label=str(year)
+        )
+        for year in tensor.years
+    ]
+    # Pas de curseur ni de boutons sans frame (filtres sans donnée)
+    controls = {} if not traces else dict(
+        sliders=[dict(
+            active=0,
+            currentvalue={"prefix": "Année: "},
+            pad={"t": 50},
+            steps=steps
+        )],
+        updatemenus=[{
+            "buttons": [
+                {
+                    "args": [None, {
+                        "frame": {"duration": 300, "redraw": True},
+                        "fromcurrent": True,
+                        "transition": {"duration": 300},
+                        "mode": "immediate"
+                    }],
+                    "label": "Lecture",
+                    "method": "animate"
+                },
+                {
+                    "args": [[None], {
+                        "frame": {"duration": 0, "redraw": True},
+                        "mode": "immediate",
+                        "transition": {"duration": 0}
+                    }],
+                    "label": "Pause",
+                    "method": "animate"
+                }
+            ],
+            "direction": "left",
+            "pad": {"r": 10, "t": 87},
+            "showactive": False,
+            "type": "buttons",
+            "x": 0.0,
+            "xanchor": "right",
+            "y": 0,
+            "yanchor": "top"
+        }]
+    )
+    figure_layout = go.Layout(**controls, **layout)
+
+    # Première année comme trace initiale, sans survol pendant l'animation
+    initial = {**traces[0], 'hoverinfo': 'none'} if traces else {'type': 'scatter3d'}
+    return figure_to_json({
+        'data': [initial],
+        'layout': figure_layout.to_plotly_json(),
+        'frames': [{'name': name, 'data': [trace]} for name, trace in zip(tensor.names, traces)]
+    })
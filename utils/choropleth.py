@@ -0,0 +1,183 @@
+import os
+import re
+import json
+import pandas as pd
+import streamlit as st
+from typing import Dict, List, Optional
+from utils.geometry_assets import asset_path, level_for_zoom
+
+# Contours simplifiés par niveau administratif, et propriété servant de clé de jointure
+GEOJSON_PATHS = {
+    "Départements": 'data/departements-version-simplifiee.geojson',
+    "Régions": 'data/regions-version-simplifiee.geojson',
+}
+FEATURE_KEYS = {"Départements": 'code', "Régions": 'nom'}
+
+# Contours TopoJSON générés par utils/geometry_assets.py (nom de l'objet de la topologie)
+ASSET_NAMES = {"Départements": 'departements', "Régions": 'regions'}
+
+# Zoom initial de la carte, qui détermine le niveau de simplification servi
+MAP_ZOOM = 6
+
+# Colonne de la table identifiant le territoire, selon le niveau administratif
+TERRITORY_COLUMNS = {"Départements": 'region', "Régions": 'nom_region'}
+
+# Noms de la table différents de ceux des contours
+REGION_NAMES = {"Ile de France": "Île-de-France"}
+
+_DEPARTMENT_CODE = re.compile(r'2[AB]|\d+')
+
+
+class GeoIndex:
+    """
+    Contours d'un niveau administratif, lus une fois et indexés par clé de jointure
+
+    Les contours sont soit un GeoJSON (features), soit une topologie TopoJSON
+    (géométries de l'objet object_name, arcs partagés).
+    """
+
+    def __init__(self, geojson: Dict, key: str, object_name: Optional[str] = None):
+        self.geojson = geojson
+        self.key = key
+        self.object_name = object_name
+        if object_name is None:
+            items = geojson['features']
+        else:
+            items = geojson['objects'][object_name]['geometries']
+        self.features = {item['properties'][key]: item for item in items}
+
+    @property
+    def topojson(self) -> Optional[str]:
+        """Chemin de l'objet à passer à folium (paramètre topojson), None pour un GeoJSON"""
+        return f"objects.{self.object_name}" if self.object_name is not None else None
+
+    def collection(self, features: List[Dict]) -> Dict:
+        """Contours de même format que l'index, réduits ou enrichis"""
+        if self.object_name is None:
+            return {'type': 'FeatureCollection', 'features': features}
+        return {
+            **self.geojson,
+            'objects': {self.object_name: {'type': 'GeometryCollection', 'geometries': features}}
+        }
+
+
+@st.cache_resource(show_spinner=False)
+def get_geo_index(niveau_administratif: str, zoom: int = MAP_ZOOM) -> GeoIndex:
+    """
+    Contours partagés par toutes les sessions (à ne pas modifier en place)
+
+    Le TopoJSON simplifié pour le zoom est utilisé s'il a été généré, sinon
+    le GeoJSON source.
+    """
+    name = ASSET_NAMES[niveau_administratif]
+    path = asset_path(name, level_for_zoom(zoom))
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return GeoIndex(json.load(f), FEATURE_KEYS[niveau_administratif], name)
+    with open(GEOJSON_PATHS[niveau_administratif], 'r', encoding='utf-8') as f:
+        return GeoIndex(json.load(f), FEATURE_KEYS[niveau_administratif])
+
+
+def _department_code(value) -> Optional[str]:
+    match = _DEPARTMENT_CODE.search(str(value))
+    return match.group(0).zfill(2) if match else None
+
+
+def territory_keys(df: pd.DataFrame, niveau_administratif: str) -> pd.Series:
+    """
+    Clé de jointure avec les contours (code du département ou nom de la région)
+
+    Sur une colonne category, la conversion porte sur les modalités et non sur
+    chaque ligne.
+    """
+    column = df[TERRITORY_COLUMNS[niveau_administratif]]
+    if niveau_administratif == "Départements":
+        return column.map(_department_code)
+    return column.map(lambda name: REGION_NAMES.get(name, name))
+
+
+def territory_statistics(df: pd.DataFrame, niveau_administratif: str) -> pd.DataFrame:
+    """
+    Statistiques des infobulles de la carte, calculées en une seule agrégation
+
+    Les sommes et effectifs sont agrégés au grain (territoire, pathologie) ; les
+    totaux, moyennes et deux pathologies principales de chaque territoire en
+    sont déduits sans nouveau parcours de la table.
+
+    Returns:
+        DataFrame indexé par clé de territoire : nbr_hospi, duree_moy, taux_std
+        et top_pathologies (texte)
+    """
+    keys = territory_keys(df, niveau_administratif).rename('territoire')
+    cells = df.groupby([keys, df['nom_pathologie']], observed=True).agg(
+        nbr_hospi=('nbr_hospi', 'sum'),
+        duree_sum=('AVG_duree_hospi', 'sum'),
+        duree_n=('AVG_duree_hospi', 'count'),
+        taux_sum=('tx_standard_tt_age_pour_mille', 'sum'),
+        taux_n=('tx_standard_tt_age_pour_mille', 'count')
+    )
+
+    totals = cells.groupby(level='territoire', observed=True).sum()
+    stats = pd.DataFrame({
+        'nbr_hospi': totals['nbr_hospi'],
+        'duree_moy': totals['duree_sum'] / totals['duree_n'],
+        'taux_std': totals['taux_sum'] / totals['taux_n']
+    })
+
+    # Deux pathologies les plus fréquentes par territoire (ordre stable en cas d'égalité)
+    top = cells['nbr_hospi'].sort_values(ascending=False, kind='stable').groupby(level='territoire', observed=True).head(2)
+    lines = pd.Series(
+        [f" {nom}: {val:,.0f} hospitalisations /" for nom, val in zip(top.index.get_level_values('nom_pathologie'), top)],
+        index=top.index.get_level_values('territoire')
+    )
+    stats['top_pathologies'] = lines.groupby(level=0, sort=False).agg("\n".join)
+    return stats
+
+
+def _tooltip_html(nom, annee, nbr_hospi, duree_moy, taux_std, top_pathologies) -> str:
+    return f"""
+        <div style='font-family: Arial; font-size: 12px;'>
+            <b>{nom} {annee}</b><br>
+            <b>Hospitalisations:</b> {nbr_hospi:,.0f}<br>
+            <b>Durée moyenne de séjour:</b> {duree_moy:.1f} jours<br>
+            <b>Taux standardisé moyen:</b> {taux_std:.2f} pour mille habitants<br>
+            <b>Pathologies les plus fréquentes:</b><br>
+            {top_pathologies}
+        </div>
+        """
+
+
+def build_map_payload(stats: pd.DataFrame, niveau_administratif: str, annee, zoom: int = MAP_ZOOM) -> Dict:
+    """
+    Contours uniques de la carte : valeur et infobulle dans les propriétés
+
+    Args:
+        stats: Résultat de territory_statistics
+        niveau_administratif: "Départements" ou "Régions"
+        annee: Année affichée dans les infobulles
+        zoom: Zoom de la carte (niveau de simplification des contours)
+
+    Returns:
+        FeatureCollection ou Topology selon get_geo_index(niveau_administratif, zoom)
+        (les géométries et arcs sont partagés avec l'index, non copiés)
+    """
+    geo_index = get_geo_index(niveau_administratif, zoom)
+    features = []
+    for key, feature in geo_index.features.items():
+        row = stats.loc[key] if key in stats.index else None
+        nbr_hospi = row['nbr_hospi'] if row is not None else 0
+        properties = {
+            **feature['properties'],
+            'territoire': key,
+            'nbr_hospi': float(nbr_hospi),
+            'tooltip': _tooltip_html(
+                feature['properties']['nom'],
+                annee,
+                nbr_hospi,
+                row['duree_moy'] if row is not None else 0,
+                row['taux_std'] if row is not None else 0,
+                row['top_pathologies'] if row is not None else "Aucune donnée"
+            )
+        }
+        features.append({**feature, 'properties': properties})
+    return geo_index.collection(features)
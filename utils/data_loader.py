@@ -1,31 +1,28 @@
 import streamlit as st
-from google.cloud import bigquery
+from utils.data_store import get_client
+from utils.snapshot_cache import load_table
 import pandas as pd
 import time
 
 @st.cache_resource
 def fetch_data():
     try:
-        # Chargement des secrets
-        gcp_service_account = st.secrets["gcp_service_account"]
-        client = bigquery.Client.from_service_account_info(gcp_service_account)
+        # Chargement des datasets via le cache de snapshots Parquet
+        df_nbr_hospi = load_table(
+            'projet-jbn-data-le-wagon.morbidite_h.nbr_hospi_intermediate', get_client
+        ).to_pandas()
         
-        # Chargement des datasets
-        df_nbr_hospi = client.query('''
-            SELECT * FROM `projet-jbn-data-le-wagon.morbidite_h.nbr_hospi_intermediate`
-        ''').to_dataframe()
+        df_duree_hospi = load_table(
+            'projet-jbn-data-le-wagon.duree_hospitalisation_par_patho.duree_hospi_region_et_dpt_clean_classifie', get_client
+        ).to_pandas()
         
-        df_duree_hospi = client.query('''
-            SELECT * FROM `projet-jbn-data-le-wagon.duree_hospitalisation_par_patho.duree_hospi_region_et_dpt_clean_classifie`
-        ''').to_dataframe()
+        df_tranche_age_hospi = load_table(
+            'projet-jbn-data-le-wagon.morbidite_h.tranche_age_intermediate', get_client
+        ).to_pandas()
         
-        df_tranche_age_hospi = client.query('''
-            SELECT * FROM `projet-jbn-data-le-wagon.morbidite_h.tranche_age_intermediate`
-        ''').to_dataframe()
-        
-        df_capacite_hospi = client.query('''
-            SELECT * FROM `projet-jbn-data-le-wagon.capacite_services_h.jointure_capa_hospi_dureehospi_KPIs`
-        ''').to_dataframe()
+        df_capacite_hospi = load_table(
+            'projet-jbn-data-le-wagon.capacite_services_h.jointure_capa_hospi_dureehospi_KPIs', get_client
+        ).to_pandas()
         
         return df_nbr_hospi, df_duree_hospi, df_tranche_age_hospi, df_capacite_hospi, None
 
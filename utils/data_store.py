@@ -0,0 +1,146 @@
+import logging
+import streamlit as st
+import numpy as np
+import pandas as pd
+from google.cloud import bigquery
+from typing import Dict, List, Optional, Tuple, Union
+from utils.snapshot_cache import load_table, table_version
+from utils.dtype_schema import compact_dtypes
+from utils.view_specs import (
+    ViewSpec, MORBIDITE, PROJECT_ID, MORBIDITE_TABLE, CAPACITE_TABLE, CAPACITE_KPI_TABLE
+)
+
+# Colonnes selon lesquelles les pages découpent les tables
+VIEW_KEYS = ['classification', 'niveau', 'sexe', 'annee']
+
+# Occupation mémoire (Mo) avant/après compactage de chaque vue chargée dans le processus
+_MEMORY_USAGE: Dict[ViewSpec, Tuple[float, float]] = {}
+
+
+class DataStore:
+    """
+    Table chargée une seule fois par processus et triée selon VIEW_KEYS.
+
+    Chaque combinaison de clés occupe une plage contiguë de lignes : une vue
+    filtrée est donc une simple tranche `iloc[début:fin]` de la table partagée,
+    sans recopie des données, tant que les filtres désignent une plage continue.
+    """
+
+    def __init__(self, df: pd.DataFrame, keys: List[str] = VIEW_KEYS, version: Optional[str] = None):
+        # Version du snapshot source, pour invalider les caches dérivés (figures...)
+        self.version = version
+        self.keys = [key for key in keys if key in df.columns]
+        if self.keys:
+            df = df.sort_values(self.keys, kind='stable')
+        self.df = df.reset_index(drop=True)
+
+        # Bornes [début, fin) de chaque combinaison de clés dans la table triée
+        self._bounds: Dict[Tuple, Tuple[int, int]] = {}
+        if self.keys:
+            sizes = self.df.groupby(self.keys, sort=False, observed=True, dropna=False).size()
+            stops = np.cumsum(sizes.to_numpy())
+            starts = stops - sizes.to_numpy()
+            for key, start, stop in zip(sizes.index, starts, stops):
+                if not isinstance(key, tuple):
+                    key = (key,)
+                self._bounds[key] = (int(start), int(stop))
+
+    def view(self, **filters) -> pd.DataFrame:
+        """
+        Retourne les lignes correspondant aux filtres
+
+        Args:
+            **filters: Valeur ou liste de valeurs par clé de VIEW_KEYS
+                (None ou absent = pas de filtre sur cette clé)
+
+        Returns:
+            Tranche de la table partagée, à ne pas modifier en place
+        """
+        unknown = set(filters) - set(self.keys)
+        if unknown:
+            raise ValueError(f"Filtres non indexés : {sorted(unknown)}")
+
+        wanted = {
+            self.keys.index(key): set(value) if isinstance(value, (list, tuple, set)) else {value}
+            for key, value in filters.items()
+            if value is not None
+        }
+        ranges = [
+            bounds for key, bounds in self._bounds.items()
+            if all(key[position] in values for position, values in wanted.items())
+        ]
+        if not ranges:
+            return self.df.iloc[0:0]
+
+        # Fusion des plages adjacentes (les bornes sont déjà dans l'ordre de tri)
+        merged = [list(ranges[0])]
+        for start, stop in ranges[1:]:
+            if start == merged[-1][1]:
+                merged[-1][1] = stop
+            else:
+                merged.append([start, stop])
+
+        if len(merged) == 1:
+            start, stop = merged[0]
+            return self.df.iloc[start:stop]
+        return self.df.take(np.concatenate([np.arange(start, stop) for start, stop in merged]))
+
+
+@st.cache_resource
+def get_client() -> bigquery.Client:
+    gcp_service_account = st.secrets["gcp_service_account"]
+    return bigquery.Client.from_service_account_info(gcp_service_account)
+
+
+@st.cache_resource(show_spinner=False)
+def get_store(spec: ViewSpec = MORBIDITE) -> DataStore:
+    """Charge la vue une fois pour toutes les pages et sessions, via le cache de snapshots"""
+    table = load_table(spec, get_client)
+    df = table.to_pandas()
+
+    # Conversion unique de la date, attendue en datetime par les pages
+    if 'year' in df.columns:
+        df['year'] = pd.to_datetime(df['year'])
+
+    # Libellés en category, mesures en float32/int32
+    before = df.memory_usage(deep=True).sum() / 1024 ** 2
+    df = compact_dtypes(df)
+    after = df.memory_usage(deep=True).sum() / 1024 ** 2
+    _MEMORY_USAGE[spec] = (before, after)
+    logging.info(f"Vue {spec.table} [{spec.key}] : {before:.1f} Mo -> {after:.1f} Mo")
+
+    return DataStore(df, version=table_version(table))
+
+
+def data_version(*specs: ViewSpec) -> str:
+    """Identifiant des versions de snapshot des vues, à inclure dans les clés de cache dérivées"""
+    return '/'.join(get_store(spec).version or '-' for spec in specs)
+
+
+def get_view(spec: Union[ViewSpec, str] = MORBIDITE, **filters) -> pd.DataFrame:
+    """
+    Vue filtrée (classification, niveau, sexe, annee) d'une table partagée
+
+    Args:
+        spec: Spécification de la vue (colonnes et filtres poussés à la source)
+            ou identifiant de table pour la table complète
+        **filters: Filtres locaux sur les clés de VIEW_KEYS
+    """
+    if isinstance(spec, str):
+        spec = ViewSpec(spec)
+    return get_store(spec).view(**filters)
+
+
+def memory_usage_report() -> pd.DataFrame:
+    """Occupation mémoire des vues chargées dans le processus, avant et après compactage"""
+    rows = [
+        {
+            'table': spec.table.rsplit('.', 1)[-1],
+            'vue': spec.key,
+            'avant_mo': before,
+            'apres_mo': after,
+            'gain_percent': 100 * (1 - after / before) if before else 0.0
+        }
+        for spec, (before, after) in _MEMORY_USAGE.items()
+    ]
+    return pd.DataFrame(rows, columns=['table', 'vue', 'avant_mo', 'apres_mo', 'gain_percent'])
@@ -0,0 +1,59 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Libellés répétés sur toutes les lignes : stockés une seule fois par modalité
+CATEGORY_COLUMNS = [
+    'nom_region', 'region', 'nom_pathologie', 'pathologie',
+    'sexe', 'classification', 'niveau', 'cle_unique'
+]
+
+# Effectifs, taux et pourcentages : la précision float32/int32 suffit à l'affichage
+COMPACT_NUMERIC_PATTERN = re.compile(
+    r'^(tranche_age_|hospi_|evolution_|nbr_|AVG_|total_|tx_|indice_|taux_|'
+    r'lit_|place_|sejour_|journee_|passage_)'
+)
+
+_INT32 = np.iinfo(np.int32)
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applique le schéma de types compacts à une table chargée
+
+    Args:
+        df: Table brute (chaînes en object, nombres en float64/int64)
+
+    Returns:
+        Table avec les libellés en category et les mesures en float32/int32
+    """
+    df = df.copy(deep=False)
+    for col in df.columns:
+        dtype = df[col].dtype
+        if col in CATEGORY_COLUMNS:
+            if not isinstance(dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        elif COMPACT_NUMERIC_PATTERN.match(col):
+            if pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype):
+                values = df[col]
+                if values.empty or (values.min() >= _INT32.min and values.max() <= _INT32.max):
+                    df[col] = values.astype('int32')
+            elif pd.api.types.is_float_dtype(dtype):
+                df[col] = df[col].astype('float32')
+    return df
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Occupation mémoire d'une table, colonne par colonne
+
+    Returns:
+        DataFrame (colonne, type, memoire_mo) trié par occupation décroissante
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'colonne': usage.index,
+        'type': [str(df[col].dtype) for col in usage.index],
+        'memoire_mo': usage.to_numpy() / 1024 ** 2
+    })
+    return report.sort_values('memoire_mo', ascending=False, ignore_index=True)
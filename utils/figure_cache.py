@@ -0,0 +1,122 @@
+import os
+import threading
+import dataclasses
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from utils.data_store import data_version
+from utils.figure_json import figure_from_json, figure_to_json
+from utils.view_specs import ViewSpec
+
+# Taille maximale du cache de figures (JSON sérialisé), partagé par toutes les sessions
+FIGURE_CACHE_MB = float(os.environ.get("MEDICAL_DATA_FIGURE_CACHE_MB", "256"))
+
+
+class FigureCache:
+    """
+    Cache LRU de figures Plotly sérialisées en JSON, borné en taille.
+
+    Les entrées les moins récemment servies sont évincées dès que la taille
+    cumulée des JSON dépasse max_bytes. Les compteurs de succès, d'échecs et
+    d'évictions permettent de suivre son efficacité.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: Hashable, payload: str):
+        size = len(payload)
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            if size > self.max_bytes:
+                return
+            self._entries[key] = payload
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Union[go.Figure, str]]) -> str:
+        """JSON de la figure en cache, ou construit par build() puis mis en cache"""
+        payload = self.get(key)
+        if payload is None:
+            figure = build()
+            payload = figure if isinstance(figure, str) else figure_to_json(figure)
+            self.put(key, payload)
+        return payload
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entrees': len(self._entries),
+                'taille_mo': self._size / 1024 ** 2,
+                'max_mo': self.max_bytes / 1024 ** 2,
+                'succes': self.hits,
+                'echecs': self.misses,
+                'evictions': self.evictions,
+                'taux_succes_percent': 100 * self.hits / requests if requests else 0.0
+            }
+
+
+def normalize_filters(value) -> Hashable:
+    """État des filtres sous forme canonique et hashable (ordre des clés et des listes ignoré)"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        value = dataclasses.asdict(value)
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), normalize_filters(item)) for key, item in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(normalize_filters(item) for item in value))
+    if isinstance(value, (list, tuple, pd.Index, np.ndarray)):
+        return tuple(normalize_filters(item) for item in value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+@st.cache_resource(show_spinner=False)
+def get_figure_cache() -> FigureCache:
+    """Cache de figures unique pour le processus"""
+    return FigureCache(int(FIGURE_CACHE_MB * 1024 ** 2))
+
+
+def cached_figure(page: str, chart: str, filters, specs: Sequence[ViewSpec],
+                  build: Callable[[], Union[go.Figure, str]]) -> go.Figure:
+    """
+    Figure servie depuis le cache de figures du processus
+
+    Args:
+        page: Identifiant de la page
+        chart: Identifiant du graphique dans la page
+        filters: État des filtres dont dépend la figure
+        specs: Vues dont la figure est issue (leur version de snapshot entre dans la clé)
+        build: Construction de la figure (objet Plotly ou JSON) en cas d'absence du cache
+    """
+    key: Tuple = (page, chart, normalize_filters(filters), data_version(*specs))
+    return figure_from_json(get_figure_cache().get_or_build(key, build))
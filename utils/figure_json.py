@@ -0,0 +1,19 @@
+import json
+import plotly.graph_objects as go
+import plotly.io as pio
+from typing import Union
+
+
+def figure_to_json(fig: Union[go.Figure, dict]) -> str:
+    """Sérialise une figure (objet Plotly ou dictionnaire déjà valide) sans nouvelle validation"""
+    return pio.to_json(fig, validate=False)
+
+
+def figure_from_json(payload: str) -> go.Figure:
+    """
+    Reconstruit une figure sérialisée par figure_to_json
+
+    La figure a été validée (ou construite champ par champ) lors de sa
+    création : on évite ici la revalidation des traces et de la mise en page.
+    """
+    return go.Figure(json.loads(payload), _validate=False)
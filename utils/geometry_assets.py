@@ -0,0 +1,273 @@
+# Construction des contours de la carte : niveaux de simplification et TopoJSON.
+#
+# Les contours GeoJSON sont découpés en arcs partagés entre territoires voisins,
+# chaque arc est simplifié une seule fois (Douglas-Peucker, extrémités fixes) pour
+# que les frontières communes restent jointives, puis les coordonnées sont
+# quantifiées et encodées en différences (TopoJSON).
+#
+# Le même passage produit la table des centroïdes des territoires, utilisée
+# hors ligne par le système de recommandation pour les distances.
+#
+# Usage (depuis la racine du projet) : python -m utils.geometry_assets
+import os
+import csv
+import json
+import math
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+# Contours sources et nom de l'objet TopoJSON correspondant
+SOURCES = {
+    'departements': 'data/departements-version-simplifiee.geojson',
+    'regions': 'data/regions-version-simplifiee.geojson',
+}
+
+# Répertoire des contours générés
+ASSETS_DIR = os.path.join('data', 'maps')
+
+# Table des centroïdes (niveau, code, nom, latitude, longitude)
+CENTROIDS_PATH = os.path.join('data', 'territory_centroids.csv')
+
+# Niveau administratif de chaque contour source, tel qu'affiché dans l'application
+LEVELS = {'departements': "Départements", 'regions': "Régions"}
+
+# Niveaux de zoom Leaflet pour lesquels un niveau de simplification est produit
+ZOOM_LEVELS = (4, 6, 8)
+
+# Latitude de référence (France métropolitaine) pour convertir un pixel en degrés
+REFERENCE_LATITUDE = 46.6
+
+# Taille de la grille de quantification sur l'emprise des contours
+QUANTIZATION = 100_000
+
+Point = Tuple[float, float]
+
+
+def tolerance_for_zoom(zoom: int) -> float:
+    """Tolérance de simplification (degrés) : un demi-pixel au zoom donné"""
+    degrees_per_pixel = 360 / (256 * 2 ** zoom) * math.cos(math.radians(REFERENCE_LATITUDE))
+    return degrees_per_pixel / 2
+
+
+def asset_path(name: str, zoom: int) -> str:
+    return os.path.join(ASSETS_DIR, f"{name}-z{zoom}.topojson")
+
+
+def level_for_zoom(zoom: int) -> int:
+    """Niveau le plus léger restant fidèle au zoom demandé"""
+    for level in ZOOM_LEVELS:
+        if level >= zoom:
+            return level
+    return ZOOM_LEVELS[-1]
+
+
+def _polygons(geometry: Dict) -> List[List[List[Point]]]:
+    if geometry['type'] == 'Polygon':
+        polygons = [geometry['coordinates']]
+    else:
+        polygons = geometry['coordinates']
+    return [
+        [[tuple(point) for point in ring[:-1]] for ring in polygon]
+        for polygon in polygons
+    ]
+
+
+def _junctions(rings: List[List[Point]]) -> set:
+    """Points où se rejoignent ou se séparent des contours (voisins différents selon le contour)"""
+    neighbours: Dict[Point, frozenset] = {}
+    junctions = set()
+    for ring in rings:
+        n = len(ring)
+        for i, point in enumerate(ring):
+            pair = frozenset((ring[i - 1], ring[(i + 1) % n]))
+            seen = neighbours.setdefault(point, pair)
+            if seen != pair:
+                junctions.add(point)
+    return junctions
+
+
+def _cut_ring(ring: List[Point], junctions: set) -> List[List[Point]]:
+    """Découpe un contour fermé en arcs entre points de jonction"""
+    cuts = [i for i, point in enumerate(ring) if point in junctions]
+    if not cuts:
+        return [ring + [ring[0]]]
+    rotated = ring[cuts[0]:] + ring[:cuts[0]]
+    cuts = [i - cuts[0] for i in cuts] + [len(ring)]
+    rotated = rotated + [rotated[0]]
+    return [rotated[start:stop + 1] for start, stop in zip(cuts[:-1], cuts[1:])]
+
+
+def _douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Masque des points conservés, extrémités toujours gardées"""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, stop = stack.pop()
+        if stop - start < 2:
+            continue
+        segment = points[stop] - points[start]
+        offsets = points[start + 1:stop] - points[start]
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            index = start + 1 + farthest
+            keep[index] = True
+            stack.extend([(start, index), (index, stop)])
+    return keep
+
+
+def simplify_arc(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Simplifie un arc ; un arc fermé garde au moins un triangle"""
+    keep = _douglas_peucker(points, tolerance)
+    if np.array_equal(points[0], points[-1]) and keep.sum() < 4:
+        keep[np.linspace(0, len(points) - 1, 4).astype(int)] = True
+    return points[keep]
+
+
+def _arc_geometries(features: List[Dict]) -> Tuple[List[np.ndarray], List[Dict]]:
+    """Arcs uniques (un arc parcouru en sens inverse est noté ~index) et géométries en arcs"""
+    polygons_by_feature = [_polygons(feature['geometry']) for feature in features]
+    junctions = _junctions([ring for polygons in polygons_by_feature for polygon in polygons for ring in polygon])
+
+    arcs: List[np.ndarray] = []
+    index: Dict[Tuple[Point, ...], int] = {}
+
+    def arc_id(points: List[Point]) -> int:
+        key = tuple(points)
+        if key in index:
+            return index[key]
+        reverse = key[::-1]
+        if reverse in index:
+            return ~index[reverse]
+        index[key] = len(arcs)
+        arcs.append(np.asarray(points, dtype='float64'))
+        return index[key]
+
+    geometries = []
+    for feature, polygons in zip(features, polygons_by_feature):
+        polygon_arcs = [
+            [[arc_id(arc) for arc in _cut_ring(ring, junctions)] for ring in polygon]
+            for polygon in polygons
+        ]
+        geometry = (
+            {'type': 'Polygon', 'arcs': polygon_arcs[0]}
+            if feature['geometry']['type'] == 'Polygon'
+            else {'type': 'MultiPolygon', 'arcs': polygon_arcs}
+        )
+        geometry['properties'] = feature['properties']
+        geometries.append(geometry)
+    return arcs, geometries
+
+
+def _quantize(arcs: List[np.ndarray]) -> Tuple[Dict, List[List[List[int]]]]:
+    """Coordonnées entières sur une grille QUANTIZATION², encodées en différences"""
+    stacked = np.concatenate(arcs)
+    lower, upper = stacked.min(axis=0), stacked.max(axis=0)
+    scale = np.where(upper > lower, (upper - lower) / (QUANTIZATION - 1), 1.0)
+
+    encoded = []
+    for arc in arcs:
+        grid = np.round((arc - lower) / scale).astype(np.int64)
+        # Points confondus après quantification supprimés (deux points minimum par arc)
+        distinct = np.ones(len(grid), dtype=bool)
+        distinct[1:] = np.any(grid[1:] != grid[:-1], axis=1)
+        grid = grid[distinct] if distinct.sum() >= 2 else grid[[0, -1]]
+        deltas = np.vstack([grid[:1], np.diff(grid, axis=0)])
+        encoded.append(deltas.tolist())
+    transform = {'scale': scale.tolist(), 'translate': lower.tolist()}
+    return transform, encoded
+
+
+def build_topology(geojson: Dict, object_name: str, tolerance: Optional[float] = None) -> Dict:
+    """
+    TopoJSON quantifié à arcs partagés, éventuellement simplifié
+
+    Args:
+        geojson: FeatureCollection de polygones
+        object_name: Nom de l'objet dans la topologie (objects.<nom>)
+        tolerance: Tolérance de simplification en degrés (None = pas de simplification)
+    """
+    arcs, geometries = _arc_geometries(geojson['features'])
+    if tolerance is not None:
+        arcs = [simplify_arc(arc, tolerance) for arc in arcs]
+    transform, encoded = _quantize(arcs)
+    return {
+        'type': 'Topology',
+        'transform': transform,
+        'objects': {object_name: {'type': 'GeometryCollection', 'geometries': geometries}},
+        'arcs': encoded,
+    }
+
+
+def polygon_centroid(geometry: Dict) -> Point:
+    """
+    Centroïde surfacique (latitude, longitude) d'un Polygon ou MultiPolygon
+
+    Calculé dans un plan local (longitudes multipliées par le cosinus de la
+    latitude moyenne), trous déduits, îles pondérées par leur surface.
+    """
+    polygons = [geometry['coordinates']] if geometry['type'] == 'Polygon' else geometry['coordinates']
+    rings = [np.asarray(ring, dtype='float64') for polygon in polygons for ring in polygon]
+    scale = math.cos(math.radians(np.concatenate(rings)[:, 1].mean()))
+
+    area = cx = cy = 0.0
+    for polygon in polygons:
+        for i, ring in enumerate(polygon):
+            ring = np.asarray(ring, dtype='float64')
+            x, y = ring[:, 0] * scale, ring[:, 1]
+            cross = x[:-1] * y[1:] - x[1:] * y[:-1]
+            ring_area = cross.sum() / 2
+            if ring_area == 0:
+                continue
+            ring_cx = ((x[:-1] + x[1:]) * cross).sum() / (6 * ring_area)
+            ring_cy = ((y[:-1] + y[1:]) * cross).sum() / (6 * ring_area)
+            # Contour extérieur ajouté, trous retranchés, quel que soit le sens de parcours
+            weight = abs(ring_area) if i == 0 else -abs(ring_area)
+            area += weight
+            cx += weight * ring_cx
+            cy += weight * ring_cy
+    return cy / area, cx / area / scale
+
+
+def write_centroids(sources: Dict[str, str] = SOURCES, path: str = CENTROIDS_PATH) -> int:
+    """Écrit la table des centroïdes de tous les territoires des contours sources"""
+    rows = []
+    for name, source in sources.items():
+        with open(source, 'r', encoding='utf-8') as f:
+            geojson = json.load(f)
+        for feature in geojson['features']:
+            latitude, longitude = polygon_centroid(feature['geometry'])
+            properties = feature['properties']
+            rows.append((LEVELS[name], properties['code'], properties['nom'], round(latitude, 5), round(longitude, 5)))
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['niveau', 'code', 'nom', 'latitude', 'longitude'])
+        writer.writerows(rows)
+    return len(rows)
+
+
+def write_assets(sources: Dict[str, str] = SOURCES, zoom_levels=ZOOM_LEVELS) -> List[Tuple[str, int]]:
+    """Génère un TopoJSON par contour source et par niveau de zoom"""
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    written = []
+    for name, path in sources.items():
+        with open(path, 'r', encoding='utf-8') as f:
+            geojson = json.load(f)
+        for zoom in zoom_levels:
+            topology = build_topology(geojson, name, tolerance_for_zoom(zoom))
+            target = asset_path(name, zoom)
+            with open(target, 'w', encoding='utf-8') as f:
+                json.dump(topology, f, ensure_ascii=False, separators=(',', ':'))
+            written.append((target, os.path.getsize(target)))
+    return written
+
+
+if __name__ == '__main__':
+    for target, size in write_assets():
+        print(f"{target} : {size / 1024:.0f} Ko")
+    print(f"{CENTROIDS_PATH} : {write_centroids()} territoires")
@@ -0,0 +1,1219 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.data_store import get_view
+from utils.aggregate_cube import get_cube
+from utils.age_bands import melt_age_bands
+from utils.animation_frames import FRAME_COLUMNS, interpolate_frames, scatter3d_animation_json
+from utils.figure_cache import cached_figure
+from utils.view_specs import ViewSpec, SERVICE_MORBIDITE, SERVICE_CAPACITE, AGE_COLUMNS, DUREE_COLUMNS
+
+# Définition des couleurs du thème
+MAIN_COLOR = '#003366'  # Bleu marine principal
+SECONDARY_COLOR = '#AFDC8F'  # Vert clair complémentaire
+ACCENT_COLOR = '#3D7317'  # Vert foncé pour les accents
+
+ALL_SEXES = "Ensemble"
+ALL_YEARS = "Toutes les années"
+ALL_REGIONS = "Tous les départements"
+ALL_PATHOLOGIES = "Toutes les pathologies"
+
+# Style CSS personnalisé
+PAGE_STYLE = """
+    <style>
+    .main-title {
+        color: #003366;
+        font-size: 2.5rem;
+        font-weight: bold;
+        margin-bottom: 2rem;
+        text-align: center;
+    }
+    .section-title {
+        color: #003366;
+        font-size: 1.8rem;
+        font-weight: bold;
+        margin: 1.5rem 0;
+    }
+    .card {
+        padding: 1rem;
+        border-radius: 10px;
+        background-color: #f8f9fa;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        margin-bottom: 1rem;
+    }
+    </style>
+"""
+
+
+@dataclass(frozen=True)
+class ServiceConfig:
+    """Paramètres propres à une page de service médical"""
+
+    code: str  # Valeur de la colonne classification
+    slug: str  # Suffixe des clés de widgets
+    title: str
+    pathology_label: str  # Complément du sélecteur de pathologie ("en chirurgie")
+    pathology_adjective: str  # Titre du graphique par pathologie ("chirurgicales")
+    colorscale: str
+    n_pathologies: Tuple[int, int, int]  # Slider : minimum, maximum, valeur par défaut
+    capacity_x_range: Tuple[float, float]
+    capacity_y_range: Tuple[float, float]
+    show_decreases: bool = False  # Second tableau trié par baisses
+    show_urgences: bool = False  # Métrique des passages aux urgences
+    equipment_columns: Tuple[str, ...] = ('lit_hospi_complete', 'place_hospi_partielle')
+    equipment_labels: Dict[str, str] = field(default_factory=lambda: {
+        'lit_hospi_complete': "1 jour et plus",
+        'place_hospi_partielle': "24 h",
+    })
+
+    def __hash__(self):
+        return hash(self.code)
+
+
+SERVICES: Dict[str, ServiceConfig] = {
+    'C': ServiceConfig(
+        code='C', slug='chir', title="👨‍⚕️ Service de Chirurgie",
+        pathology_label="en chirurgie", pathology_adjective="chirurgicales",
+        colorscale='YlOrRd', n_pathologies=(5, 57, 20),
+        capacity_x_range=(0, 5500), capacity_y_range=(0, 440),
+        show_decreases=True
+    ),
+    'M': ServiceConfig(
+        code='M', slug='med', title="⚕️ Service de Médecine",
+        pathology_label="en médecine", pathology_adjective="médicales",
+        colorscale='Darkmint', n_pathologies=(5, 70, 20),
+        capacity_x_range=(0, 12000), capacity_y_range=(0, 210),
+        show_decreases=True, show_urgences=True
+    ),
+    'O': ServiceConfig(
+        code='O', slug='obs', title="👶 Service Obstétrique",
+        pathology_label="en obstétrie", pathology_adjective="médicales",
+        colorscale='Burgyl', n_pathologies=(5, 14, 7),
+        capacity_x_range=(0, 1500), capacity_y_range=(0, 310),
+        show_decreases=True,
+        equipment_labels={
+            'lit_hospi_complete': "Lits d'hospitalisation complète",
+            'place_hospi_partielle': "Places en hospitalisation partielle",
+        }
+    ),
+    'PSY': ServiceConfig(
+        code='PSY', slug='psy', title="🧠 Service Psychiatrique",
+        pathology_label="en psychiatrie", pathology_adjective="psychiatriques",
+        colorscale='Teal', n_pathologies=(5, 7, 7),
+        capacity_x_range=(0, 3000), capacity_y_range=(0, 50)
+    ),
+    'SSR': ServiceConfig(
+        code='SSR', slug='ssr', title="♿ Service SSR (Soins de santé et de réhabilitation)",
+        pathology_label="en SSR", pathology_adjective="SSR",
+        colorscale='Oryel', n_pathologies=(5, 6, 6),
+        capacity_x_range=(0, 6000), capacity_y_range=(0, 20)
+    ),
+    'ESND': ServiceConfig(
+        code='ESND', slug='esnd', title="🏥 Service ESND (Établissements de soins longue durée)",
+        pathology_label="en ESND", pathology_adjective="ESND",
+        colorscale='Ice', n_pathologies=(1, 5, 5),
+        capacity_x_range=(0, 3000), capacity_y_range=(-100, 500),
+        equipment_columns=('lit_hospi_complete',)
+    ),
+}
+
+
+@dataclass(frozen=True)
+class ServiceFilters:
+    """Sélections de l'utilisateur (None = pas de filtre)"""
+
+    sexe: str = ALL_SEXES
+    annee: Optional[int] = None
+    nom_region: Optional[str] = None
+    nom_pathologie: Optional[str] = None
+
+    def cube_filters(self, service: str, **overrides) -> Dict:
+        """Filtres du cube équivalents au DataFrame filtré des pages (sexe « Ensemble » = tous)"""
+        filters = dict(
+            classification=service,
+            sexe=self.sexe if self.sexe != ALL_SEXES else None,
+            annee=self.annee,
+            nom_region=self.nom_region
+        )
+        filters.update(overrides)
+        return filters
+
+
+def format_number(number):
+    """Format un nombre en K ou M selon sa taille"""
+    try:
+        num = float(str(number).replace(',', ''))
+        if num >= 1_000_000:
+            return f"{num/1_000_000:.1f}M"
+        elif num >= 1_000:
+            return f"{num/1_000:.1f}K"
+        else:
+            return f"{num:.0f}"
+    except (ValueError, TypeError):
+        return str(number)
+
+
+# ---------------------------------------------------------------------------
+# Calculs et figures partagés entre services, pages et sessions. Les tableaux
+# sont mis en cache par st.cache_data, les figures par le cache de figures du
+# processus ; les clés sont (service, filtres, paramètres d'affichage).
+# ---------------------------------------------------------------------------
+
+@st.cache_data(show_spinner=False)
+def service_kpis(service: str, filters: ServiceFilters) -> Dict:
+    """Métriques d'en-tête pour le sexe, la pathologie, l'année et le département sélectionnés"""
+    cube = get_cube(SERVICE_MORBIDITE)
+    totals = cube.aggregate(
+        [],
+        ['nbr_hospi', 'hospi_total_24h', 'AVG_duree_hospi', 'indice_comparatif_tt_age_percent', *AGE_COLUMNS],
+        **filters.cube_filters(service, sexe=filters.sexe, nom_pathologie=filters.nom_pathologie)
+    ).iloc[0]
+
+    total_hospi = totals['nbr_hospi']
+    age_sums = totals[AGE_COLUMNS].astype(float)
+    return {
+        'total_hospi': total_hospi,
+        'avg_duration': totals['AVG_duree_hospi'],
+        'indice': totals['indice_comparatif_tt_age_percent'],
+        'percentage_24h': (totals['hospi_total_24h'] / total_hospi * 100) if total_hospi > 0 else 0,
+        'most_common_age': age_sums.idxmax().replace('tranche_age_', '')
+    }
+
+
+def _top_pathologies(service: str, filters: ServiceFilters, n_pathologies: int) -> pd.DataFrame:
+    hospi_by_pathology = get_cube(SERVICE_MORBIDITE).aggregate(
+        'nom_pathologie', ['nbr_hospi', 'AVG_duree_hospi'], **filters.cube_filters(service)
+    )
+    return hospi_by_pathology.sort_values(by='nbr_hospi', ascending=False).head(n_pathologies)
+
+
+def pathology_bar_figure(service: str, filters: ServiceFilters, n_pathologies: int) -> go.Figure:
+    """Hospitalisations (barres) et durée moyenne de séjour (ligne) des pathologies les plus fréquentes"""
+    config = SERVICES[service]
+    hospi_by_pathology = _top_pathologies(service, filters, n_pathologies)
+
+    # Création d'une figure avec deux axes Y
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+    # Ajout des barres pour le nombre d'hospitalisations
+    fig.add_trace(
+        go.Bar(
+            x=hospi_by_pathology['nom_pathologie'],
+            y=hospi_by_pathology['nbr_hospi'],
+            name="Nombre d'hospitalisations",
+            marker_color=MAIN_COLOR,
+            customdata=hospi_by_pathology[['nom_pathologie', 'nbr_hospi']],
+            hovertemplate="<b>Pathologie:</b> %{customdata[0]}<br>" +
+                        "<b>Hospitalisations:</b> %{customdata[1]:,.0f}<br><extra></extra>"
+        ),
+        secondary_y=False
+    )
+
+    # Ajout de la ligne pour la durée moyenne
+    fig.add_trace(
+        go.Scatter(
+            x=hospi_by_pathology['nom_pathologie'],
+            y=hospi_by_pathology['AVG_duree_hospi'],
+            name="Durée moyenne de séjour",
+            line=dict(color=SECONDARY_COLOR, width=2),
+            mode='lines+markers',
+            marker=dict(size=6),
+            customdata=hospi_by_pathology[['nom_pathologie', 'AVG_duree_hospi']],
+            hovertemplate="<b>Pathologie:</b> %{customdata[0]}<br>" +
+                        "<b>Durée moyenne:</b> %{customdata[1]:.1f} jours<br><extra></extra>"
+        ),
+        secondary_y=True
+    )
+
+    # Mise à jour de la mise en page
+    fig.update_layout(
+        title=dict(
+            text=f'Pathologies {config.pathology_adjective} : Hospitalisations et durée moyenne de séjour',
+            y=0.95,
+            x=0.5,
+            xanchor='right',
+            yanchor='top'
+        ),
+        height=500,
+        template='plotly_white',
+        showlegend=False,
+        margin=dict(t=100, b=50, l=50, r=50)
+    )
+
+    # Mise à jour des titres des axes Y
+    fig.update_yaxes(title_text="Nombre d'hospitalisations", secondary_y=False)
+    fig.update_yaxes(title_text="Durée moyenne de séjour (jours)", secondary_y=True)
+    return fig
+
+
+def pathology_scatter_figure(service: str, filters: ServiceFilters, n_pathologies: int) -> go.Figure:
+    """Relation hospitalisations / durée moyenne, animée par année si aucune année n'est sélectionnée"""
+    config = SERVICES[service]
+    top_pathologies = _top_pathologies(service, filters, n_pathologies)['nom_pathologie']
+
+    # Hospitalisations et durée moyenne par pathologie et par année
+    combined_data = get_cube(SERVICE_MORBIDITE).aggregate(
+        ['nom_pathologie', 'annee'], ['nbr_hospi', 'AVG_duree_hospi'], **filters.cube_filters(service)
+    )
+
+    # Filtrer pour garder seulement les n_pathologies plus fréquentes par année
+    combined_data = combined_data[combined_data['nom_pathologie'].isin(top_pathologies)]
+
+    # Calcul des marges pour les axes en prenant en compte les maximums par année
+    max_hospi_by_year = combined_data.groupby('annee')['nbr_hospi'].max().max()
+    max_duree_by_year = combined_data.groupby('annee')['AVG_duree_hospi'].max().max()
+
+    x_margin = max_hospi_by_year * 0.2  # Augmentation de la marge à 20%
+    y_margin = max_duree_by_year * 0.2  # Augmentation de la marge à 20%
+
+    labels = {'nbr_hospi': 'Nombre d\'hospitalisations',
+        'AVG_duree_hospi': 'Durée moyenne de séjour (jours)',
+        'nom_pathologie': 'Pathologie'}
+
+    # Création du scatter plot avec animation
+    if filters.annee is not None:
+        # Si une année spécifique est sélectionnée, créer un scatter plot statique
+        fig = px.scatter(
+            combined_data,
+            x='nbr_hospi',
+            y='AVG_duree_hospi',
+            text='nom_pathologie',
+            title=f'Relation entre nombre d\'hospitalisations et durée moyenne de séjour ({filters.annee})',
+            labels=labels,
+            size=combined_data['nbr_hospi'].tolist(),
+            size_max=40,
+            color='AVG_duree_hospi',
+            color_continuous_scale=config.colorscale,
+            range_x=[0, max_hospi_by_year + x_margin],
+            range_y=[0, max_duree_by_year + y_margin]
+        )
+    else:
+        # Si toutes les années sont sélectionnées, créer le scatter plot animé
+        fig = px.scatter(
+            combined_data,
+            x='nbr_hospi',
+            y='AVG_duree_hospi',
+            text='nom_pathologie',
+            animation_frame='annee',
+            animation_group='nom_pathologie',
+            title=f'Relation entre nombre d\'hospitalisations et durée moyenne de séjour',
+            labels=labels,
+            size=combined_data['nbr_hospi'].tolist(),
+            size_max=40,
+            color='AVG_duree_hospi',
+            color_continuous_scale=config.colorscale,
+            range_x=[0, max_hospi_by_year + x_margin],
+            range_y=[0, max_duree_by_year + y_margin]
+        )
+
+        # Configuration de l'animation
+        if hasattr(fig, 'layout') and hasattr(fig.layout, 'updatemenus'):
+            try:
+                fig.layout.sliders[0].x = 0.1
+                fig.layout.updatemenus[0].buttons[0].args[1]['frame']['duration'] = 1500
+                fig.layout.updatemenus[0].buttons[0].args[1]['transition']['duration'] = 500
+            except (IndexError, KeyError, AttributeError):
+                pass  # Ignorer les erreurs si la configuration de l'animation échoue
+
+    # Personnalisation du graphique
+    fig.update_traces(
+        textposition='top center',
+        hovertemplate="<b>%{text}</b><br>" +
+                    "Hospitalisations: %{x:,.0f}<br>" +
+                    "Durée moyenne: %{y:.1f} jours<br>" +
+                    "<extra></extra>"
+    )
+
+    # Mise à jour de la mise en page
+    fig.update_layout(
+        height=800,
+        template='plotly_white',
+        showlegend=False,
+        margin=dict(t=100, b=100, l=100, r=150),
+        annotations=[
+            dict(
+                text="<b>Légende</b> : <br>La taille des points représente le nombre d'hospitalisations<br>La couleur indique la durée moyenne de séjour",
+                showarrow=False,
+                xref="paper", yref="paper",
+                x=0.8, y=1.1,
+                align="left",
+                xanchor="left"
+            )
+        ]
+    )
+    return fig
+
+
+def pathology_3d_json(service: str, filters: ServiceFilters, n_pathologies: int) -> str:
+    """Évolution animée des pathologies selon hospitalisations, durée moyenne et indice comparatif (JSON)"""
+    config = SERVICES[service]
+    top_pathologies = _top_pathologies(service, filters, n_pathologies)['nom_pathologie']
+
+    # Les trois métriques par pathologie et par année
+    combined_data_3d = get_cube(SERVICE_MORBIDITE).aggregate(
+        ['nom_pathologie', 'annee'], list(FRAME_COLUMNS), **filters.cube_filters(service)
+    )
+
+    # Filtrer pour garder seulement les n_pathologies plus fréquentes
+    combined_data_3d = combined_data_3d[combined_data_3d['nom_pathologie'].isin(top_pathologies)]
+
+    # Années et transitions interpolées calculées d'un bloc, figure sérialisée une seule fois
+    return scatter3d_animation_json(
+        interpolate_frames(combined_data_3d, 'annee'),
+        config.colorscale,
+        title=dict(
+            text='Évolution des pathologies selon trois dimensions clés',
+            y=0.95,
+            x=0.4,
+            xanchor='right',
+            yanchor='top'
+        ),
+        scene=dict(
+            xaxis_title='Nombre d\'hospitalisations',
+            yaxis_title='Durée moyenne de séjour (jours)',
+            zaxis_title='Indice comparatif (%)',
+            camera=dict(
+                up=dict(x=0, y=0, z=1),
+                center=dict(x=0, y=0, z=0),
+                eye=dict(x=1.5, y=1.5, z=1.5)
+            )
+        ),
+        height=800,
+        template='plotly_white',
+        showlegend=True,
+        legend=dict(
+            yanchor="top",
+            y=1.25,
+            xanchor="right",
+            x=0.99
+        ),
+        width=800,
+        annotations=[
+            dict(
+                text="<b>Légende</b> : <br>La taille des points représente le nombre d'hospitalisations<br>La couleur indique la durée moyenne de séjour",
+                showarrow=False,
+                xref="paper", yref="paper",
+                x=0.8, y=1.1,
+                align="left",
+                xanchor="left"
+            )
+        ],
+        margin=dict(t=100, b=50, l=50, r=50)  # Augmenter la marge du haut pour plus d'espace
+    )
+
+
+def _evolution_table(cube_slice, by: List[str], filters: Dict, years: List) -> pd.DataFrame:
+    """Hospitalisations totales et évolutions annuelles (%) par combinaison des axes `by`"""
+
+    def hospi_by_year(year):
+        return cube_slice(by, ['nbr_hospi'], **{**filters, 'annee': year}).set_index(by)['nbr_hospi']
+
+    # Calculer les évolutions année par année
+    evolutions_by_year = {}
+    for i in range(len(years)-1):
+        current_year = years[i]
+        next_year = years[i+1]
+
+        # Calculer l'évolution en pourcentage
+        current_data = hospi_by_year(current_year)
+        next_data = hospi_by_year(next_year)
+        evolution = ((next_data - current_data) / current_data * 100).fillna(0)
+        evolutions_by_year[f'{current_year}-{next_year}'] = evolution.dropna()
+
+    # Créer le DataFrame de base avec le nombre total d'hospitalisations
+    df_summary = cube_slice(by, ['nbr_hospi'], **filters)
+
+    # Ajouter les évolutions année par année
+    for period, evolution in evolutions_by_year.items():
+        df_summary = df_summary.merge(
+            evolution.reset_index().rename(columns={'nbr_hospi': f'Évol. {period} (%)'}),
+            on=by,
+            how='left'
+        )
+
+    # Calculer l'évolution globale (2018-2022)
+    hospi_2018 = hospi_by_year(min(years))
+    hospi_2022 = hospi_by_year(max(years))
+    evolution_globale = ((hospi_2022 - hospi_2018) / hospi_2018 * 100).fillna(0)
+
+    # Ajouter l'évolution globale au DataFrame
+    return df_summary.merge(
+        evolution_globale.reset_index().rename(columns={'nbr_hospi': 'Évol. globale (%)'}),
+        on=by,
+        how='left'
+    )
+
+
+@st.cache_data(show_spinner=False)
+def pathology_evolution_summary(service: str, filters: ServiceFilters) -> pd.DataFrame:
+    """Tableau des évolutions par pathologie, trié par évolution globale décroissante"""
+    cube = get_cube(SERVICE_MORBIDITE)
+    cube_filters = filters.cube_filters(service)
+    years = sorted(cube.aggregate('annee', ['nbr_hospi'], **cube_filters)['annee'])
+
+    df_summary = _evolution_table(cube.aggregate, ['nom_pathologie'], cube_filters, years)
+
+    # Trier par évolution globale décroissante
+    df_summary = df_summary.sort_values('Évol. globale (%)', ascending=False)
+
+    # Renommer les colonnes pour l'affichage
+    return df_summary.rename(columns={'nom_pathologie': 'Pathologie', 'nbr_hospi': 'Hospitalisations'})
+
+
+def _capacity_view(service: str, filters: ServiceFilters) -> pd.DataFrame:
+    """Données de capacité du service, filtrées par année et département"""
+    df_capacity = get_view(SERVICE_CAPACITE, classification=service, annee=filters.annee)
+    if filters.nom_region is not None:
+        df_capacity = df_capacity[df_capacity['nom_region'] == filters.nom_region]
+    return df_capacity
+
+
+@st.cache_data(show_spinner=False)
+def capacity_overview(service: str, filters: ServiceFilters) -> Tuple[Dict, List[str]]:
+    """Métriques clés de capacité et départements triés par nombre total d'hospitalisations"""
+    df_capacity = _capacity_view(service, filters)
+    first = df_capacity.iloc[0] if len(df_capacity) else pd.Series(dtype=float)
+    kpis = {
+        'total_lits': df_capacity['lit_hospi_complete'].sum(),
+        'total_places': df_capacity['place_hospi_partielle'].sum(),
+        'total_urgences': df_capacity['passage_urgence'].sum(),
+        'taux_occupation': first.get('taux_occupation', float('nan')),
+        'taux_equipement': first.get('taux_equipement', float('nan')),
+    }
+
+    # Calculer le nombre total d'hospitalisations par département
+    total_hospi_by_dept = get_cube(SERVICE_CAPACITE).aggregate(
+        'nom_region',
+        DUREE_COLUMNS,
+        classification=service,
+        annee=filters.annee,
+        nom_region=filters.nom_region
+    )
+    total_hospi_by_dept['total_hospi'] = total_hospi_by_dept[DUREE_COLUMNS].sum(axis=1)
+
+    # Trier les départements par nombre total d'hospitalisations
+    total_hospi_by_dept = total_hospi_by_dept.sort_values('total_hospi', ascending=False)
+    return kpis, total_hospi_by_dept['nom_region'].tolist()
+
+
+def _top_capacity_view(service: str, filters: ServiceFilters, n_departements: int) -> pd.DataFrame:
+    df_capacity = _capacity_view(service, filters)
+
+    # Filtrer les départements selon le slider
+    top_departements = capacity_overview(service, filters)[1][:n_departements]
+    return df_capacity[df_capacity['nom_region'].isin(top_departements)]
+
+
+def capacity_scatter_figure(service: str, filters: ServiceFilters, n_departements: int) -> go.Figure:
+    """Capacité et taux d'occupation des départements retenus, animés par année"""
+    config = SERVICES[service]
+    df_capacity_filtered = _top_capacity_view(service, filters, n_departements)
+
+    # Scatter plot animé avec Plotly Express
+    df_scatter = df_capacity_filtered.groupby(['annee', 'nom_region'], observed=True).agg({
+        'taux_occupation': 'first',
+        'lit_hospi_complete': 'sum',
+        'sejour_hospi_complete': 'sum'
+    }).reset_index()
+
+    # Multiplier le taux d'occupation par 100
+    df_scatter['taux_occupation'] = df_scatter['taux_occupation'] * 100
+
+    # Créer le graphique animé avec Plotly Express
+    fig4 = px.scatter(df_scatter,
+        x='lit_hospi_complete',
+        y='taux_occupation',
+        animation_frame='annee',
+        size='sejour_hospi_complete',
+        color='sejour_hospi_complete',
+        hover_name='nom_region',
+        text='nom_region',
+        size_max=50,
+        color_continuous_scale='Rainbow',
+        labels={
+            'value': 'Nombre',
+            'variable': 'Type',
+            'annee': 'Année',
+            'lit_hospi_complete': "Lits d'hospitalisation complète",
+            'sejour_hospi_complete': "Nombre de séjours",
+            'taux_occupation': "Taux d'occupation (%)"
+        },
+        title="Évolution de la capacité et du taux d'occupation par départements"
+    )
+    fig4.update_traces(
+        hovertemplate="<b>%{hovertext}</b><br>" +
+                      "Lits: " + format_number("%{x}") + "<br>" +
+                      "Taux d'occupation: %{y:.1f}%<br>" +
+                      "Séjours: " + format_number("%{marker.size}")
+    )
+
+    # Personnaliser le layout
+    fig4.update_traces(
+        textposition='top center',
+        mode='markers+text'
+    )
+
+    # Calculer les limites des axes basées sur les données
+    x_margin = (df_scatter['lit_hospi_complete'].max() - df_scatter['lit_hospi_complete'].min()) * 0.1
+    y_margin = (df_scatter['taux_occupation'].max() - df_scatter['taux_occupation'].min()) * 0.1
+
+    fig4.update_layout(
+        height=600,
+        showlegend=False,
+        xaxis=dict(
+            range=[
+                df_scatter['lit_hospi_complete'].min() - x_margin,
+                df_scatter['lit_hospi_complete'].max() + x_margin
+            ]
+        ),
+        yaxis=dict(
+            range=[
+                max(0, df_scatter['taux_occupation'].min() - y_margin),
+                df_scatter['taux_occupation'].max() + y_margin
+            ]
+        ),
+        updatemenus=[{
+            'type': 'buttons',
+            'showactive': False,
+            'y': -0.1,
+            'x': 0.1,
+            'xanchor': 'right',
+            'yanchor': 'top',
+            'pad': {'t': 0, 'r': 10}
+        }],
+        sliders=[{
+            'currentvalue': {
+                'font': {'size': 12},
+                'prefix': 'Année: ',
+                'visible': True,
+                'xanchor': 'right'
+            },
+            'pad': {'b': 10, 't': 50},
+            'len': 0.9,
+            'x': 0.1,
+            'y': 0.05,
+        }]
+    )
+
+    # Formater les axes (plages propres à chaque service)
+    fig4.update_xaxes(
+        tickformat=",",
+        range=list(config.capacity_x_range)
+    )
+    fig4.update_yaxes(
+        tickformat=".1f",
+        range=list(config.capacity_y_range)
+    )
+
+    return fig4
+
+
+def capacity_duration_figure(service: str, filters: ServiceFilters, n_departements: int) -> go.Figure:
+    """Répartition des hospitalisations par durée de séjour, avec le taux d'occupation"""
+    df_capacity_filtered = _top_capacity_view(service, filters, n_departements)
+
+    # Préparer les données pour le graphique de répartition par durée
+    df_duree = df_capacity_filtered.groupby('annee', observed=True).agg({
+        **{col: 'sum' for col in DUREE_COLUMNS},
+        'lit_hospi_complete': 'sum',
+        'journee_hospi_complete': 'sum',
+        'taux_occupation': 'mean'
+    }).reset_index()
+
+    # Regrouper les hospitalisations de 1-9 jours
+    df_duree['hospi_1J_9J'] = df_duree[[f'hospi_{i}J' for i in range(1, 10)]].sum(axis=1)
+
+    # Regrouper les hospitalisations de 20 jours et plus
+    df_duree['hospi_20J_plus'] = df_duree['hospi_20J_29J'] + df_duree['hospi_30J']
+
+    # Multiplier le taux d'occupation par 100 pour l'affichage en pourcentage
+    df_duree['taux_occupation'] = df_duree['taux_occupation'] * 100
+
+    # Créer le graphique avec Plotly Express
+    fig_duree = px.bar(df_duree,
+        x='annee',
+        y=['hospi_total_24h', 'hospi_1J_9J', 'hospi_10J_19J', 'hospi_20J_plus'],
+        title="Répartition des hospitalisations par durée",
+        barmode='stack',
+        labels={
+            'value': 'Nombre d\'hospitalisations',
+            'variable': 'Durée',
+            'annee': 'Année',
+            'hospi_total_24h': '24h',
+            'hospi_1J_9J': '1-9 jours',
+            'hospi_10J_19J': '10-19 jours',
+            'hospi_20J_plus': '20 jours et plus'
+        },
+        color_discrete_map={
+            'hospi_total_24h': '#F5F5DC',
+            'hospi_1J_9J': '#AFDC8F',
+            'hospi_10J_19J': '#3D7317',
+            'hospi_20J_plus': '#003366'
+        }
+    )
+
+    # Ajouter la ligne de taux d'occupation
+    fig_duree.add_scatter(
+        x=df_duree['annee'],
+        y=df_duree['taux_occupation'],
+        name="Taux d'occupation",
+        mode='lines+markers+text',
+        text=df_duree['taux_occupation'].apply(lambda x: f"{x:.1f}%"),
+        textposition="top center",
+        line=dict(color='red', width=2),
+        yaxis='y2'
+    )
+
+    # Mise à jour du layout
+    fig_duree.update_layout(
+        yaxis2=dict(
+            title="Taux d'occupation (%)",
+            overlaying='y',
+            side='right',
+            showgrid=False,
+            range=[0, 250],  # Ajuster l'échelle de 0 à 200%
+            tickformat=".0f"
+        ),
+        height=500,
+        legend=dict(
+            orientation="h",  # Légende horizontale
+            yanchor="bottom",
+            y=1.35,  # Position plus haute
+            xanchor="right",
+            x=1,
+            title=dict(text="Durée")  # Ajout d'un titre à la légende
+        ),
+        margin=dict(t=150, b=100, l=50, r=50)  # Augmentation de la marge supérieure
+    )
+
+    return fig_duree
+
+
+def capacity_equipment_figure(service: str, filters: ServiceFilters, n_departements: int) -> go.Figure:
+    """Lits et places disponibles, avec le taux d'équipement"""
+    config = SERVICES[service]
+    df_capacity_filtered = _top_capacity_view(service, filters, n_departements)
+
+    # Préparer les données pour le graphique de répartition par lits
+    df_equip = df_capacity_filtered.groupby('annee', observed=True).agg({
+        'lit_hospi_complete': 'sum',
+        'place_hospi_partielle': 'sum',
+        'taux_equipement': 'mean'
+    }).reset_index()
+
+    # Créer le graphique avec Plotly Express
+    fig_equip = px.bar(df_equip,
+        x='annee',
+        y=list(config.equipment_columns),
+        title="Répartition des lits et places d'hospitalisation disponibles",
+        barmode='stack',
+        labels={
+            'value': 'Nombre de lits et places',
+            'variable': 'Nombre',
+            'annee': 'Année',
+            **config.equipment_labels,
+        },
+        color_discrete_map={
+            'lit_hospi_complete': '#6fffe9',
+            'place_hospi_partielle': '#5bc0be',
+        }
+    )
+
+    # Ajouter la ligne de taux d'équipement
+    fig_equip.add_scatter(
+        x=df_equip['annee'],
+        y=df_equip['taux_equipement'],
+        name="Taux d'équipement",
+        mode='lines+markers+text',
+        text=df_equip['taux_equipement'].apply(lambda x: f"{x:.1f}"),
+        textposition="top center",
+        line=dict(color='orange', width=2),
+        yaxis='y2'
+    )
+
+    # Mise à jour du layout
+    fig_equip.update_layout(
+        yaxis2=dict(
+            title="Taux d'équipement pour 1000 Habitants",
+            overlaying='y',
+            side='right',
+            showgrid=False,
+            range=[0, 8],  # Ajuster l'échelle de 0 à 8
+        ),
+        height=500,
+        legend=dict(
+            orientation="h",  # Légende horizontale
+            yanchor="bottom",
+            y=1.35,  # Position plus haute
+            xanchor="right",
+            x=1,
+            title=dict(text="Capacité")  # Ajout d'un titre à la légende
+        ),
+        margin=dict(t=150, b=100, l=50, r=50)  # Augmentation de la marge supérieure
+    )
+    return fig_equip
+
+
+def _demography_filters(service: str, filters: ServiceFilters, **overrides) -> Dict:
+    # L'onglet démographique ne filtre pas sur le sexe mais sur la pathologie sélectionnée
+    return filters.cube_filters(service, **{'sexe': None, 'nom_pathologie': filters.nom_pathologie, **overrides})
+
+
+@st.cache_data(show_spinner=False)
+def ranked_pathologies(service: str, filters: ServiceFilters) -> List[str]:
+    """Pathologies de l'onglet démographique, triées par nombre d'hospitalisations décroissant"""
+    all_patho = get_cube(SERVICE_MORBIDITE).aggregate(
+        'nom_pathologie', ['nbr_hospi'], **_demography_filters(service, filters)
+    )
+    return all_patho.sort_values('nbr_hospi', ascending=False)['nom_pathologie'].tolist()
+
+
+@st.cache_data(show_spinner=False)
+def age_band_table(service: str, annee: Optional[int], nom_region: Optional[str],
+                   pathologies: Tuple[str, ...]) -> pd.DataFrame:
+    """Hospitalisations par année, pathologie et tranche d'âge (tous sexes confondus)"""
+    df_filtered = get_view(SERVICE_MORBIDITE, classification=service, annee=annee)
+    if nom_region is not None:
+        df_filtered = df_filtered[df_filtered['nom_region'] == nom_region]
+    df_topn = df_filtered[df_filtered['nom_pathologie'].isin(pathologies)]
+
+    df_age = melt_age_bands(df_topn, ['annee', 'nom_pathologie'])
+    return df_age.rename(columns={'nom_pathologie': 'pathologie'})
+
+
+def age_scatter_figure(service: str, filters: ServiceFilters, top_n_patho: Tuple[str, ...]) -> go.Figure:
+    """Hospitalisations par tranche d'âge, année et pathologie, animées par année"""
+    df_scatter = age_band_table(service, filters.annee, filters.nom_region, top_n_patho).copy()
+
+    # Ajouter une colonne avec le nombre d'hospitalisations formaté
+    df_scatter['hospitalisations_format'] = df_scatter['hospitalisations'].apply(format_number)
+
+    # Créer le graphique animé avec Plotly Express
+    fig = px.scatter(df_scatter,
+        x='tranche_age',
+        y='hospitalisations',
+        animation_frame='annee',
+        size='hospitalisations',
+        color='pathologie',
+        hover_name='pathologie',
+        hover_data={
+            'pathologie': False,  # Masquer car déjà dans hover_name
+            'hospitalisations': False,  # Masquer la version non formatée
+            'hospitalisations_format': True,  # Afficher la version formatée
+            'tranche_age': True,
+            'annee': True
+        },
+        size_max=50,
+        labels={
+            'tranche_age': "Tranche d'âge",
+            'hospitalisations': "Nombre d'hospitalisations",
+            'hospitalisations_format': "Nombre d'hospitalisations",
+            'pathologie': 'Pathologie',
+            'annee': 'Année'
+        },
+        title=f"Répartition des hospitalisations par tranche d'âge pour les {len(top_n_patho)} pathologies principales",
+    )
+
+    # Personnaliser le layout
+    fig.update_traces(
+        mode='markers'  # Enlever le texte pour plus de clarté
+    )
+
+    fig.update_layout(
+        height=600,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=0.94,
+            xanchor="right",
+            x=1,
+            bgcolor='rgba(255,255,255,0.8)'  # Fond légèrement transparent
+
+        ),
+
+        # Adaptation automatique de l'axe Y avec une marge de 10%
+        yaxis=dict(
+            range=[
+                0,
+                df_scatter['hospitalisations'].max() * 1.1  # Ajoute 10% de marge au-dessus
+            ]
+        ),
+
+        # Ajuster la position des contrôles d'animation
+        updatemenus=[{
+            'type': 'buttons',
+            'showactive': False,
+            'y': -0.1,
+            'x': 0.1,
+            'xanchor': 'right',
+            'yanchor': 'top',
+            'pad': {'t': 0, 'r': 10},
+            'buttons': [
+                {
+                    'args': [None, {'frame': {'duration': 1500, 'redraw': True}, 'fromcurrent': True}],
+                    'label': '▶',
+                    'method': 'animate'
+                },
+                {
+                    'args': [[None], {'frame': {'duration': 0, 'redraw': True}, 'mode': 'immediate', 'transition': {'duration': 0}}],
+                    'label': '⏸',
+                    'method': 'animate'
+                }
+            ]
+        }],
+        sliders=[{
+            'currentvalue': {
+                'font': {'size': 12},
+                'prefix': 'Année: ',
+                'visible': True,
+                'xanchor': 'right'
+            },
+            'pad': {'b': 10, 't': 50},
+            'len': 0.9,
+            'x': 0.1,
+            'y': 0.05,
+            'transition': {'duration': 1500}
+        }],
+        xaxis=dict(
+            categoryorder='array',
+            categoryarray=sorted(df_scatter['tranche_age'].unique(),
+                              key=lambda x: float(x.split(' ')[0].split('-')[0]))
+        )
+    )
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def sex_evolution_summary(service: str, filters: ServiceFilters) -> pd.DataFrame:
+    """Tableau des évolutions par sexe et pathologie, trié par évolution globale décroissante"""
+    cube = get_cube(SERVICE_MORBIDITE)
+    cube_filters = _demography_filters(service, filters, sexe=filters.sexe)
+    years = sorted(cube.aggregate('annee', ['nbr_hospi'], **cube_filters)['annee'])
+
+    df_summary_sexe = _evolution_table(cube.aggregate, ['sexe', 'nom_pathologie'], cube_filters, years)
+
+    # Trier par évolution globale décroissante
+    return df_summary_sexe.sort_values('Évol. globale (%)', ascending=False)
+
+
+def _styled_evolution(df_summary: pd.DataFrame, count_column: str):
+    """Formate un tableau d'évolutions avec un gradient sur les colonnes d'évolution"""
+    # Colonnes d'évolution pour le gradient
+    evolution_columns = [col for col in df_summary.columns if 'Évol.' in col]
+
+    # Filtrer les NaN avant de calculer min et max
+    evolution_values = df_summary[evolution_columns].values.flatten()
+    evolution_values = evolution_values[~pd.isna(evolution_values)]  # Supprime les NaN
+    vmin, vmax = evolution_values.min(), evolution_values.max()
+
+    return df_summary.style.format({
+        count_column: '{:,.0f}',
+        **{col: '{:+.1f}%' for col in evolution_columns}
+    }).background_gradient(
+        cmap='RdYlGn_r',
+        subset=evolution_columns,
+        vmin=vmin,
+        vmax=vmax
+    )
+
+
+def _chart_with_help(fig: go.Figure, help_text: str):
+    """Affichage d'un graphique avec une colonne d'aide"""
+    col_chart, col_help = st.columns([1, 0.01])
+    with col_chart:
+        st.plotly_chart(fig, use_container_width=True)
+    with col_help:
+        st.metric(label="help", value="", help=help_text)
+
+
+class ServiceDashboard:
+    """
+    Page d'analyse d'un service médical (chirurgie, médecine, obstétrique, psychiatrie, SSR, ESND).
+
+    La mise en page est commune ; les calculs et les figures sont mis en cache
+    sur (service, filtres), et partagés par toutes les pages de service et
+    toutes les sessions.
+    """
+
+    def __init__(self, config: ServiceConfig):
+        self.config = config
+
+    def figure(self, chart: str, spec: ViewSpec, build: Callable, filters: ServiceFilters, *params) -> go.Figure:
+        """Figure du service servie par le cache de figures du processus"""
+        return cached_figure(
+            'service_dashboard', chart, (self.config.code, filters, params), [spec],
+            lambda: build(self.config.code, filters, *params)
+        )
+
+    def load_data(self) -> Optional[pd.DataFrame]:
+        try:
+            # Vue du service dans la table partagée, chargée une seule fois pour toutes les pages
+            return get_view(SERVICE_MORBIDITE, classification=self.config.code)
+        except Exception as e:
+            st.error(f"Erreur lors du chargement des données : {str(e)}")
+            return None
+
+    def render(self):
+        st.markdown(PAGE_STYLE, unsafe_allow_html=True)
+
+        # Titre principal
+        st.markdown(f"<h1 class='main-title' style='margin-top: -70px;'>{self.config.title}</h1>", unsafe_allow_html=True)
+
+        df = self.load_data()
+        if df is not None:
+            filters = self.render_filters(df)
+            self.render_kpis(filters)
+
+            tab1, tab2, tab3 = st.tabs([
+                "📈 Analyse par pathologies",
+                "🗺️ Analyse par capacité",
+                "📊 Analyse démographique",
+            ])
+            with tab1:
+                self.render_pathologies(filters)
+            with tab2:
+                self.render_capacity(filters)
+            with tab3:
+                self.render_demography(filters)
+
+        st.markdown("---")
+        st.markdown("Développé avec 💫| Le Wagon - Batch #1834 - Promotion 2024")
+
+    def render_filters(self, df: pd.DataFrame) -> ServiceFilters:
+        """Sélecteurs de sexe, année, département et pathologie, synchronisés avec l'URL"""
+        slug = self.config.slug
+
+        # Récupérer les paramètres de l'URL si présents
+        params = st.query_params
+
+        # Récupération des valeurs uniques pour les filtres
+        sexe_options = [ALL_SEXES, "Femme", "Homme"]
+        years = sorted(df['annee'].unique(), reverse=True)
+        years_options = [ALL_YEARS] + [str(year) for year in years]
+        regions = sorted(df['nom_region'].unique())
+        regions_options = [ALL_REGIONS] + regions
+
+        # Récupération des paramètres avec validation
+        default_sexe = params.get('sexe', ALL_SEXES)
+        if default_sexe not in sexe_options:
+            default_sexe = ALL_SEXES
+
+        default_annee = params.get('annee', ALL_YEARS)
+        if default_annee not in years_options:
+            default_annee = ALL_YEARS
+
+        # Gestion du département sélectionné (paramètre departement, ou region pour les anciens liens)
+        default_region = params.get('departement') or params.get('region', ALL_REGIONS)
+        if default_region not in regions_options:
+            default_region = ALL_REGIONS
+
+        # Liste déroulante de toutes les pathologies
+        all_pathologies = sorted(df['nom_pathologie'].unique())
+        all_pathologies.insert(0, ALL_PATHOLOGIES)
+
+        # Récupération du paramètre pathologie avec validation
+        default_pathologie = params.get('pathologie', ALL_PATHOLOGIES)
+        if default_pathologie not in all_pathologies:
+            default_pathologie = ALL_PATHOLOGIES
+
+        # Filtres principaux en colonnes
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            # Sélection du sexe
+            selected_sexe = st.selectbox(
+                "Sexe",
+                sexe_options,
+                key=f"selecteur_sexe_{slug}",
+                index=sexe_options.index(default_sexe)
+            )
+
+        with col2:
+            # Filtre année
+            selected_year = st.selectbox(
+                "Année",
+                years_options,
+                key=f"year_filter_{slug}",
+                index=years_options.index(default_annee)
+            )
+
+        with col3:
+            # Sélection du département
+            selected_region = st.selectbox(
+                "Départements",
+                regions_options,
+                key=f"region_filter_{slug}",
+                index=regions_options.index(default_region)
+            )
+
+        selected_pathology = st.selectbox(
+            f"🔍 Sélectionner une pathologie {self.config.pathology_label} pour obtenir des détails",
+            all_pathologies,
+            key=f"pathology_selector_{slug}",
+            index=all_pathologies.index(default_pathologie)
+        )
+
+        # Mettre à jour les paramètres de l'URL
+        st.query_params['sexe'] = selected_sexe
+        st.query_params['annee'] = selected_year
+        st.query_params['departement'] = selected_region if selected_region != ALL_REGIONS else None
+        st.query_params['pathologie'] = selected_pathology if selected_pathology != ALL_PATHOLOGIES else None
+
+        return ServiceFilters(
+            sexe=selected_sexe,
+            annee=int(selected_year) if selected_year != ALL_YEARS else None,
+            nom_region=selected_region if selected_region != ALL_REGIONS else None,
+            nom_pathologie=selected_pathology if selected_pathology != ALL_PATHOLOGIES else None
+        )
+
+    def render_kpis(self, filters: ServiceFilters):
+        kpis = service_kpis(self.config.code, filters)
+
+        col1, col2, col3, col4, col5 = st.columns(5)
+        with col1:
+            st.metric("Total d'hospitalisations", format_number(kpis['total_hospi']))
+        with col2:
+            st.metric("Durée moyenne", f"{kpis['avg_duration']:.1f} jours")
+        with col3:
+            st.metric("Indice comparatif", f"{kpis['indice']:.1f}%")
+        with col4:
+            st.metric("Hospitalisations < 24h", f"{kpis['percentage_24h']:.1f}%")
+        with col5:
+            st.metric("Tranche d'âge majoritaire", kpis['most_common_age'])
+
+    def render_pathologies(self, filters: ServiceFilters):
+        code = self.config.code
+
+        # Ajout d'un sélecteur pour filtrer le nombre de pathologies à afficher
+        n_pathologies = st.slider("Nombre de pathologies à afficher", *self.config.n_pathologies)
+
+        _chart_with_help(
+            self.figure('pathology_bar', SERVICE_MORBIDITE, pathology_bar_figure, filters, n_pathologies),
+            "Ce graphique montre la relation entre le nombre d'hospitalisations (barres) et la durée moyenne de séjour (ligne) "
+            f"pour les pathologies {self.config.pathology_adjective} les plus fréquentes."
+        )
+        st.markdown("---")
+        _chart_with_help(
+            self.figure('pathology_scatter', SERVICE_MORBIDITE, pathology_scatter_figure, filters, n_pathologies),
+            "Ce graphique animé montre l'évolution de la relation entre le nombre d'hospitalisations et la durée moyenne de séjour "
+            "pour chaque pathologie au fil des années. La taille des bulles représente le nombre d'hospitalisations."
+        )
+        st.markdown("---")
+        _chart_with_help(
+            self.figure('pathology_3d', SERVICE_MORBIDITE, pathology_3d_json, filters, n_pathologies),
+            "Ce graphique 3D montre la distribution des hospitalisations par pathologie, durée moyenne de séjour et indice comparatif. "
+            "Utilisez les contrôles pour faire pivoter et zoomer sur le graphique."
+        )
+        st.markdown("---")
+
+        # Tableau récapitulatif détaillé
+        df_summary = pathology_evolution_summary(code, filters)
+        if self.config.show_decreases:
+            st.subheader("Évolution des pathologies - Augmentation les plus importantes (2018-2022)")
+        else:
+            st.subheader("Évolution des pathologies (2018-2022)")
+        st.dataframe(_styled_evolution(df_summary, 'Hospitalisations'), use_container_width=True)
+
+        if self.config.show_decreases:
+            st.markdown("---")
+
+            # Deuxième tableau avec les baisses en premier
+            st.subheader("Évolution des pathologies - Baisses les plus importantes (2018-2022)")
+            df_summary_desc = df_summary.sort_values('Évol. globale (%)', ascending=True)
+            st.dataframe(_styled_evolution(df_summary_desc, 'Hospitalisations'), use_container_width=True)
+
+            st.markdown("---")
+            st.markdown("Développé avec 💫 par l'équipe JBN | Le Wagon - Promotion 2024")
+
+    def render_capacity(self, filters: ServiceFilters):
+        code = self.config.code
+        try:
+            kpis, departements = capacity_overview(code, filters)
+        except Exception as e:
+            st.error(f"Erreur lors du chargement des données de capacité : {str(e)}")
+            return
+
+        # Métriques clés (non filtrées par le slider)
+        columns = st.columns(5 if self.config.show_urgences else 4)
+        with columns[0]:
+            st.metric("Lits d'hospitalisation", format_number(kpis['total_lits']))
+        with columns[1]:
+            st.metric("Places en hospitalisation partielle", format_number(kpis['total_places']))
+        if self.config.show_urgences:
+            with columns[2]:
+                st.metric("Passages aux urgences", format_number(kpis['total_urgences']))
+        with columns[-2]:
+            st.metric("Taux d'occupation", f"{kpis['taux_occupation']*100:.1f}%")
+        with columns[-1]:
+            st.metric("Taux d'équipement", f"{kpis['taux_equipement']} lits pour 1000 Habitants")
+
+        # Slider pour sélectionner le nombre de départements à afficher
+        st.markdown("---")
+
+        n_departements = st.slider(
+            "Nombre de départements à afficher (triés par nombre d'hospitalisations croissants)",
+            min_value=5,
+            max_value=len(departements),
+            value=20
+        )
+
+        _chart_with_help(
+            self.figure('capacity_scatter', SERVICE_CAPACITE, capacity_scatter_figure, filters, n_departements),
+            "Ce graphique animé montre l'évolution de la relation entre la capacité d'accueil (nombre de lits) "
+            "et le taux d'occupation pour chaque départements. La taille et la couleur des bulles représentent "
+            "le nombre de séjours. Utilisez les contrôles d'animation pour voir l'évolution dans le temps."
+        )
+        _chart_with_help(
+            self.figure('capacity_duration', SERVICE_CAPACITE, capacity_duration_figure, filters, n_departements),
+            "Ce graphique montre la répartition des hospitalisations par durée de séjour. "
+            "Les barres empilées représentent le nombre d'hospitalisations pour chaque durée "
+            "(24h, 1-9 jours, 10-19 jours, 20 jours et plus). "
+            "La ligne rouge indique le taux d'occupation des lits, permettant d'analyser "
+            "la relation entre la durée des séjours et l'utilisation des capacités."
+        )
+        _chart_with_help(
+            self.figure('capacity_equipment', SERVICE_CAPACITE, capacity_equipment_figure, filters, n_departements),
+            "Ce graphique montre la répartition des lits et places disponibles "
+            "pour une prise en charge médicale, en nombre. "
+            "La ligne orange indique le taux d'équipement des lits, en nombre pour 1000 habitants, "
+            "permettant d'analyser la capacité moyenne disponible dans une zone donnée."
+        )
+
+    def render_demography(self, filters: ServiceFilters):
+        code = self.config.code
+
+        if filters.nom_pathologie is not None:
+            # Si une pathologie spécifique est sélectionnée, on n'a pas besoin de prendre les N premières
+            top_n_patho = [filters.nom_pathologie]
+        else:
+            # Slider pour sélectionner le nombre de pathologies
+            nb_patho = st.slider(
+                "Nombre de pathologies à afficher",
+                min_value=3,
+                max_value=10,
+                value=5,
+                key="nb_patho_age"
+            )
+
+            # Sélectionner les N premières pathologies
+            top_n_patho = ranked_pathologies(code, filters)[:nb_patho]
+
+        region_text = f" dans {filters.nom_region}" if filters.nom_region is not None else ""
+        _chart_with_help(
+            self.figure('age_scatter', SERVICE_MORBIDITE, age_scatter_figure, filters, tuple(top_n_patho)),
+            f"Ce graphique animé montre l'évolution des hospitalisations par tranche d'âge pour les {len(top_n_patho)} pathologies "
+            f"les plus fréquentes{region_text}. "
+            "La taille des bulles représente le nombre d'hospitalisations. "
+            "Utilisez les contrôles d'animation pour voir l'évolution dans le temps."
+        )
+
+        st.markdown("---")
+
+        # Tableau récapitulatif détaillé
+        st.subheader("Évolution des pathologies par Sexe - Augmentation les plus importantes (2018-2022)")
+        st.dataframe(_styled_evolution(sex_evolution_summary(code, filters), 'nbr_hospi'), use_container_width=True)
@@ -0,0 +1,153 @@
+import os
+import re
+import glob
+import logging
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple, Union
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.view_specs import ViewSpec
+
+# Répertoire des snapshots Parquet (surchargeable pour les tests ou l'App Service)
+CACHE_DIR = os.environ.get("MEDICAL_DATA_CACHE_DIR", os.path.join(".cache", "snapshots"))
+
+# Mode hors ligne : ne jamais interroger BigQuery, servir le dernier snapshot
+OFFLINE = os.environ.get("MEDICAL_DATA_OFFLINE", "").lower() in ("1", "true", "yes")
+
+# Clé des métadonnées Arrow portant la version du snapshot servi
+VERSION_METADATA_KEY = b"snapshot_version"
+
+
+def _spec_prefix(spec: ViewSpec) -> str:
+    table_prefix = re.sub(r'[^A-Za-z0-9_]+', '_', spec.table)
+    return f"{table_prefix}__{spec.key}"
+
+
+def _version(last_modified: datetime) -> int:
+    return int(last_modified.timestamp() * 1000)
+
+
+def snapshot_path(spec: ViewSpec, last_modified: datetime) -> str:
+    """Chemin du snapshot d'une vue pour une date de modification donnée de sa table"""
+    return os.path.join(CACHE_DIR, f"{_spec_prefix(spec)}__{_version(last_modified)}.parquet")
+
+
+def snapshot_version(path: str) -> str:
+    """Version (date de modification de la table, en ms) encodée dans le nom du snapshot"""
+    return os.path.basename(path).rsplit('__', 1)[1].split('.')[0]
+
+
+def table_version(table: pa.Table) -> Optional[str]:
+    """Version du snapshot dont provient une table chargée par load_table"""
+    metadata = table.schema.metadata or {}
+    version = metadata.get(VERSION_METADATA_KEY)
+    return version.decode() if version is not None else None
+
+
+def _with_version(table: pa.Table, version) -> pa.Table:
+    metadata = dict(table.schema.metadata or {})
+    metadata[VERSION_METADATA_KEY] = str(version).encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def list_snapshots(spec: ViewSpec) -> List[str]:
+    """Snapshots existants d'une vue, du plus ancien au plus récent"""
+    paths = glob.glob(os.path.join(CACHE_DIR, f"{_spec_prefix(spec)}__*.parquet"))
+    return sorted(paths, key=lambda path: int(snapshot_version(path)))
+
+
+def latest_snapshot(spec: ViewSpec) -> Optional[str]:
+    snapshots = list_snapshots(spec)
+    return snapshots[-1] if snapshots else None
+
+
+def read_snapshot(
+    path: str,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[Tuple]] = None
+) -> pa.Table:
+    """Lecture Parquet en mémoire mappée, avec projection et filtres éventuels"""
+    table = pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+    return _with_version(table, snapshot_version(path))
+
+
+def _read_local(spec: ViewSpec) -> Optional[pa.Table]:
+    """Dernier snapshot de la vue, ou à défaut projection du dernier snapshot complet"""
+    path = latest_snapshot(spec)
+    if path is not None:
+        return read_snapshot(path)
+    full_path = latest_snapshot(ViewSpec(spec.table))
+    if full_path is not None:
+        columns = list(spec.columns) if spec.columns else None
+        return read_snapshot(full_path, columns=columns, filters=spec.arrow_filters())
+    return None
+
+
+def write_snapshot(table: pa.Table, path: str):
+    """Écrit un snapshot de façon atomique et supprime les versions précédentes"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+    prefix = os.path.basename(path).rsplit('__', 1)[0]
+    for old_path in glob.glob(os.path.join(os.path.dirname(path), f"{prefix}__*.parquet")):
+        if old_path != path:
+            os.remove(old_path)
+
+
+def load_table(
+    spec: Union[ViewSpec, str],
+    get_client: Callable,
+    offline: bool = OFFLINE
+) -> pa.Table:
+    """
+    Charge une vue d'une table BigQuery en passant par le cache de snapshots
+
+    Le snapshot est indexé par la vue (table, colonnes, filtres) et par la date
+    de dernière modification de la table : il n'est retéléchargé que lorsque dbt
+    a reconstruit la table. Si seul le snapshot complet de la table est à jour,
+    la vue en est extraite localement sans interroger BigQuery.
+
+    Args:
+        spec: Spécification de la vue, ou identifiant complet projet.dataset.table
+        get_client: Fonction retournant un client BigQuery
+        offline: Servir le dernier snapshot sans contacter BigQuery
+
+    Returns:
+        Table Arrow, version du snapshot dans ses métadonnées (voir table_version)
+    """
+    if isinstance(spec, str):
+        spec = ViewSpec(spec)
+
+    if offline:
+        table = _read_local(spec)
+        if table is None:
+            raise FileNotFoundError(f"Aucun snapshot local pour {spec.table} dans {CACHE_DIR}")
+        return table
+
+    try:
+        client = get_client()
+        last_modified = client.get_table(spec.table).modified
+    except Exception as e:
+        # BigQuery injoignable : on sert le dernier snapshot s'il existe
+        table = _read_local(spec)
+        if table is None:
+            raise
+        logging.warning(f"BigQuery indisponible ({e}), utilisation du dernier snapshot de {spec.table}")
+        return table
+
+    path = snapshot_path(spec, last_modified)
+    if os.path.exists(path):
+        return read_snapshot(path)
+
+    if not spec.is_full:
+        full_path = snapshot_path(ViewSpec(spec.table), last_modified)
+        if os.path.exists(full_path):
+            columns = list(spec.columns) if spec.columns else None
+            return read_snapshot(full_path, columns=columns, filters=spec.arrow_filters())
+
+    # Projection et prédicats poussés côté BigQuery : seules les données utiles transitent
+    table = _with_version(client.query(spec.to_sql()).to_arrow(), _version(last_modified))
+    write_snapshot(table, path)
+    return table
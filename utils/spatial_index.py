@@ -0,0 +1,188 @@
+import math
+import json
+import numpy as np
+import streamlit as st
+from collections import defaultdict
+from typing import Dict, List, Sequence, Set
+from utils.choropleth import FEATURE_KEYS, GEOJSON_PATHS
+
+# Taille des cellules de la grille d'indexation des contours (degrés)
+GRID_CELL_DEGREES = 0.1
+
+# Précision (décimales) des sommets comparés pour détecter les frontières communes
+VERTEX_PRECISION = 6
+
+
+def _rings(geometry: Dict) -> List[np.ndarray]:
+    polygons = [geometry['coordinates']] if geometry['type'] == 'Polygon' else geometry['coordinates']
+    return [np.asarray(ring, dtype='float64') for polygon in polygons for ring in polygon]
+
+
+class TerritoryIndex:
+    """
+    Index spatial des contours d'un niveau administratif
+
+    Les arêtes de tous les contours sont regroupées dans des tableaux NumPy
+    (une tranche contiguë par territoire) et une grille régulière associe à
+    chaque cellule les territoires dont l'emprise la recouvre : une requête ne
+    teste que les arêtes des un à quatre territoires candidats.
+
+    Les coordonnées sont en degrés (latitude, longitude), comme dans folium.
+    """
+
+    def __init__(self, geojson: Dict, key: str, cell: float = GRID_CELL_DEGREES):
+        self.key = key
+        self.cell = cell
+        self.keys: List = []
+        starts, ends, offsets, bounds = [], [], [0], []
+        owners_by_vertex: Dict[tuple, Set[int]] = defaultdict(set)
+
+        for territory, feature in enumerate(geojson['features']):
+            self.keys.append(feature['properties'][key])
+            rings = _rings(feature['geometry'])
+            for ring in rings:
+                starts.append(ring[:-1])
+                ends.append(ring[1:])
+                for vertex in np.round(ring, VERTEX_PRECISION).tolist():
+                    owners_by_vertex[tuple(vertex)].add(territory)
+            offsets.append(offsets[-1] + sum(len(ring) - 1 for ring in rings))
+            points = np.concatenate(rings)
+            bounds.append(np.concatenate([points.min(axis=0), points.max(axis=0)]))
+
+        # Arêtes (x = longitude, y = latitude) et emprises (lon_min, lat_min, lon_max, lat_max)
+        self.starts = np.concatenate(starts)
+        self.ends = np.concatenate(ends)
+        self.offsets = np.asarray(offsets)
+        self.bounds = np.vstack(bounds)
+
+        # Cellules traversées par une frontière : territoires candidats (propriétaires des arêtes)
+        self.grid: Dict[tuple, Set[int]] = defaultdict(set)
+        owners = np.repeat(np.arange(len(self.keys)), np.diff(self.offsets))
+        lows = np.floor(np.minimum(self.starts, self.ends) / cell).astype(int)
+        highs = np.floor(np.maximum(self.starts, self.ends) / cell).astype(int)
+        for territory, (ix0, iy0), (ix1, iy1) in zip(owners.tolist(), lows.tolist(), highs.tolist()):
+            for ix in range(ix0, ix1 + 1):
+                for iy in range(iy0, iy1 + 1):
+                    self.grid[(ix, iy)].add(territory)
+
+        # Autres cellules : entièrement dans un territoire (ou hors de tous), résolues d'avance
+        ix0, iy0 = lows.min(axis=0)
+        ix1, iy1 = highs.max(axis=0)
+        cells = [(ix, iy) for ix in range(ix0, ix1 + 1) for iy in range(iy0, iy1 + 1) if (ix, iy) not in self.grid]
+        centers = (np.asarray(cells, dtype='float64') + 0.5) * cell
+        self.interior: Dict[tuple, object] = {
+            cell_key: territory_key
+            for cell_key, territory_key in zip(cells, self.locate_many(centers[:, 1], centers[:, 0]))
+            if territory_key is not None
+        }
+
+        # Arêtes de chaque territoire par bande de latitude : le rayon horizontal
+        # d'un point ne peut croiser que celles de sa bande
+        rows_low, rows_high = lows[:, 1], highs[:, 1]
+        self.bands: Dict[tuple, np.ndarray] = {}
+        for territory in range(len(self.keys)):
+            start, stop = self.offsets[territory], self.offsets[territory + 1]
+            for row in range(rows_low[start:stop].min(), rows_high[start:stop].max() + 1):
+                in_band = (rows_low[start:stop] <= row) & (rows_high[start:stop] >= row)
+                self.bands[(territory, row)] = start + np.flatnonzero(in_band)
+
+        # Territoires voisins : au moins un sommet de frontière commun
+        self.adjacency: Dict = {territory_key: set() for territory_key in self.keys}
+        for owners in owners_by_vertex.values():
+            for territory in owners:
+                self.adjacency[self.keys[territory]].update(self.keys[other] for other in owners if other != territory)
+
+    def _cell(self, value: float) -> int:
+        return math.floor(value / self.cell)
+
+    def _edges(self, territory: int):
+        start, stop = self.offsets[territory], self.offsets[territory + 1]
+        return self.starts[start:stop], self.ends[start:stop]
+
+    def _contains(self, territory: int, x: np.ndarray, y: np.ndarray, edges=None) -> np.ndarray:
+        """Règle pair-impair (trous et îles compris) pour un ou plusieurs points"""
+        if edges is None:
+            a, b = self._edges(territory)
+        else:
+            a, b = self.starts[edges], self.ends[edges]
+        x, y = np.atleast_1d(x)[:, None], np.atleast_1d(y)[:, None]
+        straddles = (a[:, 1] > y) != (b[:, 1] > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing_x = a[:, 0] + (y - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+        return (np.count_nonzero(straddles & (x < crossing_x), axis=1) % 2) == 1
+
+    def locate(self, latitude: float, longitude: float):
+        """Clé du territoire contenant le point, ou None"""
+        x, y = longitude, latitude
+        row = self._cell(y)
+        candidates = self.grid.get((self._cell(x), row))
+        if candidates is None:
+            return self.interior.get((self._cell(x), row))
+        for territory in candidates:
+            if self._contains(territory, x, y, self.bands[(territory, row)])[0]:
+                return self.keys[territory]
+        return None
+
+    def locate_many(self, latitudes: Sequence[float], longitudes: Sequence[float]) -> np.ndarray:
+        """Clé du territoire de chaque point (None hors territoire), par lots d'arêtes"""
+        y = np.asarray(latitudes, dtype='float64')
+        x = np.asarray(longitudes, dtype='float64')
+        result = np.full(len(x), None, dtype=object)
+        pending = np.ones(len(x), dtype=bool)
+        for territory, (x0, y0, x1, y1) in enumerate(self.bounds):
+            candidates = np.flatnonzero(pending & (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1))
+            if len(candidates) == 0:
+                continue
+            inside = candidates[self._contains(territory, x[candidates], y[candidates])]
+            result[inside] = self.keys[territory]
+            pending[inside] = False
+        return result
+
+    def _edge_distance(self, territory: int, x: float, y: float, scale: float) -> float:
+        """Distance minimale (degrés de latitude) du point aux arêtes du territoire"""
+        a, b = self._edges(territory)
+        a = (a - (x, y)) * (scale, 1.0)
+        b = (b - (x, y)) * (scale, 1.0)
+        segment = b - a
+        length = np.einsum('ij,ij->i', segment, segment)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.clip(np.where(length > 0, -np.einsum('ij,ij->i', a, segment) / length, 0.0), 0.0, 1.0)
+        closest = a + t[:, None] * segment
+        return float(np.sqrt(np.einsum('ij,ij->i', closest, closest).min()))
+
+    def nearest(self, latitude: float, longitude: float):
+        """
+        Clé du territoire contenant le point, ou à défaut du plus proche
+
+        Les territoires sont examinés par distance croissante à leur emprise,
+        qui minore la distance au contour : on s'arrête dès qu'elle dépasse la
+        meilleure distance trouvée.
+        """
+        located = self.locate(latitude, longitude)
+        if located is not None:
+            return located
+        x, y = longitude, latitude
+        scale = math.cos(math.radians(latitude))
+        dx = np.maximum(np.maximum(self.bounds[:, 0] - x, x - self.bounds[:, 2]), 0) * scale
+        dy = np.maximum(np.maximum(self.bounds[:, 1] - y, y - self.bounds[:, 3]), 0)
+        box_distance = np.hypot(dx, dy)
+
+        best, best_distance = None, np.inf
+        for territory in np.argsort(box_distance, kind='stable'):
+            if box_distance[territory] >= best_distance:
+                break
+            distance = self._edge_distance(territory, x, y, scale)
+            if distance < best_distance:
+                best, best_distance = territory, distance
+        return self.keys[best] if best is not None else None
+
+    def neighbours(self, territory_key) -> Set:
+        """Territoires partageant une frontière avec territory_key"""
+        return set(self.adjacency.get(territory_key, ()))
+
+
+@st.cache_resource(show_spinner=False)
+def get_territory_index(niveau_administratif: str) -> TerritoryIndex:
+    """Index spatial des contours sources (non simplifiés), construit une fois par processus"""
+    with open(GEOJSON_PATHS[niveau_administratif], 'r', encoding='utf-8') as f:
+        return TerritoryIndex(json.load(f), FEATURE_KEYS[niveau_administratif])
@@ -0,0 +1,178 @@
+import hashlib
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Tables BigQuery construites par dbt
+PROJECT_ID = "projet-jbn-data-le-wagon"
+MORBIDITE_TABLE = f"{PROJECT_ID}.dbt_medical_analysis_join_total_morbidite.class_join_total_morbidite_sexe_population"
+CAPACITE_TABLE = f"{PROJECT_ID}.dbt_medical_analysis_join_total_morbidite_capacite.class_join_total_morbidite_capacite"
+CAPACITE_KPI_TABLE = f"{PROJECT_ID}.dbt_medical_analysis_join_total_morbidite_capacite.class_join_total_morbidite_capacite_kpi"
+
+AGE_COLUMNS = [
+    'tranche_age_0_1', 'tranche_age_1_4', 'tranche_age_5_14',
+    'tranche_age_15_24', 'tranche_age_25_34', 'tranche_age_35_44',
+    'tranche_age_45_54', 'tranche_age_55_64', 'tranche_age_65_74',
+    'tranche_age_75_84', 'tranche_age_85_et_plus'
+]
+
+DUREE_COLUMNS = [
+    'hospi_total_24h', 'hospi_1J', 'hospi_2J', 'hospi_3J', 'hospi_4J', 'hospi_5J',
+    'hospi_6J', 'hospi_7J', 'hospi_8J', 'hospi_9J', 'hospi_10J_19J', 'hospi_20J_29J', 'hospi_30J'
+]
+
+
+@dataclass(frozen=True)
+class ViewSpec:
+    """
+    Description déclarative d'une vue : table source, colonnes utiles et filtres.
+
+    La même spécification se compile en requête BigQuery (liste de colonnes
+    explicite et clause WHERE) et en lecture pyarrow du snapshot local
+    (sélection de colonnes et filtres appliqués à la lecture du Parquet).
+    """
+
+    table: str
+    columns: Optional[Tuple[str, ...]] = None
+    filters: Tuple[Tuple[str, object], ...] = ()
+
+    def __post_init__(self):
+        # Normalisation en tuples pour que la spécification soit hashable (clé de cache)
+        if self.columns is not None:
+            object.__setattr__(self, 'columns', tuple(dict.fromkeys(self.columns)))
+        object.__setattr__(self, 'filters', tuple(
+            (column, tuple(value) if isinstance(value, (list, tuple, set)) else value)
+            for column, value in sorted(dict(self.filters).items())
+        ))
+
+    @property
+    def is_full(self) -> bool:
+        return self.columns is None and not self.filters
+
+    @property
+    def key(self) -> str:
+        """Identifiant court de la projection, utilisé pour nommer les snapshots"""
+        if self.is_full:
+            return 'full'
+        return hashlib.sha1(repr((self.columns, self.filters)).encode('utf-8')).hexdigest()[:12]
+
+    def to_sql(self) -> str:
+        """Requête BigQuery avec colonnes explicites et prédicats poussés côté serveur"""
+        select = ', '.join(f"`{column}`" for column in self.columns) if self.columns else '*'
+        query = f"SELECT {select} FROM `{self.table}`"
+        if self.filters:
+            conditions = []
+            for column, value in self.filters:
+                if isinstance(value, tuple):
+                    conditions.append(f"`{column}` IN ({', '.join(_sql_literal(v) for v in value)})")
+                else:
+                    conditions.append(f"`{column}` = {_sql_literal(value)}")
+            query += " WHERE " + " AND ".join(conditions)
+        return query
+
+    def arrow_filters(self) -> Optional[List[Tuple]]:
+        """Filtres au format pyarrow.parquet.read_table"""
+        if not self.filters:
+            return None
+        return [
+            (column, 'in', list(value)) if isinstance(value, tuple) else (column, '==', value)
+            for column, value in self.filters
+        ]
+
+
+def _sql_literal(value) -> str:
+    if isinstance(value, str):
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    return str(value)
+
+
+# Tables complètes
+MORBIDITE = ViewSpec(MORBIDITE_TABLE)
+CAPACITE = ViewSpec(CAPACITE_TABLE)
+CAPACITE_KPI = ViewSpec(CAPACITE_KPI_TABLE)
+
+# Pages par service médical (chirurgie, médecine, obstétrique, psychiatrie, SSR, ESND)
+SERVICE_MORBIDITE = ViewSpec(
+    MORBIDITE_TABLE,
+    columns=[
+        'classification', 'niveau', 'sexe', 'annee', 'nom_region', 'nom_pathologie',
+        'nbr_hospi', 'AVG_duree_hospi', 'indice_comparatif_tt_age_percent', 'hospi_total_24h',
+        *AGE_COLUMNS
+    ],
+    filters={'niveau': 'Départements'}
+)
+
+SERVICE_CAPACITE = ViewSpec(
+    CAPACITE_KPI_TABLE,
+    columns=[
+        'classification', 'niveau', 'annee', 'nom_region',
+        'lit_hospi_complete', 'place_hospi_partielle', 'sejour_hospi_complete',
+        'journee_hospi_complete', 'taux_occupation', 'taux_equipement', 'passage_urgence',
+        *DUREE_COLUMNS
+    ],
+    filters={'niveau': 'Départements'}
+)
+
+# Carte de France
+CARTE = ViewSpec(
+    MORBIDITE_TABLE,
+    columns=[
+        'classification', 'niveau', 'sexe', 'annee', 'region', 'nom_region', 'nom_pathologie',
+        'nbr_hospi', 'AVG_duree_hospi', 'tx_standard_tt_age_pour_mille'
+    ]
+)
+
+# Générateur de graphiques
+GRAPH_HOSPI = ViewSpec(
+    MORBIDITE_TABLE,
+    columns=[
+        'year', 'region', 'nom_region', 'sexe', 'pathologie', 'nom_pathologie',
+        'nbr_hospi', 'hospi_prog_24h', 'hospi_autres_24h', 'hospi_total_24h'
+    ],
+    filters={'sexe': 'Ensemble', 'niveau': 'Départements', 'annee': 2022}
+)
+
+# Vue générale
+VUE_GLOBALE_NBR_HOSPI = ViewSpec(
+    MORBIDITE_TABLE,
+    columns=[
+        'niveau', 'year', 'annee', 'region', 'nom_region', 'pathologie', 'nom_pathologie', 'sexe',
+        'nbr_hospi', 'evolution_nbr_hospi', 'evolution_percent_nbr_hospi', 'hospi_prog_24h', 'hospi_autres_24h',
+        *DUREE_COLUMNS,
+        'hospi_total_jj', 'total_hospi', 'evolution_hospi_total_24h', 'evolution_percent_hospi_total_24h',
+        'evolution_hospi_total_jj', 'evolution_percent_hospi_total_jj', 'evolution_total_hospi',
+        'evolution_percent_total_hospi', 'indice_comparatif_tt_age_percent',
+        *AGE_COLUMNS,
+        'classification'
+    ]
+)
+
+VUE_GLOBALE_DUREE_HOSPI = ViewSpec(
+    MORBIDITE_TABLE,
+    columns=[
+        'niveau', 'year', 'region', 'nom_region', 'pathologie', 'nom_pathologie', 'sexe',
+        'AVG_duree_hospi', 'evolution_AVG_duree_hospi', 'evolution_percent_AVG_duree_hospi',
+        'evolution_hospi_total_jj', 'classification'
+    ]
+)
+
+VUE_GLOBALE_TRANCHE_AGE_HOSPI = ViewSpec(
+    MORBIDITE_TABLE,
+    columns=[
+        'niveau', 'year', 'region', 'nom_region', 'pathologie', 'nom_pathologie',
+        *AGE_COLUMNS,
+        'tx_brut_tt_age_pour_mille', 'tx_standard_tt_age_pour_mille',
+        'indice_comparatif_tt_age_percent', 'classification'
+    ]
+)
+
+VUE_GLOBALE_CAPACITE = ViewSpec(
+    CAPACITE_TABLE,
+    columns=['niveau', 'year', 'nom_region', 'lit_hospi_complete', 'place_hospi_partielle', 'passage_urgence']
+)
+
+# Page de prédiction : historique régional et périmètre de la grille de prédictions
+PREDICTION = ViewSpec(
+    MORBIDITE_TABLE,
+    columns=['niveau', 'sexe', 'annee', 'nom_region', 'nom_pathologie', 'nbr_hospi'],
+    filters={'niveau': 'Régions', 'sexe': 'Ensemble'}
+)